@@ -0,0 +1,45 @@
+"""Benchmark of memory used by commands
+
+Builds a large command sequence and reports
+how much the resident memory of the process grew.
+
+   python benchmark_command_memory.py [commands]
+"""
+import gc
+import resource
+import sys
+import time
+from scan.commands import CommandSequence, Set, Loop, Wait, Comment, Delay
+
+def residentKB():
+    """:return: Resident memory in kB, as far as /proc provides it"""
+    try:
+        with open('/proc/self/status') as status:
+            for line in status:
+                if line.startswith('VmRSS:'):
+                    return int(line.split()[1])
+    except IOError:
+        pass
+    # Peak instead of current memory
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+if __name__ == "__main__":
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 200000
+    gc.collect()
+    before = residentKB()
+    start = time.time()
+    cmds = CommandSequence()
+    for i in range(count):
+        if i % 10 == 0:
+            cmds.append(Loop('y', 1, 3, 1, [ Set('x', i*0.5, completion=True), Delay(1) ]))
+        elif i % 10 == 5:
+            cmds.append(Wait('counts', i, comparison='increase by', timeout=10))
+        elif i % 10 == 9:
+            cmds.append(Comment('Step %d' % i))
+        else:
+            cmds.append(Set('x', i*0.5, completion=True, timeout=10))
+    secs = time.time() - start
+    gc.collect()
+    used = residentKB() - before
+    print "%d commands: %.1f MB, %.0f bytes per command, created in %.2f seconds" % \
+          (count, used / 1024.0, used * 1024.0 / count, secs)
@@ -0,0 +1,57 @@
+"""Benchmark of persistent connections
+
+Compares requests per second for `ScanClient.scanInfo()`
+against the stand-in scan server
+when using the connection pool
+versus opening a new connection for each request
+the way `urllib2` does.
+
+   python benchmark_connection_pool.py [requests]
+"""
+import sys
+import time
+import urllib2
+import xml.etree.ElementTree as ET
+from scan.client.connectionpool import ConnectionPool
+from scan.client.scaninfo import ScanInfo
+from scan.client.scanclient import ScanClient
+from scan_server_stub import StubScanServer
+
+def urllib2Info(url):
+    """Get scan info via new urllib2 opener, as before the pool was used"""
+    response = urllib2.build_opener().open(urllib2.Request(url))
+    try:
+        return ScanInfo(ET.fromstring(response.read()))
+    finally:
+        response.close()
+
+def measure(title, count, call):
+    start = time.time()
+    for i in range(count):
+        call()
+    secs = time.time() - start
+    print "%-25s: %6d requests in %6.2f seconds = %8.1f requests/sec" % (title, count, secs, count/secs)
+    return count/secs
+
+if __name__ == "__main__":
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    server = StubScanServer()
+    server.start()
+    try:
+        id = server.addScan('Bench')
+        pool = ConnectionPool()
+        client = ScanClient('localhost', server.port, pool=pool)
+        url = "http://localhost:%d/scan/%d" % (server.port, id)
+
+        before = server.connections
+        old = measure("New connection per call", count, lambda: urllib2Info(url))
+        print "%-25s: %6d connections" % ("", server.connections - before)
+
+        before = server.connections
+        new = measure("Connection pool", count, lambda: client.scanInfo(id))
+        print "%-25s: %6d connections" % ("", server.connections - before)
+
+        print "Speedup: %.1f x" % (new / old)
+        pool.clear()
+    finally:
+        server.stop()
@@ -0,0 +1,57 @@
+"""Benchmark of table creation
+
+Compares wall time of `createTable` and `getTable`
+with NumPy versus the pure Python implementation
+for synthetic data of many devices.
+Each device logs at a random `fraction` of the sample IDs.
+Use a small fraction to check the pure Python alignment
+for devices that rarely log at the same sample ID.
+
+   python benchmark_create_table.py [devices] [samples] [fraction]
+"""
+import random
+import sys
+import time
+from array import array
+from scan.client.data import getTable
+from scan.client.logdata import createTable
+import scan.client.data
+import scan.client.logdata
+
+def createData(devices, samples, fraction=0.5):
+    """Data where each device logged at a random subset of `samples` sample IDs"""
+    random.seed(42)
+    data = dict()
+    for d in range(devices):
+        ids = [ i for i in xrange(samples) if random.random() < fraction ]
+        data['device%d' % d] = { 'id': array('l', ids),
+                                 'time': array('l', [ 1427913270351 + i for i in ids ]),
+                                 'value': array('d', [ i * 0.001 for i in ids ]) }
+    return data
+
+def measure(title, call, *args, **kwargs):
+    start = time.time()
+    table = call(*args, **kwargs)
+    secs = time.time() - start
+    print "%-25s: %8d rows in %6.2f seconds" % (title, len(table[0]), secs)
+    return table, secs
+
+if __name__ == "__main__":
+    devices = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    samples = int(sys.argv[2]) if len(sys.argv) > 2 else 200000
+    fraction = float(sys.argv[3]) if len(sys.argv) > 3 else 0.5
+    data = createData(devices, samples, fraction)
+    names = sorted(data.keys())
+
+    if scan.client.logdata.numpy is None:
+        print "NumPy not available"
+        sys.exit(1)
+    fast, fast_secs = measure("createTable, NumPy", createTable, data, *names)
+    fast_get, fast_get_secs = measure("getTable, NumPy", getTable, data, *names, with_id=True, with_time=True)
+
+    scan.client.logdata.numpy = scan.client.data.numpy = None
+    slow, slow_secs = measure("createTable, Python", createTable, data, *names)
+    slow_get, slow_get_secs = measure("getTable, Python", getTable, data, *names, with_id=True, with_time=True)
+
+    print "Same result: %s, %s" % (fast == slow, fast_get == slow_get)
+    print "Speedup: createTable %.1f x, getTable %.1f x" % (slow_secs / fast_secs, slow_get_secs / fast_get_secs)
@@ -0,0 +1,50 @@
+"""Benchmark of range expansion
+
+Compares wall time of `expandRanges` with the previous
+implementation, which expanded one cell per pass
+over the whole table until nothing changed,
+for a table where each row has several range cells.
+
+   python benchmark_expand_ranges.py [rows] [cells] [count]
+
+Each of the `rows` has `cells` cells with `range(count)`,
+so the table expands into rows * count**cells rows.
+"""
+import sys
+import time
+from scan.table.range_helper import expandRangeInRow, expandRanges, iterExpandedRanges
+
+def previousExpandRanges(rows):
+    """Previous implementation, one cell per pass"""
+    result = []
+    nothing = True
+    for row in rows:
+        expanded = expandRangeInRow(row)
+        if expanded is not None:
+            nothing = False
+            result.extend(expanded)
+        else:
+            result.append(row)
+    if nothing:
+        return result
+    return previousExpandRanges(result)
+
+def measure(title, call, rows):
+    start = time.time()
+    result = call(rows)
+    secs = time.time() - start
+    print "%-25s: %8d rows in %6.2f seconds" % (title, result if isinstance(result, int) else len(result), secs)
+    return result, secs
+
+if __name__ == "__main__":
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 4
+    cells = int(sys.argv[2]) if len(sys.argv) > 2 else 4
+    steps = int(sys.argv[3]) if len(sys.argv) > 3 else 25
+    table = [ [ r+1, "Comment" ] + [ "range(%d)" % steps ] * cells for r in range(rows) ]
+
+    old, old_secs = measure("Previous", previousExpandRanges, table)
+    new, new_secs = measure("expandRanges", expandRanges, table)
+    lazy, lazy_secs = measure("iterExpandedRanges", lambda rows: sum(1 for row in iterExpandedRanges(rows)), table)
+
+    print "Same result: %s" % (old == new)
+    print "Speedup: %.1f x" % (old_secs / new_secs)
@@ -0,0 +1,51 @@
+"""Benchmark of scan XML generation
+
+Compares wall time for creating the XML of a large scan
+via a complete element tree, the way `genSCN` used to,
+versus the streaming serializer in pretty and compact mode,
+and for serializing the scan again after changing one command.
+
+   python benchmark_genscn.py [commands]
+"""
+import sys
+import time
+try:
+    import xml.etree.cElementTree as ET
+except:
+    import xml.etree.ElementTree as ET
+from scan.commands import CommandSequence, Set, Loop, Log
+from scan.util.xml_helper import indent
+
+def treeSCN(cmds):
+    """Create XML via complete element tree"""
+    scn = ET.Element('commands')
+    for c in cmds:
+        scn.append(c.genXML())
+    indent(scn)
+    return ET.tostring(scn)
+
+def measure(title, call, *args):
+    start = time.time()
+    result = call(*args)
+    secs = time.time() - start
+    print "%-25s: %9d bytes in %6.2f seconds" % (title, len(result), secs)
+    return result
+
+if __name__ == "__main__":
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    cmds = CommandSequence()
+    for i in range(count):
+        if i % 10 == 0:
+            cmds.append(Loop('y', 1, 3, 1, [ Set('x', i*0.5, completion=True), Log('x', 'y') ]))
+        else:
+            cmds.append(Set('x', i*0.5, completion=True, timeout=10))
+
+    tree = measure("Element tree", treeSCN, cmds)
+    measure("Streaming, compact", cmds.genSCN, False)
+    stream = measure("Streaming, pretty", cmds.genSCN)
+    print "Same result: %s" % (tree == stream)
+
+    cmds[count/2].setTimeout(20)
+    tree = measure("Changed, element tree", treeSCN, cmds)
+    stream = measure("Changed, streaming", cmds.genSCN)
+    print "Same result: %s" % (tree == stream)
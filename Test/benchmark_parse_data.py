@@ -0,0 +1,89 @@
+"""Benchmark of log data parsing
+
+Compares wall time and peak memory (RSS) for decoding
+a synthetic log data document with
+the element tree based parser that reads the complete
+XML into memory versus the streaming `parseXMLDataStream`,
+storing the data in lists or compact arrays.
+
+Each parser runs in a separate process so that the peak
+memory of one doesn't hide that of the other.
+
+   python benchmark_parse_data.py [samples]
+"""
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+import xml.etree.cElementTree as ET
+from scan.client.logdata import parseXMLDataStream
+
+def writeDocument(filename, samples, devices=4):
+    """Write log data for `samples` samples, spread over a few devices"""
+    with open(filename, 'w') as out:
+        out.write('<?xml version="1.0" encoding="UTF-8" standalone="no"?>\n<data>\n')
+        per_device = samples / devices
+        for d in range(devices):
+            out.write('  <device>\n    <name>device%d</name>\n    <samples>\n' % d)
+            for i in range(per_device):
+                id = i*devices + d
+                out.write('      <sample id="%d">\n        <time>%d</time>\n        <value>%.3f</value>\n      </sample>\n'
+                          % (id, 1427913270351 + id, i * 0.001))
+            out.write('    </samples>\n  </device>\n')
+        out.write('</data>\n')
+
+def parseTree(filename):
+    """Element tree based parser, reading the complete XML text first"""
+    with open(filename) as file:
+        xml_text = file.read()
+    data = dict()
+    xml = ET.fromstring(xml_text)
+    for dev in xml.findall("device"):
+        name = dev.find("name").text
+        ids = list()
+        times = list()
+        values = list()
+        for sample in dev.find("samples").findall("sample"):
+            ids.append(int(sample.attrib['id']))
+            times.append(int(sample.find("time").text))
+            try:
+                values.append(float(sample.find("value").text))
+            except:
+                values.append(sample.find("value").text)
+        data[name] = { 'id': ids, 'time': times, 'value': values }
+    return data
+
+def parseStream(filename, compact=False):
+    with open(filename) as file:
+        return parseXMLDataStream(file, compact=compact)
+
+def runParser(mode, filename):
+    """Run one parser, print time and peak RSS"""
+    start = time.time()
+    if mode == 'tree':
+        data = parseTree(filename)
+    else:
+        data = parseStream(filename, mode == 'compact')
+    secs = time.time() - start
+    samples = sum([ len(dev['id']) for dev in data.values() ])
+    # ru_maxrss is in kB on Linux
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024.0
+    print "%-20s: %8d samples in %6.2f seconds, peak RSS %7.1f MB" % (mode, samples, secs, rss)
+
+if __name__ == "__main__":
+    if len(sys.argv) == 3:
+        runParser(sys.argv[1], sys.argv[2])
+        sys.exit(0)
+
+    samples = int(sys.argv[1]) if len(sys.argv) > 1 else 1000000
+    (fd, filename) = tempfile.mkstemp(suffix='.xml')
+    os.close(fd)
+    try:
+        writeDocument(filename, samples)
+        print "Document: %.1f MB" % (os.path.getsize(filename) / 1024.0 / 1024.0)
+        for mode in ( 'tree', 'stream', 'compact' ):
+            subprocess.check_call([ sys.executable, __file__, mode, filename ])
+    finally:
+        os.remove(filename)
@@ -0,0 +1,37 @@
+"""Benchmark of scan XML parsing
+
+Compares wall time for parsing the XML of a large scan
+into an element tree with the time for parsing it into commands.
+
+   python benchmark_parse_scn.py [commands]
+"""
+import sys
+import time
+try:
+    import xml.etree.cElementTree as ET
+except:
+    import xml.etree.ElementTree as ET
+from scan.commands import CommandSequence, Set, Loop, Log, parseSCN
+
+def measure(title, call, *args):
+    start = time.time()
+    result = call(*args)
+    secs = time.time() - start
+    print "%-25s: %6.2f seconds" % (title, secs)
+    return result
+
+if __name__ == "__main__":
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    cmds = CommandSequence()
+    for i in range(count):
+        if i % 10 == 0:
+            cmds.append(Loop('y', 1, 3, 1, [ Set('x', i*0.5, completion=True), Log('x', 'y') ]))
+        else:
+            cmds.append(Set('x', i*0.5, completion=True, timeout=10))
+
+    for pretty in ( True, False ):
+        xml = cmds.genSCN(pretty)
+        print "%d commands, %d bytes of XML" % (count, len(xml))
+        measure("Element tree", ET.fromstring, xml)
+        parsed = measure("Commands", parseSCN, xml)
+        print "Same result: %s" % (CommandSequence(parsed).genSCN(pretty) == xml)
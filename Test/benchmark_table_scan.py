@@ -0,0 +1,37 @@
+"""Benchmark of table scan creation
+
+Measures the wall time of `TableScan.createScan`
+for a table with many columns and rows.
+Each row sets all devices, the last columns wait for a counter.
+
+   python benchmark_table_scan.py [columns] [rows]
+"""
+import sys
+import time
+from scan.table import TableScan
+from scan.util import ScanSettings, setScanSettings
+
+class BenchmarkSettings(ScanSettings):
+    def __init__(self):
+        super(BenchmarkSettings, self).__init__()
+        self.defineDeviceClass("motor.*", completion=True, readback=True, timeout=100)
+
+def createTable(columns, rows):
+    devices = columns - 3
+    headers = [ "Comment" ] + [ ("motor%d" if d % 2 else "+p pv%d") % d for d in range(devices) ] + [ "Wait For", "Value" ]
+    table = [ [ "Row %d" % r ] + [ str(r + d) for d in range(devices) ] + [ "counter", "10" ]
+              for r in range(rows) ]
+    return TableScan(headers, table)
+
+if __name__ == "__main__":
+    columns = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    rows = int(sys.argv[2]) if len(sys.argv) > 2 else 100000
+    setScanSettings(BenchmarkSettings())
+    table = createTable(columns, rows)
+
+    start = time.time()
+    count = 0
+    for command in table.iterScan():
+        count += 1
+    secs = time.time() - start
+    print "%d columns x %d rows: %d commands in %.2f seconds, %.1f us per cell" % (columns, rows, count, secs, secs * 1e6 / (columns * rows))
@@ -0,0 +1,272 @@
+"""Stand-in for the scan server
+
+Minimal HTTP/1.1 server that implements enough of the
+scan server REST API to exercise the ScanClient
+without a real scan server.
+
+Scans are held in memory and only change state
+when the test calls `setState()`, `logSample()`, ...
+
+Example:
+
+>>> server = StubScanServer()
+>>> server.start()
+>>> client = ScanClient('localhost', server.port)
+>>> id = client.submit([ Comment('Hello') ])
+>>> server.setState(id, 'Finished')
+>>> server.stop()
+"""
+import re
+import socket
+import threading
+import time
+from BaseHTTPServer import BaseHTTPRequestHandler, HTTPServer
+from SocketServer import ThreadingMixIn
+from xml.sax.saxutils import escape
+
+class _ThreadingHTTPServer(ThreadingMixIn, HTTPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+
+class StubScanServer(object):
+    """Stand-in for the scan server
+
+    :param host: Host name or IP address to bind to
+    :param port: TCP port, 0 to pick a free port
+    """
+    def __init__(self, host='localhost', port=0):
+        self.lock = threading.Lock()
+        # Scan ID -> dict with scan details
+        self.scans = dict()
+        self.next_id = 1
+        # Number of TCP connections accepted
+        self.connections = 0
+        # Sockets of open connections
+        self.sockets = set()
+        # Number of requests handled
+        self.requests = 0
+        # Paths of requests handled, in order
+        self.paths = list()
+        # Headers and body of last POST
+        self.post_headers = None
+        self.post_body = None
+        # Last <patch> received
+        self.patch = None
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+            # Buffer reply, sent when the request has been handled
+            wbufsize = -1
+
+            def setup(self):
+                BaseHTTPRequestHandler.setup(self)
+                with stub.lock:
+                    stub.connections += 1
+                    stub.sockets.add(self.connection)
+
+            def finish(self):
+                with stub.lock:
+                    stub.sockets.discard(self.connection)
+                try:
+                    BaseHTTPRequestHandler.finish(self)
+                except socket.error:
+                    pass
+
+            def log_message(self, format, *args):
+                pass
+
+            def __reply(self, status, body=''):
+                self.send_response(status)
+                self.send_header('Content-Type', 'text/xml')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def __readBody(self):
+                if self.headers.get('Transfer-Encoding', '').lower() == 'chunked':
+                    chunks = []
+                    while True:
+                        size = int(self.rfile.readline().strip(), 16)
+                        if size == 0:
+                            self.rfile.readline()
+                            break
+                        chunks.append(self.rfile.read(size))
+                        self.rfile.readline()
+                    return ''.join(chunks)
+                length = int(self.headers.get('Content-Length', 0))
+                return self.rfile.read(length)
+
+            def __handle(self, method):
+                body = None
+                if method in ( 'POST', 'PUT' ):
+                    body = self.__readBody()
+                with stub.lock:
+                    stub.requests += 1
+                    stub.paths.append(self.path)
+                    if method == 'POST':
+                        stub.post_headers = self.headers
+                        stub.post_body = body
+                    (status, reply) = stub.handle(method, self.path, body)
+                self.__reply(status, reply)
+
+            def do_GET(self):
+                self.__handle('GET')
+
+            def do_POST(self):
+                self.__handle('POST')
+
+            def do_PUT(self):
+                self.__handle('PUT')
+
+            def do_DELETE(self):
+                self.__handle('DELETE')
+
+        self.server = _ThreadingHTTPServer((host, port), Handler)
+        self.port = self.server.server_address[1]
+        self.thread = None
+
+    def start(self):
+        """Start serving requests in background thread"""
+        self.thread = threading.Thread(target=self.server.serve_forever)
+        self.thread.daemon = True
+        self.thread.start()
+
+    def stop(self):
+        """Stop serving requests"""
+        self.server.shutdown()
+        self.server.server_close()
+        self.thread.join()
+        # Close connections that clients keep alive
+        with self.lock:
+            sockets = list(self.sockets)
+        for sock in sockets:
+            try:
+                sock.shutdown(socket.SHUT_RDWR)
+            except socket.error:
+                pass
+
+    def addScan(self, name, commands='<commands />', state='Idle'):
+        """Add a scan
+
+        :return: Scan ID
+        """
+        with self.lock:
+            return self.__addScan(name, commands, state)
+
+    def __addScan(self, name, commands, state):
+        id = self.next_id
+        self.next_id += 1
+        self.scans[id] = dict(name=name, commands=commands, state=state,
+                              created=int(time.time()*1000),
+                              total=0, performed=0, data=list())
+        return id
+
+    def setState(self, id, state, performed=None, total=None):
+        """Change state and optionally progress of a scan"""
+        with self.lock:
+            scan = self.scans[id]
+            scan['state'] = state
+            if performed is not None:
+                scan['performed'] = performed
+            if total is not None:
+                scan['total'] = total
+
+    def logSample(self, id, device, value, time=None):
+        """Log a sample for a scan
+
+        Each call creates a new sample ID.
+        """
+        with self.lock:
+            data = self.scans[id]['data']
+            if time is None:
+                time = 1427913270000 + len(data)
+            data.append((len(data), device, time, value))
+
+    def __scanInfoXML(self, id):
+        scan = self.scans[id]
+        return ("<scan><id>%d</id><name>%s</name><created>%d</created><state>%s</state>"
+                "<runtime>0</runtime><total_work_units>%d</total_work_units>"
+                "<performed_work_units>%d</performed_work_units>"
+                "<address>-1</address><command></command></scan>"
+                % (id, escape(scan['name']), scan['created'], scan['state'],
+                   scan['total'], scan['performed']))
+
+    def __dataXML(self, id):
+        devices = list()
+        samples = dict()
+        for (serial, device, time, value) in self.scans[id]['data']:
+            if not device in samples:
+                devices.append(device)
+                samples[device] = list()
+            samples[device].append('<sample id="%d"><time>%d</time><value>%s</value></sample>'
+                                   % (serial, time, escape(str(value))))
+        xml = [ '<data>' ]
+        for device in devices:
+            xml.append('<device><name>%s</name><samples>' % escape(device))
+            xml.extend(samples[device])
+            xml.append('</samples></device>')
+        xml.append('</data>')
+        return ''.join(xml)
+
+    def handle(self, method, path, body):
+        """Handle request. Called with lock held.
+
+        :return: (status, XML reply)
+        """
+        if method == 'GET'  and  path == '/server/info':
+            return (200, '<server><version>stub</version></server>')
+        if method == 'GET'  and  path == '/scans':
+            ids = sorted(self.scans.keys())
+            return (200, '<scans>' + ''.join([ self.__scanInfoXML(id) for id in ids ]) + '</scans>')
+        if method == 'DELETE'  and  path == '/scans/completed':
+            for id in self.scans.keys():
+                if not self.scans[id]['state'] in ( 'Idle', 'Running', 'Paused' ):
+                    del self.scans[id]
+            return (200, '')
+        if method == 'POST'  and  path == '/simulate':
+            return (200, '<simulation><log>Simulated</log><seconds>1.0</seconds></simulation>')
+
+        m = re.match(r'/scan/([^/?]+)(?:/([a-z_]+))?(?:\?.*)?$', path)
+        if not m:
+            return (404, '')
+        (what, sub) = m.groups()
+        if method == 'POST'  and  sub is None:
+            id = self.__addScan(what, body, 'Idle')
+            return (200, '<id>%d</id>' % id)
+        try:
+            id = int(what)
+        except ValueError:
+            return (404, '')
+        if not id in self.scans:
+            return (404, '')
+        scan = self.scans[id]
+        if method == 'GET':
+            if sub is None:
+                return (200, self.__scanInfoXML(id))
+            if sub == 'commands':
+                return (200, scan['commands'])
+            if sub == 'last_serial':
+                return (200, '<serial>%d</serial>' % (len(scan['data']) - 1))
+            if sub == 'data':
+                return (200, self.__dataXML(id))
+            if sub == 'devices':
+                return (200, '<devices />')
+        elif method == 'PUT':
+            if sub == 'pause':
+                scan['state'] = 'Paused'
+                return (200, '')
+            if sub == 'resume':
+                scan['state'] = 'Running'
+                return (200, '')
+            if sub == 'abort':
+                scan['state'] = 'Aborted'
+                return (200, '')
+            if sub == 'patch':
+                self.patch = body
+                return (200, '')
+        elif method == 'DELETE'  and  sub is None:
+            del self.scans[id]
+            return (200, '')
+        return (404, '')
@@ -0,0 +1,85 @@
+"""Unit test of the AsyncScanClient
+
+   Uses the stand-in scan server, no real scan server required.
+"""
+import threading
+import time
+import unittest
+from scan.client.asyncclient import AsyncScanClient, Executor, ScanFuture
+from scan.commands import Comment
+from scan_server_stub import StubScanServer
+
+
+class AsyncScanClientTest(unittest.TestCase):
+    def setUp(self):
+        self.server = StubScanServer()
+        self.server.start()
+        self.executor = Executor(workers=2)
+        self.client = AsyncScanClient('localhost', self.server.port, executor=self.executor)
+
+    def tearDown(self):
+        self.executor.shutdown()
+        self.server.stop()
+
+    def testCalls(self):
+        id = self.client.submit([ Comment('Hello') ], 'Test').result(5)
+        info = self.client.scanInfo(id).result(5)
+        self.assertEqual(info.name, 'Test')
+        self.assertEqual(info.state, 'Idle')
+        self.assertEqual([ info.id for info in self.client.scanInfos().result(5) ], [ id ])
+        self.assertEqual(self.client.lastSerial(id).result(5), -1)
+
+        self.server.logSample(id, 'x', 1.0)
+        self.assertEqual(self.client.getData(id).result(5)['x']['value'], [ 1.0 ])
+
+        self.client.pause(id).result(5)
+        self.assertEqual(self.client.scanInfo(id).result(5).state, 'Paused')
+        self.client.resume(id).result(5)
+        self.client.abort(id).result(5)
+        self.assertEqual(self.client.scanInfo(id).result(5).state, 'Aborted')
+
+    def testErrors(self):
+        future = self.client.scanInfo(42)
+        error = future.exception(5)
+        print error
+        self.assertTrue('error code 404' in str(error))
+        with self.assertRaises(Exception):
+            future.result()
+
+        # Timeout while waiting for result
+        with self.assertRaises(Exception) as context:
+            ScanFuture().result(0.1)
+        print context.exception
+
+    def testCallback(self):
+        done = threading.Event()
+        results = list()
+        def callback(future):
+            results.append(future.result())
+            done.set()
+        self.client.serverInfo().addDoneCallback(callback)
+        done.wait(5)
+        self.assertTrue('<version>' in results[0])
+
+    def testWait(self):
+        # Wait for many scans with only two worker threads
+        ids = [ self.server.addScan('Test%d' % i, state='Running') for i in range(10) ]
+        futures = [ self.client.waitUntilDone(id, poll=0.05) for id in ids ]
+        time.sleep(0.2)
+        self.assertFalse(any([ future.done() for future in futures ]))
+
+        # Calls are handled while the waits are pending
+        self.assertEqual(self.client.scanInfo(ids[0]).result(5).state, 'Running')
+
+        for id in ids[:-1]:
+            self.server.setState(id, 'Finished')
+        self.server.setState(ids[-1], 'Failed')
+        for future in futures[:-1]:
+            self.assertEqual(future.result(5).state, 'Finished')
+        with self.assertRaises(Exception) as context:
+            futures[-1].result(5)
+        print context.exception
+
+
+if __name__ == "__main__":
+    unittest.main()
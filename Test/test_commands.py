@@ -1,7 +1,17 @@
 
 import unittest
 import xml.etree.ElementTree as ET
+from StringIO import StringIO
 from scan.commands import *
+from scan.util.xml_helper import indent
+
+def treeSCN(cmds):
+    """Create XML via complete element tree"""
+    scn = ET.Element('commands')
+    for c in cmds:
+        scn.append(c.genXML())
+    indent(scn)
+    return ET.tostring(scn)
 
 # These tests compare the XML as strings, even though for example
 # both "<comment><text>Hello</text></comment>"
@@ -253,10 +263,132 @@ class CommandTest(unittest.TestCase):
         print cmds
         self.assertEqual(len(cmds), 2)
         print cmds.genSCN()
+
+    def testSequenceAppend(self):
+        # List of commands used to recurse forever
+        cmds = CommandSequence([ Comment('One'), Comment('Two') ])
+        self.assertEqual([ str(c) for c in cmds ], [ "Comment('One')", "Comment('Two')" ])
+
+        # Nested lists, tuples and generators are flattened
+        cmds.append(Comment('Three'), [ Comment('Four'), ( Comment('Five'), ) ])
+        cmds.append(Comment(str(i)) for i in range(2))
+        cmds += [ Comment('Six') ]
+        self.assertEqual(len(cmds), 8)
+        self.assertTrue(all([ isinstance(c, Comment) for c in cmds ]))
+        self.assertEqual(str(cmds[-1]), "Comment('Six')")
         
         cmds = CommandSequence(Comment('Example'), Loop('pos', 1, 5, 0.5, Set('run', 1), Delay(2), Set('run', 0)))
         print cmds
         
+    def testStreamingSCN(self):
+        scans = [ CommandSequence(),
+                  CommandSequence(Comment('One')),
+                  CommandSequence(Comment('Current < 10 & "more"'), Comment(u'\u00b5A'), Set('x', 'Text'), Delay(1)),
+                  CommandSequence(Loop('pos', 1, 5, 0.5, Set('run', 1), Delay(2), Set('run', 0)),
+                                  Log('x', 'y'),
+                                  Parallel(Sequence(Comment('Chain1'), Set('run', 1)),
+                                           Sequence(),
+                                           Loop('x', 1, 2, 1, Loop('y', 1, 2, 1, Comment('Inner')))),
+                                  If('x', '>', 5, Set('y', 1)),
+                                  Wait('x', 5, comparison='>=', tolerance=0.1, timeout=10),
+                                  Include('start.scn'),
+                                  Loop('empty', 1, 2, 1)) ]
+        for cmds in scans:
+            self.assertEqual(cmds.genSCN(), treeSCN(cmds))
+            # Small chunks
+            self.assertEqual(''.join(iterSCN(cmds, chunk_size=10)), treeSCN(cmds))
+            out = StringIO()
+            cmds.writeSCN(out)
+            self.assertEqual(out.getvalue(), treeSCN(cmds))
+            # Compact: Same as tree without indentation
+            compact = ET.Element('commands')
+            for c in cmds:
+                compact.append(c.genXML())
+            self.assertEqual(cmds.genSCN(pretty=False), ET.tostring(compact))
+
+        # Generator and nested lists
+        self.assertEqual(''.join(iterSCN(Comment(str(i)) for i in range(3))),
+                         CommandSequence(Comment('0'), Comment('1'), Comment('2')).genSCN())
+        self.assertEqual(''.join(iterSCN([ Comment('0'), [ Comment('1'), ( Comment('2'), ) ] ])),
+                         CommandSequence(Comment('0'), Comment('1'), Comment('2')).genSCN())
+
+    def testCachedXML(self):
+        inner = Set('y', 1)
+        loop = Loop('x', 1, 2, 1, Loop('y', 1, 2, 1, inner))
+        parallel = Parallel(Comment('A'))
+        sequence = Sequence(Comment('B'))
+        wait = Wait('x', 5)
+        cmds = CommandSequence(loop, parallel, sequence, wait)
+        text = cmds.genSCN()
+        self.assertEqual(text, treeSCN(cmds))
+
+        # Unchanged command returns the same text
+        self.assertTrue(wait.genXMLText(1) is wait.genXMLText(1))
+        self.assertTrue(inner.genXMLText(3) is inner.genXMLText(3))
+        self.assertEqual(cmds.genSCN(), text)
+
+        # Text of commands with a body is not kept
+        self.assertEqual(loop.genXMLText(1), loop.genXMLText(1))
+        self.assertTrue(loop._xml_cache is None)
+
+        # Changes to nested commands are detected
+        cached = inner.genXMLText(3)
+        inner.setCompletion(True)
+        inner.setTimeout(5)
+        self.assertFalse(inner.genXMLText(3) is cached)
+        self.assertEqual(cmds.genSCN(), treeSCN(cmds))
+        self.assertTrue('<timeout>5</timeout>' in cmds.genSCN())
+
+        loop.getBody().append(Delay(1))
+        loop.setReadback(True)
+        parallel.append(Comment('C'))
+        sequence.append(Comment('D'))
+        wait.setComparison('>=')
+        wait.setTolerance(0.5)
+        self.assertEqual(cmds.genSCN(), treeSCN(cmds))
+        compact = ET.Element('commands')
+        for c in cmds:
+            compact.append(c.genXML())
+        self.assertEqual(cmds.genSCN(pretty=False), ET.tostring(compact))
+        del loop.getBody()[0]
+        self.assertEqual(cmds.genSCN(), treeSCN(cmds))
+
+    def testParseSCN(self):
+        cmds = CommandSequence(Loop('pos', 1, 5, 0.5, Set('run', 1), Delay(2), Set('run', 0)),
+                               Comment('Current < 10 & "more"'), Comment(u'\u00b5A'),
+                               Set('x', 'Text'), Set('x', True),
+                               Set('y', 3.5, completion=True, readback='y_rbv', tolerance=0.1, timeout=10, errhandler='OnError'),
+                               Log('x', 'y'), ConfigLog(True), ConfigLog(False),
+                               Script('MyScript', 'arg', 42.3), Script('Other'),
+                               Parallel(Sequence(Comment('Chain1'), Set('run', 1)),
+                                        Sequence(),
+                                        Loop('x', 1, 2, 1, Loop('y', 1, 2, 1, Comment('Inner'), readback=True), completion=True, timeout=3)),
+                               Parallel(Delay(1), timeout=5, errhandler='OnError'),
+                               If('x', '>', 5, Set('y', 1)), If('x', '!=', 'text', errhandler='OnError'),
+                               Wait('x', 5, comparison='>=', tolerance=0.1, timeout=10),
+                               Wait('y', 'open', comparison='increase by', errhandler='OnError'),
+                               Include('start.scn'), Include('other.scn', 'a=b', errhandler='OnError'),
+                               Loop('empty', 1, 2, 1), Sequence(Comment('S'), errhandler='OnError'),
+                               # <wait> is also a sub-element of Set and Loop
+                               Loop('w', 1, 2, 1, Wait('x', 1), Set('x', 2, completion=True), Log(), completion=True))
+        xml = cmds.genSCN()
+        parsed = CommandSequence.fromXML(xml)
+        self.assertEqual(len(parsed), len(cmds))
+        self.assertEqual(parsed.genSCN(), xml)
+        self.assertEqual(repr(parsed[0]), repr(cmds[0]))
+        self.assertEqual(parsed[4].getValue(), True)
+        self.assertEqual(parsed[5].getReadback(), 'y_rbv')
+
+        # Compact XML, file
+        self.assertEqual(CommandSequence(parseSCN(cmds.genSCN(pretty=False))).genSCN(), xml)
+        self.assertEqual(CommandSequence.fromXML(StringIO(xml)).genSCN(), xml)
+
+        self.assertEqual(parseSCN('<?xml version="1.0"?>\n<commands />'), [])
+        with self.assertRaises(Exception):
+            parseSCN('<scan />')
+        with self.assertRaises(Exception):
+            parseSCN('<commands><magic /></commands>')
+
     def testCommandSequenceFormat(self):
         cmds = CommandSequence(Parallel(
                                         Sequence(Comment('Chain1'), Set('run', 1), Delay(2), Set('run', 0)),
@@ -265,6 +397,15 @@ class CommandTest(unittest.TestCase):
         print cmds
         self.assertEqual(str(cmds), "[\n    Parallel(\n        Sequence(\n            Comment('Chain1'),\n            Set('run', 1),\n            Delay(2),\n            Set('run', 0)\n        ),\n        Sequence(\n            Comment('Chain2'),\n            Set('foo', 1),\n            Delay(2),\n            Set('foo', 0)\n        )\n    )\n]")
 
+    def testSlots(self):
+        cmds = [ Comment('Hello'), ConfigLog(True), Delay(1), If('x', '>', 1, Comment('Hi')),
+                 Include('start.scn'), Log('x'), Loop('x', 1, 2, 1, Set('y', 1)),
+                 Parallel(Delay(1)), Script('MyScript'), Sequence(Delay(1)),
+                 Set('x', 1), Wait('x', 1) ]
+        for cmd in cmds:
+            cmd.genXMLText()
+            self.assertFalse(hasattr(cmd, '__dict__'), repr(cmd))
+
     def testCommandAbstractMethodsMustBeImplemented(self):
         class IncompleteCommand(Command):
             pass
@@ -0,0 +1,147 @@
+"""Unit test of the ConnectionPool
+
+   Uses the stand-in scan server, no real scan server required.
+"""
+import threading
+import time
+import unittest
+from scan.client.connectionpool import ConnectionPool
+from scan.client.scanclient import ScanClient
+from scan.commands import Comment, Set, CommandSequence
+from scan_server_stub import StubScanServer
+
+
+class ConnectionPoolTest(unittest.TestCase):
+    def setUp(self):
+        self.server = StubScanServer()
+        self.server.start()
+
+    def tearDown(self):
+        self.server.stop()
+
+    def testKeepAlive(self):
+        pool = ConnectionPool()
+        client = ScanClient('localhost', self.server.port, pool=pool)
+        id = client.submit([ Comment('Hello') ], 'Test')
+        for i in range(10):
+            info = client.scanInfo(id)
+            self.assertEqual(info.state, 'Idle')
+            self.assertEqual(client.lastSerial(id), -1)
+        client.pause(id)
+        self.assertEqual(client.scanInfo(id).state, 'Paused')
+        client.resume(id)
+        client.abort(id)
+        client.delete(id)
+        # All requests used the same connection
+        self.assertEqual(self.server.requests, 26)
+        self.assertEqual(self.server.connections, 1)
+        self.assertEqual(pool.idleCount('localhost', self.server.port), 1)
+        pool.clear()
+        self.assertEqual(pool.idleCount('localhost', self.server.port), 0)
+
+    def testIdleEviction(self):
+        pool = ConnectionPool(idle_timeout=0.1)
+        client = ScanClient('localhost', self.server.port, pool=pool)
+        client.serverInfo()
+        client.serverInfo()
+        self.assertEqual(self.server.connections, 1)
+        time.sleep(0.3)
+        client.serverInfo()
+        self.assertEqual(self.server.connections, 2)
+
+    def testErrors(self):
+        client = ScanClient('localhost', self.server.port, pool=ConnectionPool())
+        with self.assertRaises(Exception) as context:
+            client.scanInfo(42)
+        print context.exception
+        self.assertTrue('error code 404' in str(context.exception))
+        # Connection remains usable after the error
+        client.serverInfo()
+        self.assertEqual(self.server.connections, 1)
+
+        client = ScanClient('localhost', 1, pool=ConnectionPool())
+        with self.assertRaises(Exception) as context:
+            client.serverInfo()
+        print context.exception
+        self.assertTrue('Failed to reach' in str(context.exception))
+
+    def testServerClosesIdleConnection(self):
+        pool = ConnectionPool()
+        client = ScanClient('localhost', self.server.port, pool=pool)
+        client.serverInfo()
+        # Restart server, which drops the pooled connection
+        port = self.server.port
+        self.server.stop()
+        self.server = StubScanServer(port=port)
+        self.server.start()
+        self.assertEqual(client.scanInfos(), [])
+
+    def testChunkedUpload(self):
+        client = ScanClient('localhost', self.server.port, pool=ConnectionPool())
+        def generate():
+            for i in range(5000):
+                yield Set('x', i)
+        id = client.submit(generate(), 'Generated')
+        self.assertEqual(self.server.post_headers.get('Transfer-Encoding'), 'chunked')
+        expected = CommandSequence([ Set('x', i) for i in range(5000) ]).genSCN(pretty=False)
+        self.assertEqual(self.server.scans[id]['commands'], expected)
+
+        client.simulate(Set('x', i) for i in range(3))
+        self.assertEqual(self.server.post_headers.get('Transfer-Encoding'), 'chunked')
+        self.assertEqual(self.server.post_body, CommandSequence([ Set('x', i) for i in range(3) ]).genSCN(pretty=False))
+
+        # Lists are still sent in one piece
+        id = client.submit([ Set('x', 1) ], 'List')
+        self.assertEqual(self.server.post_headers.get('Transfer-Encoding'), None)
+        self.assertEqual(self.server.scans[id]['commands'], CommandSequence(Set('x', 1)).genSCN())
+        # All on one connection
+        self.assertEqual(self.server.connections, 1)
+
+    def testSingleCommand(self):
+        client = ScanClient('localhost', self.server.port, pool=ConnectionPool())
+        id = client.submit(Set('x', 1), 'Single')
+        self.assertEqual(self.server.post_headers.get('Transfer-Encoding'), None)
+        self.assertEqual(self.server.scans[id]['commands'], CommandSequence(Set('x', 1)).genSCN())
+
+        result = client.simulate(Set('x', 1))
+        self.assertEqual(result['seconds'], 1.0)
+        self.assertEqual(self.server.post_headers.get('Transfer-Encoding'), None)
+        self.assertEqual(self.server.post_body, CommandSequence(Set('x', 1)).genSCN())
+
+        # Set of commands is not a generator, sent in one piece
+        id = client.submit(set([ Set('x', 2) ]), 'Set')
+        self.assertEqual(self.server.post_headers.get('Transfer-Encoding'), None)
+        self.assertEqual(self.server.scans[id]['commands'], CommandSequence(Set('x', 2)).genSCN())
+
+    def pollThreads(self, pool):
+        client = ScanClient('localhost', self.server.port, pool=pool)
+        errors = list()
+        def poll():
+            try:
+                for i in range(20):
+                    client.scanInfos()
+            except Exception as ex:
+                errors.append(ex)
+        threads = [ threading.Thread(target=poll) for i in range(8) ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(errors, [])
+
+    def testThreads(self):
+        # Pool large enough for all threads: Every connection is re-used
+        pool = ConnectionPool(maxsize=8)
+        self.pollThreads(pool)
+        self.assertEqual(self.server.requests, 160)
+        self.assertTrue(self.server.connections <= 8)
+
+        # Surplus connections are closed
+        pool = ConnectionPool(maxsize=2)
+        self.pollThreads(pool)
+        self.assertEqual(self.server.requests, 320)
+        self.assertTrue(pool.idleCount('localhost', self.server.port) <= 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
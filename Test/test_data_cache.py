@@ -0,0 +1,103 @@
+"""Unit test of data cache
+
+   Uses the stand-in scan server, no real scan server required.
+"""
+import os
+import shutil
+import tempfile
+import time
+import unittest
+from array import array
+from scan.client import ScanClient, DataCache
+from scan_server_stub import StubScanServer
+
+
+class DataCacheTest(unittest.TestCase):
+    def setUp(self):
+        self.server = StubScanServer()
+        self.server.start()
+        self.directory = tempfile.mkdtemp()
+        self.cache = DataCache(self.directory)
+        self.client = ScanClient('localhost', self.server.port, cache=self.cache)
+
+    def tearDown(self):
+        self.server.stop()
+        shutil.rmtree(self.directory)
+
+    def dataRequests(self, id):
+        return self.server.paths.count('/scan/%d/data' % id)
+
+    def testCache(self):
+        id = self.server.addScan('Test', state='Running')
+        self.server.logSample(id, 'x', 1.0)
+        self.server.logSample(id, 'y', 'Text & more')
+        self.server.logSample(id, 'x', 2.0)
+
+        # Active scan is not cached
+        data = self.client.getData(id)
+        data = self.client.getData(id)
+        self.assertEqual(self.dataRequests(id), 2)
+        self.assertEqual(self.cache.size(), 0)
+
+        # Completed scan is fetched once, then read from cache
+        self.server.setState(id, 'Finished')
+        data = self.client.getData(id)
+        self.assertEqual(self.dataRequests(id), 3)
+        self.assertTrue(self.cache.size() > 0)
+
+        cached = self.client.getData(id)
+        self.assertEqual(self.dataRequests(id), 3)
+        self.assertEqual(cached, data)
+        self.assertEqual(cached['x'], { 'id': [0, 2], 'time': [1427913270000, 1427913270002], 'value': [1.0, 2.0] })
+        self.assertEqual(cached['y']['value'], [ 'Text & more' ])
+
+        compact = self.client.getData(id, compact=True)
+        self.assertEqual(self.dataRequests(id), 3)
+        self.assertTrue(isinstance(compact['x']['value'], array))
+        self.assertEqual(list(compact['x']['value']), [1.0, 2.0])
+        self.assertEqual(compact['y']['value'], [ 'Text & more' ])
+
+        # Restarted server re-uses scan ID for a different scan
+        port = self.server.port
+        self.server.stop()
+        self.server = StubScanServer(port=port)
+        self.server.start()
+        other = self.server.addScan('Other', state='Finished')
+        self.server.logSample(other, 'z', 3.0)
+        self.assertEqual(other, id)
+        self.assertEqual(self.client.getData(id).keys(), [ 'z' ])
+
+        self.cache.clear()
+        self.assertEqual(self.cache.size(), 0)
+
+    def testEviction(self):
+        ids = list()
+        for i in range(3):
+            id = self.server.addScan('Test%d' % i, state='Finished')
+            for j in range(100):
+                self.server.logSample(id, 'x', float(j))
+            ids.append(id)
+        self.client.getData(ids[0])
+        size = self.cache.size()
+
+        # Cache that holds two scans
+        self.cache = DataCache(self.directory, maxsize=2*size + size/2)
+        self.client = ScanClient('localhost', self.server.port, cache=self.cache)
+        self.client.getData(ids[1])
+        self.assertEqual(self.cache.size(), 2*size)
+        # Use first scan, so second one is least recently used
+        for name in os.listdir(self.directory):
+            os.utime(os.path.join(self.directory, name), (time.time() - 100, time.time() - 100))
+        self.client.getData(ids[0])
+        self.client.getData(ids[2])
+        self.assertEqual(self.cache.size(), 2*size)
+
+        requests = self.dataRequests(ids[0]), self.dataRequests(ids[1])
+        self.client.getData(ids[0])
+        self.assertEqual(self.dataRequests(ids[0]), requests[0])
+        self.client.getData(ids[1])
+        self.assertEqual(self.dataRequests(ids[1]), requests[1] + 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,76 @@
+"""Unit test of incremental data fetch
+
+   Uses the stand-in scan server, no real scan server required.
+"""
+import unittest
+from scan.client import ScanClient, DataCursor, createTable
+from scan.client.logdata import parseXMLData, parseXMLDataSince, getLastSerial
+from scan_server_stub import StubScanServer
+
+
+class DataCursorTest(unittest.TestCase):
+    def setUp(self):
+        self.server = StubScanServer()
+        self.server.start()
+        self.client = ScanClient('localhost', self.server.port)
+
+    def tearDown(self):
+        self.server.stop()
+
+    def testParseSince(self):
+        xml = """<data>
+                   <device><name>x</name><samples>
+                     <sample id="0"><time>100</time><value>1.0</value></sample>
+                     <sample id="2"><time>300</time><value>2.0</value></sample>
+                   </samples></device>
+                   <device><name>y</name><samples>
+                     <sample id="1"><time>200</time><value>Text</value></sample>
+                   </samples></device>
+                 </data>"""
+        data = parseXMLData(xml)
+        self.assertEqual(data, { 'x': { 'id': [0, 2], 'time': [100, 300], 'value': [1.0, 2.0] },
+                                 'y': { 'id': [1], 'time': [200], 'value': ['Text'] } })
+        self.assertEqual(getLastSerial(data), 2)
+
+        new_data = parseXMLDataSince(xml, 1)
+        self.assertEqual(new_data, { 'x': { 'id': [2], 'time': [300], 'value': [2.0] },
+                                     'y': { 'id': [], 'time': [], 'value': [] } })
+        self.assertEqual(getLastSerial(new_data), 2)
+
+        self.assertEqual(getLastSerial(parseXMLDataSince(xml, 2)), -1)
+
+    def testCursor(self):
+        id = self.server.addScan('Test', state='Running')
+        cursor = DataCursor(self.client, id)
+        self.assertEqual(cursor.update(), dict())
+        self.assertEqual(cursor.data, dict())
+
+        self.server.logSample(id, 'x', 1.0)
+        self.server.logSample(id, 'y', 10.0)
+        new_data = cursor.update()
+        self.assertEqual(new_data['x']['value'], [1.0])
+        self.assertEqual(new_data['y']['value'], [10.0])
+        self.assertEqual(cursor.serial, 1)
+
+        # Nothing new: Only asked for last_serial, no data
+        requests = len(self.server.paths)
+        self.assertEqual(cursor.update(), dict())
+        self.assertEqual(self.server.paths[requests:], [ '/scan/%d/last_serial' % id ])
+
+        self.server.logSample(id, 'x', 2.0)
+        self.server.logSample(id, 'x', 3.0)
+        new_data = cursor.update()
+        self.assertEqual(new_data['x']['id'], [2, 3])
+        # Device without new samples is not listed
+        self.assertFalse('y' in new_data)
+        self.assertEqual(cursor.data['y']['id'], [1])
+        self.assertEqual(cursor.serial, 3)
+
+        # Accumulated data matches a complete fetch
+        self.assertEqual(cursor.data, self.client.getData(id))
+        self.assertEqual(createTable(cursor.data, 'x', 'y'),
+                         [ [1.0, 1.0, 2.0, 3.0], [None, 10.0, 10.0, 10.0] ])
+
+
+if __name__ == "__main__":
+    unittest.main()
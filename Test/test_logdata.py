@@ -0,0 +1,204 @@
+"""Unit test of log data parsing and tables
+"""
+import random
+import unittest
+from array import array
+from StringIO import StringIO
+from scan.client.logdata import parseXMLData, parseXMLDataStream, parseXMLDataSince, createTable, iterateSamples, iterateTable
+from scan.client.data import getTimeSeries, getTable, alignTime, resample, getTimeTable
+import scan.client.data
+import scan.client.logdata
+
+def withoutNumPy(call, *args, **kwargs):
+    """Invoke call with the pure Python implementation"""
+    saved = scan.client.logdata.numpy
+    scan.client.logdata.numpy = scan.client.data.numpy = None
+    try:
+        return call(*args, **kwargs)
+    finally:
+        scan.client.logdata.numpy = scan.client.data.numpy = saved
+
+xml_text = """<?xml version="1.0" encoding="UTF-8" standalone="no"?>
+<data>
+  <device>
+    <name>motor_x</name>
+    <samples>
+      <sample id="0">
+        <time>1427913270351</time>
+        <value>1.0</value>
+      </sample>
+      <sample id="3">
+        <time>1427913270595</time>
+        <value>2.0</value>
+      </sample>
+      <sample id="6">
+        <time>1427913270795</time>
+        <value>3.0</value>
+      </sample>
+    </samples>
+  </device>
+  <device>
+    <name>status</name>
+    <samples>
+      <sample id="1">
+        <time>1427913270352</time>
+        <value>Moving &amp; counting</value>
+      </sample>
+      <sample id="2">
+        <time>1427913270470</time>
+        <value>Done</value>
+      </sample>
+      <sample id="7">
+        <time>1427913270528</time>
+        <value></value>
+      </sample>
+    </samples>
+  </device>
+</data>
+"""
+
+class LogDataTest(unittest.TestCase):
+    def testParse(self):
+        data = parseXMLData(xml_text)
+        self.assertEqual(data['motor_x'], { 'id': [0, 3, 6],
+                                            'time': [1427913270351, 1427913270595, 1427913270795],
+                                            'value': [1.0, 2.0, 3.0] })
+        self.assertEqual(data['status']['value'], [ 'Moving & counting', 'Done', None ])
+
+    def testStream(self):
+        data = parseXMLData(xml_text)
+        # Small chunks split element text
+        for chunk_size in ( 7, 100, 65536 ):
+            self.assertEqual(parseXMLDataStream(StringIO(xml_text), chunk_size=chunk_size), data)
+
+        new_data = parseXMLDataStream(StringIO(xml_text), serial=3, chunk_size=5)
+        self.assertEqual(new_data['motor_x']['id'], [6])
+        self.assertEqual(new_data['status']['id'], [7])
+
+        with self.assertRaises(Exception) as context:
+            parseXMLDataStream(StringIO("<scans></scans>"))
+        print context.exception
+
+    def testTable(self):
+        data = parseXMLData(xml_text)
+        table = createTable(data, 'motor_x', 'status')
+        self.assertEqual(table, [ [ 1.0, 1.0, 1.0, 2.0, 3.0, 3.0 ],
+                                  [ None, 'Moving & counting', 'Done', 'Done', 'Done', None ] ])
+
+    def testCompact(self):
+        data = parseXMLData(xml_text)
+        compact = parseXMLData(xml_text, compact=True)
+        print compact
+        self.assertTrue(isinstance(compact['motor_x']['id'], array))
+        self.assertTrue(isinstance(compact['motor_x']['time'], array))
+        self.assertTrue(isinstance(compact['motor_x']['value'], array))
+        # Text values remain a list
+        self.assertTrue(isinstance(compact['status']['value'], list))
+        self.assertEqual(compact['status']['value'], data['status']['value'])
+
+        # Same access as for list-based data
+        self.assertEqual(list(iterateSamples(compact, 'motor_x')), list(iterateSamples(data, 'motor_x')))
+        self.assertEqual(createTable(compact, 'motor_x', 'status'), createTable(data, 'motor_x', 'status'))
+        self.assertEqual(getTimeSeries(compact, 'motor_x'), getTimeSeries(data, 'motor_x'))
+        self.assertEqual(getTable(compact, 'motor_x', 'status', with_id=True), getTable(data, 'motor_x', 'status', with_id=True))
+
+        # Appending text to compact column turns it into a list
+        more = """<data><device><name>motor_x</name><samples>
+                    <sample id="8"><time>1427913270900</time><value>Error</value></sample>
+                  </samples></device></data>"""
+        parseXMLDataSince(more, 7, compact, compact=True)
+        self.assertEqual(compact['motor_x']['value'], [1.0, 2.0, 3.0, 'Error'])
+        self.assertEqual(list(compact['motor_x']['id']), [0, 3, 6, 8])
+
+    def testResample(self):
+        data = parseXMLData(xml_text)
+        self.assertEqual(list(alignTime(data, 'motor_x')),
+                         [ (1427913270351, 1.0), (1427913270595, 2.0), (1427913270795, 3.0) ])
+        self.assertEqual(list(alignTime(data, 'motor_x', 1000)), [ (1427913270000, 3.0) ])
+
+        self.assertEqual(list(resample(data, 'motor_x', 100)),
+                         [ (1427913270300, 1.0), (1427913270500, 2.0), (1427913270700, 3.0) ])
+        for aggregate, value in ( ('last', 3.0), ('mean', 2.0), ('min', 1.0), ('max', 3.0), ('count', 3) ):
+            self.assertEqual(list(resample(data, 'motor_x', 1000, aggregate)), [ (1427913270000, value) ])
+        # Text is ignored for numeric aggregates
+        self.assertEqual(list(resample(data, 'status', 1000, 'mean')), [ (1427913270000, None) ])
+        self.assertEqual(list(resample(data, 'status', 1000, 'count')), [ (1427913270000, 3) ])
+        mixed = { 'x': { 'id': [0, 1, 2], 'time': [0, 1, 2], 'value': [ 1.0, 'Error', 2.0 ] } }
+        self.assertEqual(list(resample(mixed, 'x', 10, 'mean')), [ (0, 1.5) ])
+        self.assertEqual(list(resample(mixed, 'x', 10, 'last')), [ (0, 2.0) ])
+
+        with self.assertRaises(ValueError):
+            list(resample(data, 'motor_x', 0))
+        with self.assertRaises(ValueError):
+            list(resample(data, 'motor_x', 1000, 'median'))
+
+        table = getTimeTable(data, 100, 'motor_x', 'status')
+        self.assertEqual(table, [ [ 1427913270300, 1427913270400, 1427913270500, 1427913270700 ],
+                                  [ 1.0, 1.0, 2.0, 3.0 ],
+                                  [ 'Moving & counting', 'Done', None, None ] ])
+        table = getTimeTable(data, 1000, 'motor_x', 'status', aggregate='count')
+        self.assertEqual(table, [ [ 1427913270000 ], [ 3 ], [ 3 ] ])
+
+    def testIterateTable(self):
+        # Many devices, each logged at every 'd'th sample ID
+        N = 20
+        data = dict()
+        for d in range(1, N+1):
+            ids = range(d, 100, d)
+            data[d] = { 'id': ids, 'time': ids, 'value': [ d*1000 + i for i in ids ] }
+        rows = list()
+        last_row = None
+        for row in iterateTable(*[ iterateSamples(data, d) for d in range(1, N+1) ]):
+            if last_row is not None:
+                # Same list is updated for each row
+                self.assertTrue(row is last_row)
+            last_row = row
+            rows.append(list(row))
+        self.assertEqual(len(rows), 99)
+        for id in range(1, 100):
+            for d in range(1, N+1):
+                # Value of last sample at or before id
+                last = (id / d) * d
+                self.assertEqual(rows[id-1][d-1], d*1000 + last if last > 0 else None)
+
+        self.assertEqual(list(iterateTable()), [])
+        self.assertEqual(list(iterateTable(iter([]), iter([]))), [])
+
+    def testNumPyTable(self):
+        if scan.client.logdata.numpy is None:
+            print "NumPy not available"
+            return
+        # Random IDs for numeric and text devices, one device without samples
+        random.seed(42)
+        data = dict()
+        for d in range(5):
+            ids = sorted(random.sample(range(200), random.randint(0, 50)))
+            if d == 0:
+                ids = []
+            values = [ random.random() for i in ids ]
+            if d == 1:
+                values = [ "Text %d" % i for i in ids ]
+            data['dev%d' % d] = { 'id': ids, 'time': [ 1000 + 2*i + d for i in ids ], 'value': values }
+        devices = sorted(data.keys())
+
+        table = createTable(data, *devices)
+        self.assertEqual(table, withoutNumPy(createTable, data, *devices))
+        self.assertEqual(createTable(data), withoutNumPy(createTable, data))
+
+        compact = parseXMLData(xml_text, compact=True)
+        self.assertEqual(createTable(compact, 'motor_x', 'status'), withoutNumPy(createTable, compact, 'motor_x', 'status'))
+
+        # getTable does not support devices without samples
+        devices = devices[1:]
+        for with_id in ( False, True ):
+            for with_time in ( False, True ):
+                self.assertEqual(getTable(data, *devices, with_id=with_id, with_time=with_time),
+                                 withoutNumPy(getTable, data, *devices, with_id=with_id, with_time=with_time))
+
+        # IDs that are not increasing use the pure Python implementation
+        data['dev2']['id'].reverse()
+        self.assertEqual(createTable(data, 'dev2', 'dev3'), withoutNumPy(createTable, data, 'dev2', 'dev3'))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,68 @@
+import unittest
+from scan.commands import *
+
+class OptimizerTest(unittest.TestCase):
+    def check(self, cmds, expected, removed, **kwargs):
+        original = str(CommandSequence(cmds))
+        result, count = optimizeScan(cmds, **kwargs)
+        print result
+        self.assertEqual(str(result), str(CommandSequence(expected)))
+        self.assertEqual(count, removed)
+        # Original is unchanged
+        self.assertEqual(str(CommandSequence(cmds)), original)
+
+    def testFlatten(self):
+        self.check([ Parallel(Set('x', 1)), Sequence(Comment('A'), Comment('B')) ],
+                   [ Set('x', 1), Comment('A'), Comment('B') ], 2)
+        self.check([ Sequence(Parallel(Sequence(Delay(1)))), Parallel(), Sequence() ],
+                   [ Delay(1) ], 5)
+        # Sequences within Parallel are kept, but nested wrappers are removed
+        self.check([ Parallel(Sequence(Set('x', 1), Set('y', 2)), Sequence(Parallel(Set('z', 3)))) ],
+                   [ Parallel(Sequence(Set('x', 1), Set('y', 2)), Set('z', 3)) ], 2)
+        # Wrappers with timeout or error handler are kept
+        cmds = [ Parallel(Set('x', 1), timeout=5), Sequence(Set('x', 1), errhandler='OnError') ]
+        self.check(cmds, cmds, 0)
+        self.assertEqual(( cmds[0].getTimeout(), cmds[0].getErrHandler() ), ( 5, None ))
+        self.assertEqual(( cmds[1].getTimeout(), cmds[1].getErrHandler() ), ( 0, 'OnError' ))
+        cmds = [ Parallel(Set('x', 1), errhandler='OnError') ]
+        self.check(cmds, cmds, 0)
+        # Bodies of loops
+        self.check([ Loop('x', 1, 5, 1, Sequence(Delay(1), Delay(2))) ],
+                   [ Loop('x', 1, 5, 1, Delay(1), Delay(2)) ], 1)
+        # Disabled
+        self.check([ Parallel(Set('x', 1)) ], [ Parallel(Set('x', 1)) ], 0, rules=())
+
+    def testLoops(self):
+        self.check([ Set('x', 1), Set('x', 2), Set('x', 3), Set('x', 4) ],
+                   [ Loop('x', 1, 4, 1) ], 3)
+        self.check([ Set('x', 10, completion=True, timeout=5), Set('x', 8, completion=True, timeout=5), Set('x', 6, completion=True, timeout=5) ],
+                   [ Loop('x', 10, 6, -2, completion=True, timeout=5) ], 2)
+        result, count = optimizeScan([ Set('x', i, readback='x_rbv', tolerance=0.5) for i in range(5) ])
+        self.assertEqual(result[0].genXMLText(), Loop('x', 0, 4, 1, readback='x_rbv', tolerance=0.5).genXMLText())
+        # Runs end at a different step, device or options
+        self.check([ Set('x', 1), Set('x', 2), Set('x', 3), Set('x', 5), Set('x', 7), Set('x', 9),
+                     Set('y', 10), Set('y', 11), Set('y', 12, completion=True) ],
+                   [ Loop('x', 1, 3, 1), Loop('x', 5, 9, 2), Set('y', 10), Set('y', 11), Set('y', 12, completion=True) ], 4)
+        # Only integers, at least min_loop
+        cmds = [ Set('x', 0.1), Set('x', 0.2), Set('x', 0.3), Set('y', 1), Set('y', 2), Set('z', True), Set('z', False) ]
+        self.check(cmds, cmds, 0)
+        self.check(cmds[3:5], [ Loop('y', 1, 2, 1) ], 1, min_loop=2)
+        # Inside Sequence that is flattened
+        self.check([ Sequence(Set('x', 1), Set('x', 2)), Set('x', 3) ],
+                   [ Loop('x', 1, 3, 1) ], 3)
+
+    def testSetsAndLogs(self):
+        self.check([ Set('x', 1), Set('x', 5), Set('y', 1, completion=True), Set('y', 2), Log('x', 'y'), Log('x', 'y'), Log('x') ],
+                   [ Set('x', 5), Set('y', 1, completion=True), Set('y', 2), Log('x', 'y'), Log('x') ], 2,
+                   rules=( 'sets', 'logs' ))
+        # Not by default
+        cmds = [ Set('trigger', 1), Set('trigger', 0), Log('x'), Log('x') ]
+        self.check(cmds, cmds, 0)
+
+    def testErrors(self):
+        with self.assertRaises(Exception):
+            optimizeScan([], rules=( 'magic', ))
+
+
+if __name__ == "__main__":
+    unittest.main()
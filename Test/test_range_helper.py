@@ -3,7 +3,8 @@ Unit test for RangeHelper
 
 @author: Kay Kasemir
 """
-from scan.table.range_helper import getRangeOrLoop, range_matcher, loop_matcher, getIterable, expandRanges
+from scan.table.range_helper import getRangeOrLoop, range_matcher, loop_matcher, getIterable, expandRanges, iterExpandedRanges
+import threading
 import unittest
 
 class TestRangeExpansion(unittest.TestCase):
@@ -56,6 +57,39 @@ class TestRangeExpansion(unittest.TestCase):
         points = getIterable("[ 'a', 'b' ]")
         self.assertEqual(str(points), "['a', 'b']")
 
+        text = getIterable("ranged text")
+        self.assertTrue(text is None)
+
+        # Parsed cells are cached
+        self.assertTrue(getIterable(" range(5)") is getIterable("range(5) "))
+        # .. unless they are large
+        self.assertFalse(getIterable("range(5000)") is getIterable("range(5000)"))
+        self.assertEqual(getIterable("range(5000)"), range(5000))
+
+        # Cache may be used by several threads
+        errors = list()
+        def expand(i):
+            try:
+                for n in range(200):
+                    rows = expandRanges([ [ "range(%d)" % ((i*200 + n) % 300), "[ 1, %d ]" % n ] ])
+                    if len(rows) != 2*max(1, (i*200 + n) % 300):
+                        errors.append(len(rows))
+            except Exception as ex:
+                errors.append(ex)
+        threads = [ threading.Thread(target=expand, args=(i,)) for i in range(8) ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(errors, [])
+
+        # Only literals, no code
+        with self.assertRaises(Exception) as context:
+            getIterable("[ __import__('os').getcwd() ]")
+        print context.exception
+        with self.assertRaises(Exception):
+            getIterable("[ 1, 2 ] + [ 3 ]")
+
     
     def test_expand(self):
         rows = [
@@ -107,6 +141,34 @@ class TestRangeExpansion(unittest.TestCase):
             print row
         self.assertEqual(len(result), 4)
 
+    def test_iterExpanded(self):
+        rows = [
+           [ "Line 1",  "range(1, 12, 5)",  "  Neutrons",   "10" ],
+           [ "Line 2",  "47",  "Seconds",   "2" ],
+           [ "Line 3",  "range(3)",  "Seconds",  "range(2)" ],
+           [ "Line 4",  "[ 0, 90, 180]",  "[]",  "range(2,0,-1)" ],
+           ]
+        self.assertEqual(list(iterExpandedRanges(rows)), expandRanges(rows))
+
+        # Right-most cell changes fastest, empty ranges are cleared
+        rows = [ [ 1, "[ 'a', 'b' ]", "range(2, 0, 1)", "range(2)" ] ]
+        self.assertEqual(expandRanges(rows),
+                         [ [ 1, 'a', '', '0' ],
+                           [ 1, 'a', '', '1' ],
+                           [ 1, 'b', '', '0' ],
+                           [ 1, 'b', '', '1' ] ])
+        # List element that is again a range
+        self.assertEqual(expandRanges([ [ "[ 'range(2)', 5 ]" ] ]),
+                         [ [ '0' ], [ '1' ], [ '5' ] ])
+
+        # Rows are read as needed
+        def generateRows():
+            for i in range(1000000):
+                yield [ "Line %d" % i, "range(2)" ]
+        expanded = iterExpandedRanges(generateRows())
+        self.assertEqual([ expanded.next() for i in range(3) ],
+                         [ [ "Line 0", "0" ], [ "Line 0", "1" ], [ "Line 1", "0" ] ])
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,128 @@
+"""Unit test of the ScanMonitor
+
+   Uses the stand-in scan server, no real scan server required.
+"""
+import threading
+import time
+import unittest
+from scan.client import ScanClient
+from scan.client.scanmonitor import ScanMonitor, ScanListener, getScanMonitor
+from scan_server_stub import StubScanServer
+
+
+class RecordingListener(ScanListener):
+    def __init__(self):
+        self.events = list()
+
+    def scanAdded(self, info):
+        self.events.append(( 'added', info.id ))
+
+    def stateChanged(self, info, old_state):
+        self.events.append(( 'state', info.id, old_state, info.state ))
+
+    def progressChanged(self, info):
+        self.events.append(( 'progress', info.id, info.performed_work_units ))
+
+    def dataAdded(self, info, data, new_data):
+        self.events.append(( 'data', info.id, new_data['x']['value'] ))
+
+
+class ScanMonitorTest(unittest.TestCase):
+    def setUp(self):
+        self.server = StubScanServer()
+        self.server.start()
+        self.client = ScanClient('localhost', self.server.port)
+
+    def tearDown(self):
+        self.server.stop()
+
+    def testPoll(self):
+        monitor = ScanMonitor(self.client)
+        all_scans = RecordingListener()
+        one_scan = RecordingListener()
+        monitor.addListener(all_scans)
+
+        id = self.server.addScan('Test', state='Running')
+        other = self.server.addScan('Other', state='Idle')
+        monitor.addListener(one_scan, id)
+        self.assertTrue(monitor.poll())
+        self.assertEqual(all_scans.events, [ ('added', id), ('added', other) ])
+        self.assertEqual(one_scan.events, [ ('added', id) ])
+
+        # Nothing changed, only one request for all scans and one for last serial
+        requests = len(self.server.paths)
+        self.assertFalse(monitor.poll())
+        self.assertEqual(self.server.paths[requests:], [ '/scans', '/scan/%d/last_serial' % id ])
+
+        del all_scans.events[:]
+        del one_scan.events[:]
+        self.server.setState(id, 'Running', performed=1, total=2)
+        self.server.logSample(id, 'x', 1.0)
+        self.assertTrue(monitor.poll())
+        self.assertEqual(all_scans.events, [ ('progress', id, 1) ])
+        self.assertEqual(one_scan.events, [ ('progress', id, 1), ('data', id, [ 1.0 ]) ])
+
+        del one_scan.events[:]
+        self.server.logSample(id, 'x', 2.0)
+        self.server.setState(id, 'Finished', performed=2)
+        self.assertTrue(monitor.poll())
+        self.assertEqual(one_scan.events, [ ('state', id, 'Running', 'Finished'), ('progress', id, 2), ('data', id, [ 2.0 ]) ])
+
+        # Completed scan no longer polled for data
+        requests = len(self.server.paths)
+        self.assertFalse(monitor.poll())
+        self.assertEqual(self.server.paths[requests:], [ '/scans' ])
+
+    def testNewDataOnlyForChangedDevices(self):
+        monitor = ScanMonitor(self.client)
+        id = self.server.addScan('Test', state='Running')
+        received = list()
+        class DataListener(ScanListener):
+            def dataAdded(self, info, data, new_data):
+                received.append(new_data)
+        monitor.addListener(DataListener(), id)
+        self.server.logSample(id, 'x', 1.0)
+        self.server.logSample(id, 'y', 10.0)
+        monitor.poll()
+        self.assertEqual(sorted(received[-1].keys()), [ 'x', 'y' ])
+        self.server.logSample(id, 'x', 2.0)
+        monitor.poll()
+        self.assertEqual(received[-1].keys(), [ 'x' ])
+        self.assertEqual(received[-1]['x']['value'], [ 2.0 ])
+
+    def testConcurrentPolls(self):
+        monitor = ScanMonitor(self.client)
+        class SlowListener(RecordingListener):
+            def scanAdded(self, info):
+                RecordingListener.scanAdded(self, info)
+                time.sleep(0.01)
+        listener = SlowListener()
+        monitor.addListener(listener)
+        ids = [ self.server.addScan('Test%d' % i, state='Running') for i in range(20) ]
+        threads = [ threading.Thread(target=monitor.poll) for i in range(8) ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        # Each scan reported once, not once per polling thread
+        self.assertEqual(sorted(listener.events), [ ( 'added', id ) for id in ids ])
+
+    def testThread(self):
+        monitor = getScanMonitor('localhost', self.server.port)
+        self.assertTrue(monitor is getScanMonitor('localhost', self.server.port))
+        self.assertTrue(monitor.isRunning())
+        listener = RecordingListener()
+        id = self.server.addScan('Test', state='Running')
+        monitor.addListener(listener, id)
+        self.server.logSample(id, 'x', 1.0)
+        self.server.setState(id, 'Finished')
+        end = time.time() + 5
+        while time.time() < end  and  not ( 'data', id, [ 1.0 ] ) in listener.events:
+            time.sleep(0.1)
+        monitor.stop()
+        self.assertTrue(( 'data', id, [ 1.0 ] ) in listener.events)
+        self.assertFalse(monitor.isRunning())
+
+
+if __name__ == "__main__":
+    unittest.main()
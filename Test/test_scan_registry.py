@@ -0,0 +1,144 @@
+"""Unit test of the ScanRegistry
+
+   Uses the stand-in scan server, no real scan server required.
+"""
+import unittest
+from scan.client.scanclient import ScanClient
+from scan.client.scanregistry import ScanRegistry, contentHash
+from scan.commands import Comment, Delay, Loop, Set, CommandSequence
+from scan_server_stub import StubScanServer
+
+
+class ScanRegistryTest(unittest.TestCase):
+    def setUp(self):
+        self.server = StubScanServer()
+        self.server.start()
+        self.registry = ScanRegistry()
+        self.client = ScanClient('localhost', self.server.port, registry=self.registry)
+
+    def tearDown(self):
+        self.server.stop()
+
+    def testContentHash(self):
+        cmds = CommandSequence(Comment('Hello'), Loop('x', 1, 10, 1, Delay(1)))
+        same = CommandSequence([ Comment('Hello'), Loop('x', 1, 10, 1, Delay(1)) ])
+        other = CommandSequence(Comment('Hello'), Loop('x', 1, 10, 2, Delay(1)))
+        print cmds.contentHash()
+        self.assertEqual(cmds.contentHash(), same.contentHash())
+        self.assertNotEqual(cmds.contentHash(), other.contentHash())
+        self.assertEqual(cmds.contentHash(), contentHash(cmds.genSCN()))
+        self.assertEqual(CommandSequence(Comment(u'\u00b0C')).contentHash(),
+                         contentHash(CommandSequence(Comment(u'\u00b0C')).genSCN()))
+
+    def testFindQueued(self):
+        cmds = CommandSequence(Set('x', 1), Delay(1))
+        hash = cmds.contentHash()
+        self.assertEqual(self.client.findQueued(hash), None)
+
+        id = self.client.submit([ Set('x', 1), Delay(1) ], 'First')
+        self.assertEqual(self.client.findQueued(hash), id)
+        self.assertEqual(self.registry.getScanIDs(self.client._ScanClient__baseURL, hash), [ id ])
+
+        # Completed scans are not found
+        self.server.setState(id, 'Finished')
+        self.assertEqual(self.client.findQueued(hash), None)
+
+        # Scans that were removed from the server are forgotten
+        again = self.client.submit(cmds, 'Second')
+        self.assertEqual(self.client.findQueued(hash), again)
+        self.client.delete(id)
+        self.assertEqual(self.client.findQueued(hash), again)
+        self.server.setState(again, 'Aborted')
+        self.assertEqual(self.client.findQueued(hash), None)
+        self.assertEqual(self.registry.getScanIDs(self.client._ScanClient__baseURL, hash), [ again ])
+        self.server.setState(again, 'Idle')
+
+        # Other clients sharing the registry, but not other servers
+        client = ScanClient('localhost', self.server.port, registry=self.registry)
+        self.assertEqual(client.findQueued(hash), again)
+        client = ScanClient('127.0.0.1', self.server.port, registry=self.registry)
+        self.assertEqual(client.findQueued(hash), None)
+
+    def testResubmit(self):
+        cmds = CommandSequence(Set('x', 1), Delay(1))
+        with self.assertRaises(Exception):
+            self.client.resubmit(cmds.contentHash(), 'Unknown')
+
+        id = self.client.submit(cmds, 'First')
+        self.server.setState(id, 'Finished')
+        again = self.client.resubmit(cmds.contentHash(), 'Again')
+        self.assertNotEqual(id, again)
+        self.assertEqual(self.server.scans[again]['name'], 'Again')
+        self.assertEqual(self.server.scans[again]['commands'], cmds.genSCN())
+        self.assertEqual(self.client.findQueued(cmds.contentHash()), again)
+
+    def testMaxBytes(self):
+        registry = ScanRegistry(maxbytes=10)
+        registry.add('server', 'a', 1, '<a/>')
+        registry.add('server', 'b', 2, '<b/>')
+        self.assertEqual(registry.getBytes(), 8)
+        # Oldest XML is dropped, IDs are kept
+        registry.add('server', 'c', 3, '<c/>')
+        self.assertEqual(registry.getXML('server', 'a'), None)
+        self.assertEqual(registry.getScanIDs('server', 'a'), [ 1 ])
+        self.assertEqual(registry.getXML('server', 'c'), '<c/>')
+        self.assertEqual(registry.getBytes(), 8)
+        # Resubmitting keeps the XML
+        registry.add('server', 'b', 4, '<b/>')
+        registry.add('server', 'd', 5, '<d/>')
+        self.assertEqual(registry.getXML('server', 'b'), '<b/>')
+        self.assertEqual(registry.getXML('server', 'c'), None)
+        # XML that is too large is never kept
+        registry.add('server', 'e', 6, '<too_large/>')
+        self.assertEqual(registry.getXML('server', 'e'), None)
+        self.assertEqual(registry.getBytes(), 8)
+
+    def testResubmitWithoutXML(self):
+        client = ScanClient('localhost', self.server.port, registry=ScanRegistry(maxbytes=0))
+        cmds = CommandSequence(Set('x', 1), Delay(1))
+        id = client.submit(cmds, 'First')
+        # Commands are read from the server
+        again = client.resubmit(cmds.contentHash(), 'Again')
+        self.assertEqual(self.server.scans[again]['commands'], cmds.genSCN())
+        # .. unless the server no longer has them
+        client.delete(id)
+        client.delete(again)
+        with self.assertRaises(Exception):
+            client.resubmit(cmds.contentHash(), 'Unknown')
+
+    def testServerErrors(self):
+        registry = ScanRegistry(maxbytes=0)
+        client = ScanClient('localhost', self.server.port, registry=registry)
+        url = 'http://localhost:%d' % self.server.port
+        cmds = CommandSequence(Set('x', 1))
+        hash = cmds.contentHash()
+        id = client.submit(cmds, 'First')
+        # Server fails to reply, scan is kept
+        handle = self.server.handle
+        self.server.handle = lambda method, path, body: (503, '')
+        with self.assertRaises(Exception):
+            client.findQueued(hash)
+        with self.assertRaises(Exception):
+            client.resubmit(hash, 'Again')
+        self.server.handle = handle
+        self.assertEqual(registry.getScanIDs(url, hash), [ id ])
+        self.assertEqual(client.findQueued(hash), id)
+        # Server no longer knows the scan, so it is removed
+        client.delete(id)
+        self.assertEqual(client.findQueued(hash), None)
+        self.assertEqual(registry.getScanIDs(url, hash), [])
+
+    def testMaxSize(self):
+        registry = ScanRegistry(maxsize=2)
+        registry.add('server', 'a', 1, '<a/>')
+        registry.add('server', 'b', 2, '<b/>')
+        registry.add('server', 'a', 3, '<a/>')
+        registry.add('server', 'c', 4, '<c/>')
+        self.assertEqual(registry.getScanIDs('server', 'a'), [ 1, 3 ])
+        self.assertEqual(registry.getScanIDs('server', 'b'), [])
+        self.assertEqual(registry.getXML('server', 'b'), None)
+        self.assertEqual(registry.getXML('server', 'c'), '<c/>')
+
+
+if __name__ == "__main__":
+    unittest.main()
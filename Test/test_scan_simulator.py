@@ -0,0 +1,70 @@
+"""
+Unit test of the ScanSimulator
+"""
+import unittest
+from scan.commands import *
+from scan.util.scan_settings import ScanSettings
+from scan.util.simulation import ScanSimulator
+
+class RateSettings(ScanSettings):
+    def __init__(self):
+        super(RateSettings, self).__init__()
+        self.defineDeviceClass("motor.*", completion=True, rate=2.0)
+        self.defineDeviceClass("counter", comparison='increase by', rate=100.0)
+
+class ScanSimulatorTest(unittest.TestCase):
+    def setUp(self):
+        self.simulator = ScanSimulator(RateSettings(), { 'motor_x': 0.0, 'motor_y': 0.0 })
+
+    def simulate(self, cmds):
+        result = self.simulator.simulate(cmds)
+        print result['simulation']
+        print "%g seconds" % result['seconds']
+        return result
+
+    def testDelays(self):
+        result = self.simulate([ Comment('Start'), Delay(2), Sequence(Delay(1), Log('x')), Set('y', 'Text') ])
+        self.assertEqual(result['seconds'], 3.0)
+        self.assertEqual(result['simulation'].split('\n')[-1], "00:00:03 - Set 'y' = 'Text'")
+        # Raw XML
+        self.assertEqual(self.simulator.simulate(CommandSequence(Delay(2), Delay(3)).genSCN())['seconds'], 5.0)
+
+    def testRates(self):
+        # Completion: 10 units at 2 units/sec
+        self.assertEqual(self.simulate([ Set('motor_x', 10, completion=True) ])['seconds'], 5.0)
+        # No completion or readback, no wait
+        self.assertEqual(self.simulate([ Set('motor_x', 10) ])['seconds'], 0.0)
+        # Timeout limits the time
+        self.assertEqual(self.simulate([ Set('motor_x', 10, completion=True, timeout=3) ])['seconds'], 3.0)
+        # Unknown start value
+        self.assertEqual(self.simulate([ Set('motor_z', 10, completion=True), Set('motor_z', 12, completion=True) ])['seconds'], 1.0)
+        # Waiting for counter to increase by 1000 counts at 100 counts/sec
+        self.assertEqual(self.simulate([ Wait('counter', 1000, comparison='increase by') ])['seconds'], 10.0)
+        # Waiting for motor that's already there, then one that needs to move
+        self.assertEqual(self.simulate([ Wait('motor_x', 0), Wait('motor_y', 4, comparison='>=') ])['seconds'], 2.0)
+        # Parallel moves take as long as the slowest one
+        result = self.simulate([ Parallel(Set('motor_x', 4, completion=True), Set('motor_y', 8, completion=True)), Delay(1) ])
+        self.assertEqual(result['seconds'], 5.0)
+
+    def testLoops(self):
+        # Motor moves 0, 1, 2, 3, 4, taking 4 * 0.5 seconds, with 1 second delay at each step
+        result = self.simulate([ Loop('motor_x', 0, 4, 1, Delay(1), completion=True) ])
+        self.assertEqual(result['seconds'], 7.0)
+        result = self.simulate([ Loop('motor_x', 4, 0, -2, completion=True) ])
+        self.assertTrue("Set 'motor_x' = 2" in result['simulation'])
+
+        # Inner loop alternates direction, so it only moves back at the end
+        result = self.simulate([ Loop('motor_x', 0, 2, 1, Loop('motor_y', 0, 4, -1, completion=True), completion=True) ])
+        sets = [ line.split(' - ')[1].split(' (')[0] for line in result['simulation'].split('\n') ]
+        inner = [ float(line.split(' = ')[1]) for line in sets if 'motor_y' in line ]
+        self.assertEqual(inner, [ 4, 3, 2, 1, 0, 0, 1, 2, 3, 4, 4, 3, 2, 1, 0 ])
+        # 1 sec for outer loop, first move of inner loop from 0 to 4 takes 2 sec, then 3 * 4 * 0.5 sec
+        self.assertEqual(result['seconds'], 1.0 + 2.0 + 6.0)
+
+    def testIf(self):
+        result = self.simulate([ If('motor_x', '>', 5, Delay(10)), If('unknown', '>', 5, Delay(1)) ])
+        self.assertEqual(result['seconds'], 1.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
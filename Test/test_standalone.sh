@@ -33,6 +33,66 @@ then
     FAILED=`expr $FAILED + 1`
 fi
 
+python test_connection_pool.py
+if [ $? -ne 0 ]
+then
+    FAILED=`expr $FAILED + 1`
+fi
+
+python test_data_cursor.py
+if [ $? -ne 0 ]
+then
+    FAILED=`expr $FAILED + 1`
+fi
+
+python test_logdata.py
+if [ $? -ne 0 ]
+then
+    FAILED=`expr $FAILED + 1`
+fi
+
+python test_data_cache.py
+if [ $? -ne 0 ]
+then
+    FAILED=`expr $FAILED + 1`
+fi
+
+python test_async_client.py
+if [ $? -ne 0 ]
+then
+    FAILED=`expr $FAILED + 1`
+fi
+
+python test_wait.py
+if [ $? -ne 0 ]
+then
+    FAILED=`expr $FAILED + 1`
+fi
+
+python test_scan_monitor.py
+if [ $? -ne 0 ]
+then
+    FAILED=`expr $FAILED + 1`
+fi
+
+python test_optimizer.py
+if [ $? -ne 0 ]
+then
+    FAILED=`expr $FAILED + 1`
+fi
+
+python test_scan_simulator.py
+if [ $? -ne 0 ]
+then
+    FAILED=`expr $FAILED + 1`
+fi
+
+python test_scan_registry.py
+if [ $? -ne 0 ]
+then
+    FAILED=`expr $FAILED + 1`
+fi
+
 python -m doctest test_ndim.txt
 if [ $? -ne 0 ]
 then
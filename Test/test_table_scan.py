@@ -7,7 +7,7 @@
    @author: Kay Kasemir
 """
 import unittest
-from scan.commands import Set, Comment, Delay
+from scan.commands import Set, Comment, Delay, Log
 from scan.table import TableScan
 from scan.util import ScanSettings, setScanSettings
 from scan.commands.include import Include
@@ -331,6 +331,21 @@ class TableScanTest(unittest.TestCase):
         cmds = handle(table_scan)
         self.assertEqual(str(cmds), "[Set('X', 10.0), Delay(10), Log('neutrons', 'X')]")
 
+        # Log commands share their devices until more are added
+        table_scan = TableScan(
+          (   "X",  "Y", "Wait For", "Value", ),
+          [
+            [ "1",  "",  "seconds",  "10" ],
+            [ "2",  "",  "seconds",  "10" ],
+            [ "3",  "1", "seconds",  "10" ],
+          ],
+          log_always=[ 'neutrons', 'X' ]
+        )
+        cmds = handle(table_scan)
+        logs = [ cmd for cmd in cmds if isinstance(cmd, Log) ]
+        self.assertEqual([ str(log) for log in logs ], [ "Log('neutrons', 'X')", "Log('neutrons', 'X')", "Log('neutrons', 'X', 'Y')" ])
+        self.assertTrue(logs[0]._Log__devices is logs[1]._Log__devices)
+
     def testLoop(self):
         print "\n=== Loop Cells ==="
         # Plain loop commands
@@ -382,6 +397,49 @@ class TableScanTest(unittest.TestCase):
         cmds = handle(table_scan)
         self.assertEqual(str(cmds), "[Loop('X', 0, 3, 1, [ Set('Y', 1.0), Set('Camera', 'Snap') ]), Loop('X', 0, 3, 1, [ Set('Y', 2.0), Set('Camera', 'Snap') ])]")
 
+    def testCreateLoops(self):
+        print "\n=== Ranges as Loops ==="
+        table_scan = TableScan(
+          (   "Comment", "X",                  "Camera", "Wait For", "Value" ),
+          [
+            [ "Scan",    "range(1,100.1,0.1)", "Snap",   "seconds",  "10" ],
+          ]
+        )
+        cmds = table_scan.createScan(lineinfo=False, loops=True)
+        print cmds
+        self.assertEqual(str(cmds), "[Comment('Scan'), Loop('X', 1, 100.1, 0.1, [ Set('Camera', 'Snap'), Delay(10), Log('X', 'Camera') ])]")
+        # range(1,100.1,0.1) actually reaches 100.1 because of rounding errors
+        self.assertEqual(len(table_scan.createScan(lineinfo=False)), 992*5)
+
+        # Right-most list becomes loop, other list is still expanded
+        table_scan = TableScan(
+          (   "X",      "Y",         "Camera"),
+          [
+            [ "[1, 2]", "[ 0, 2, 4 ]", "Snap"],
+            [ "3",      "[ 1, 2, 4 ]", "Snap"],
+          ]
+        )
+        cmds = table_scan.createScan(lineinfo=False, loops=True)
+        self.assertEqual(str(cmds), "[Set('X', 1.0), Loop('Y', 0, 4, 2, [ Set('Camera', 'Snap') ]), " +
+                                    "Set('X', 2.0), Loop('Y', 0, 4, 2, [ Set('Camera', 'Snap') ]), " +
+                                    "Set('X', 3.0), Set('Y', 1.0), Set('Camera', 'Snap'), Set('X', 3.0), Set('Y', 2.0), Set('Camera', 'Snap'), " +
+                                    "Set('X', 3.0), Set('Y', 4.0), Set('Camera', 'Snap')]")
+
+        # Long integer values
+        table_scan = TableScan(( "X", ), [ [ "[ 1L, 2L, 3L ]" ] ])
+        self.assertEqual(str(table_scan.createScan(lineinfo=False, loops=True)), "[Loop('X', 1, 3, 1)]")
+        # .. but not when floating point loop cannot represent them
+        table_scan = TableScan(( "X", ), [ [ "[ 10000000000000000000, 10000000000000000001 ]" ] ])
+        self.assertEqual(len(table_scan.createScan(lineinfo=False, loops=True)), 2)
+
+        # Not possible after wait, loop, before loop, or for parallel device
+        for headers, row in ( ( ( "Wait For", "Value", "X" ), [ "seconds", "10", "range(3)" ] ),
+                              ( ( "X",  "Y" ),                [ "loop(3)", "range(3)" ] ),
+                              ( ( "X",  "Y" ),                [ "range(3)", "loop(0, 2, -1)" ] ),
+                              ( ( "+p X", "Y" ),              [ "range(3)", "1" ] ) ):
+            table_scan = TableScan(headers, [ row ])
+            self.assertEqual(str(table_scan.createScan(loops=True)), str(table_scan.createScan()))
+
     def testSpecialColumns(self):
         print "\n=== Special columns ==="
         
@@ -441,6 +499,45 @@ class TableScanTest(unittest.TestCase):
         self.assertEqual(str(cmds),
                          "[Parallel(Set('X', 0.0), Set('Y', 0.0)), Delay(60), Log('X', 'Y'), Parallel(Set('X', 1.0), Set('Y', 1.0)), Delay(60), Log('X', 'Y'), Parallel(Set('X', 2.0), Set('Y', 2.0)), Delay(60), Log('X', 'Y')]")
 
+    def testIterScan(self):
+        print "\n=== Generated Scan ==="
+        table_scan = TableScan(
+          (   "Comment", " X ",     "Y",        "Wait For", "Value" ),
+          [
+            [ "Start",   "range(3)", "[ 1, 2 ]", "seconds",  "10" ],
+            [ "",        "loop(3)",  "2",        "",         "" ],
+          ],
+          pre=Comment('Pre'), post=Comment('Post')
+        )
+        cmds = table_scan.iterScan()
+        self.assertEqual(str(cmds.next()), "Comment('Pre')")
+        self.assertEqual(str(cmds.next()), "Comment('# Line 1')")
+        self.assertEqual(str(cmds.next()), "Comment('Start')")
+        self.assertEqual(str(list(table_scan.iterScan())), str(table_scan.createScan()))
+        self.assertEqual(str(list(table_scan.iterScan(lineinfo=False))), str(table_scan.createScan(lineinfo=False)))
+        # Loop is complete when generated
+        self.assertEqual(str(list(table_scan.iterScan())[-3]), "Loop('X', 0, 3, 1, [ Set('Y', 2.0) ])")
+
+    def testConcurrentScans(self):
+        print "\n=== Concurrent Scans ==="
+        table_scan = TableScan(
+          (   "x", "y", "Wait For", "Value" ),
+          [
+            [ "1", "",  "counter",  "10" ],
+            [ "",  "2", "counter",  "20" ],
+            [ "",  "",  "counter",  "30" ],
+          ]
+        )
+        expected = str(table_scan.createScan())
+        # Each generator has its own state
+        a = table_scan.iterScan()
+        first = [ a.next() for i in range(8) ]
+        b = table_scan.iterScan()
+        b.next()
+        self.assertEqual(str(first + list(a)), expected)
+        self.assertEqual(str(list(table_scan.iterScan())), expected)
+        self.assertTrue(expected.endswith("Log('x', 'counter', 'y'), Comment('# End')]"))
+
     def testBadInput(self):
         print "\n=== Bad Input ==="
         
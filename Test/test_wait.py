@@ -0,0 +1,97 @@
+"""Unit test of waiting for several scans
+
+   Uses the stand-in scan server, no real scan server required.
+"""
+import threading
+import time
+import unittest
+from scan.client import ScanClient
+from scan_server_stub import StubScanServer
+
+
+class WaitTest(unittest.TestCase):
+    def setUp(self):
+        self.server = StubScanServer()
+        self.server.start()
+        self.client = ScanClient('localhost', self.server.port)
+
+    def tearDown(self):
+        self.server.stop()
+
+    def finishLater(self, delay, *states):
+        """Set states ( id, state ) of scans after delay"""
+        def finish():
+            time.sleep(delay)
+            for id, state in states:
+                self.server.setState(id, state)
+        thread = threading.Thread(target=finish)
+        thread.start()
+        return thread
+
+    def testAllDone(self):
+        ids = [ self.server.addScan('Test%d' % i, state='Running') for i in range(5) ]
+        thread = self.finishLater(0.3, ( ids[0], 'Finished' ), ( ids[1], 'Failed' ))
+        reported = list()
+        infos = self.client.waitUntilAnyDone(ids, callback=reported.append, poll=0.05)
+        thread.join()
+        self.assertTrue(ids[0] in infos  and  ids[1] in infos)
+        self.assertEqual(sorted([ info.id for info in reported ]), ids[:2])
+
+        thread = self.finishLater(0.3, *[ ( id, 'Finished' ) for id in ids[2:] ])
+        del reported[:]
+        infos = self.client.waitUntilAllDone(ids, callback=reported.append, poll=0.05)
+        thread.join()
+        self.assertEqual(sorted(infos.keys()), ids)
+        self.assertEqual(infos[ids[1]].state, 'Failed')
+        self.assertEqual(len(reported), 5)
+
+        # All scans were checked via /scans, not one by one
+        self.assertFalse(any([ path.startswith('/scan/') for path in self.server.paths ]))
+
+    def testBackoff(self):
+        id = self.server.addScan('Test', state='Running')
+        thread = self.finishLater(1.0, ( id, 'Finished' ))
+        self.client.waitUntilAllDone([ id ], poll=0.01, max_poll=0.5)
+        thread.join()
+        # Without backoff, would poll ~100 times
+        polls = self.server.paths.count('/scans')
+        print "Polls: %d" % polls
+        self.assertTrue(polls < 15)
+
+    def testUnlistedScanError(self):
+        id = self.server.addScan('Test', state='Running')
+        # Hide scan from /scans, and fail the first request for it
+        handle = self.server.handle
+        failures = [ 500 ]
+        def unlisted(method, path, body):
+            if path == '/scans':
+                return (200, '<scans></scans>')
+            if path == '/scan/%d' % id  and  failures:
+                return (failures.pop(), '')
+            return handle(method, path, body)
+        self.server.handle = unlisted
+        thread = self.finishLater(0.3, ( id, 'Finished' ))
+        infos = self.client.waitUntilAllDone([ id ], poll=0.05)
+        thread.join()
+        self.assertEqual(infos[id].state, 'Finished')
+        self.assertEqual(failures, [])
+
+    def testDuplicates(self):
+        ids = [ self.server.addScan('Test%d' % i, state='Running') for i in range(2) ]
+        thread = self.finishLater(0.3, ( ids[0], 'Finished' ), ( ids[1], 'Finished' ))
+        reported = list()
+        infos = self.client.waitUntilAllDone([ ids[0], ids[0], ids[1] ], callback=reported.append, poll=0.05)
+        thread.join()
+        self.assertEqual(sorted(infos.keys()), ids)
+        self.assertEqual(len(reported), 2)
+        self.assertEqual(self.client.waitUntilAnyDone([ ids[1], ids[1] ]).keys(), [ ids[1] ])
+
+    def testUnknown(self):
+        with self.assertRaises(Exception) as context:
+            self.client.waitUntilAllDone([ 42 ])
+        print context.exception
+        self.assertEqual(self.client.waitUntilAnyDone([]), {})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,3 +1,7 @@
 from scanclient import ScanClient
-from logdata import getDatetime, iterateSamples, iterateTable, createTable
-from data import Data, getTimeSeries, alignSerial, getTable
\ No newline at end of file
+from asyncclient import AsyncScanClient
+from datacursor import DataCursor
+from datacache import DataCache
+from scanmonitor import ScanMonitor, ScanListener, getScanMonitor
+from logdata import getDatetime, iterateSamples, iterateTable, createTable, getLastSerial
+from data import Data, getTimeSeries, alignSerial, alignTime, resample, getTable, getTimeTable
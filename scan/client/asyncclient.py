@@ -0,0 +1,362 @@
+"""Asynchronous Scan Client
+
+Issues requests to the scan server without blocking the caller.
+Calls return a :class:`ScanFuture` for the result.
+They are executed by a small, shared set of worker threads,
+so supervising many scans does not require a thread per scan.
+"""
+
+import heapq
+import itertools
+import sys
+import threading
+import time
+from scan.client.scanclient import ScanClient
+
+class ScanFuture(object):
+    """Result of an asynchronous call
+
+    Example:
+
+    >>> future = client.scanInfo(id)
+    >>> # .. do something else ..
+    >>> info = future.result()
+    """
+    def __init__(self):
+        self.__condition = threading.Condition()
+        self.__done = False
+        self.__result = None
+        self.__error = None
+        self.__callbacks = list()
+
+    def done(self):
+        """:return: `True` when result or error is available"""
+        with self.__condition:
+            return self.__done
+
+    def __wait(self, timeout):
+        """Wait until done. Must be called with condition held."""
+        if timeout is None:
+            while not self.__done:
+                self.__condition.wait()
+        else:
+            end = time.time() + timeout
+            while not self.__done:
+                remaining = end - time.time()
+                if remaining <= 0:
+                    raise Exception("Timeout waiting for result")
+                self.__condition.wait(remaining)
+
+    def result(self, timeout=None):
+        """Wait for result
+
+        :param timeout: Seconds to wait, `None` to wait forever
+        :return: Result of the call
+        :raise Exception: Error raised by the call, or timeout
+        """
+        with self.__condition:
+            self.__wait(timeout)
+            if self.__error is not None:
+                raise self.__error[0], self.__error[1], self.__error[2]
+            return self.__result
+
+    def exception(self, timeout=None):
+        """Wait for call to complete
+
+        :param timeout: Seconds to wait, `None` to wait forever
+        :return: Error raised by the call or `None`
+        """
+        with self.__condition:
+            self.__wait(timeout)
+            return None if self.__error is None else self.__error[1]
+
+    def addDoneCallback(self, callback):
+        """Register callback for completion
+
+        :param callback: Function that is called with this future
+                         once it is done.
+                         Called right away when already done,
+                         otherwise on the thread that completes the call.
+        """
+        with self.__condition:
+            if not self.__done:
+                self.__callbacks.append(callback)
+                return
+        callback(self)
+
+    def setResult(self, result):
+        """Complete the call with a result"""
+        self.__complete(result, None)
+
+    def setException(self, error):
+        """Complete the call with an error
+
+        :param error: Exception or `sys.exc_info()` tuple
+        """
+        if not isinstance(error, tuple):
+            error = ( type(error), error, None )
+        self.__complete(None, error)
+
+    def __complete(self, result, error):
+        with self.__condition:
+            if self.__done:
+                raise Exception("Result already set")
+            self.__result = result
+            self.__error = error
+            self.__done = True
+            self.__condition.notifyAll()
+            callbacks = self.__callbacks
+            self.__callbacks = list()
+        for callback in callbacks:
+            try:
+                callback(self)
+            except:
+                pass
+
+    def __repr__(self):
+        if not self.done():
+            return "ScanFuture(pending)"
+        if self.__error is not None:
+            return "ScanFuture(error %s)" % repr(self.__error[1])
+        return "ScanFuture(%s)" % repr(self.__result)
+
+
+class Executor(object):
+    """Runs calls on a fixed number of worker threads
+
+    Calls can be delayed, which allows periodic checks
+    without blocking a thread while waiting.
+
+    :param workers: Number of worker threads
+    """
+    def __init__(self, workers=4):
+        self.__condition = threading.Condition()
+        # Heap of ( due time, sequence, task )
+        self.__tasks = list()
+        self.__sequence = itertools.count()
+        self.__running = True
+        self.__threads = list()
+        for i in range(workers):
+            thread = threading.Thread(target=self.__run, name="ScanExecutor%d" % i)
+            thread.setDaemon(True)
+            thread.start()
+            self.__threads.append(thread)
+
+    def schedule(self, delay, task):
+        """Schedule a task
+
+        :param delay: Seconds from now when the task should run
+        :param task: Function without arguments.
+                     Must handle its own errors.
+        """
+        with self.__condition:
+            if not self.__running:
+                raise Exception("Executor has been shut down")
+            heapq.heappush(self.__tasks, ( time.time() + delay, self.__sequence.next(), task ))
+            self.__condition.notify()
+
+    def submit(self, call, *args, **kwargs):
+        """Submit a call
+
+        :param call: Function to call with args and kwargs
+        :return: :class:`ScanFuture` for the result of the call
+        """
+        future = ScanFuture()
+        def task():
+            try:
+                result = call(*args, **kwargs)
+            except:
+                future.setException(sys.exc_info())
+            else:
+                future.setResult(result)
+        self.schedule(0, task)
+        return future
+
+    def shutdown(self, wait=True):
+        """Stop worker threads
+
+        Pending tasks are dropped.
+
+        :param wait: Wait for tasks that are currently running?
+        """
+        with self.__condition:
+            self.__running = False
+            self.__tasks = list()
+            self.__condition.notifyAll()
+        if wait:
+            for thread in self.__threads:
+                if thread is not threading.currentThread():
+                    thread.join()
+
+    def __run(self):
+        while True:
+            with self.__condition:
+                while True:
+                    if not self.__running:
+                        return
+                    if self.__tasks:
+                        delay = self.__tasks[0][0] - time.time()
+                        if delay <= 0:
+                            task = heapq.heappop(self.__tasks)[2]
+                            break
+                        self.__condition.wait(delay)
+                    else:
+                        self.__condition.wait()
+            try:
+                task()
+            except:
+                pass
+
+
+__default_executor = None
+__default_lock = threading.Lock()
+
+def getDefaultExecutor():
+    """:return: :class:`Executor` shared by all clients that don't provide their own"""
+    global __default_executor
+    with __default_lock:
+        if __default_executor is None:
+            __default_executor = Executor()
+        return __default_executor
+
+
+class AsyncScanClient(object):
+    """Asynchronous client interface to the scan server
+
+    Offers the calls of :class:`~scan.client.scanclient.ScanClient`,
+    but instead of blocking until the server replies, each call
+    returns a :class:`ScanFuture` for the result.
+
+    :param host: The IP address or name of scan server host.
+    :param port: The TCP port of the scan server.
+    :param pool: :class:`~scan.client.connectionpool.ConnectionPool`
+                 for persistent connections to the server.
+    :param executor: :class:`Executor` that runs the calls.
+                     By default, all clients share one executor.
+    :param cache: Optional :class:`~scan.client.datacache.DataCache`
+
+    Example:
+
+    >>> client = AsyncScanClient('localhost')
+    >>> futures = [ client.waitUntilDone(client.submit(cmds, name).result()) for name in names ]
+    >>> infos = [ future.result() for future in futures ]
+    """
+    def __init__(self, host='localhost', port=4810, pool=None, executor=None, cache=None):
+        self.__client = ScanClient(host, port, pool, cache)
+        self.__executor = executor
+
+    def __submit(self, call, *args, **kwargs):
+        executor = self.__executor
+        if executor is None:
+            executor = getDefaultExecutor()
+        return executor.submit(call, *args, **kwargs)
+
+    def getClient(self):
+        """:return: :class:`~scan.client.scanclient.ScanClient` used to perform the calls"""
+        return self.__client
+
+    def serverInfo(self):
+        """:return: :class:`ScanFuture` for :func:`~scan.client.scanclient.ScanClient.serverInfo`"""
+        return self.__submit(self.__client.serverInfo)
+
+    def simulate(self, cmds):
+        """:return: :class:`ScanFuture` for :func:`~scan.client.scanclient.ScanClient.simulate`"""
+        return self.__submit(self.__client.simulate, cmds)
+
+    def submit(self, cmds, name='UnNamed', queue=True):
+        """:return: :class:`ScanFuture` for :func:`~scan.client.scanclient.ScanClient.submit`"""
+        return self.__submit(self.__client.submit, cmds, name, queue)
+
+    def findQueued(self, content_hash):
+        """:return: :class:`ScanFuture` for :func:`~scan.client.scanclient.ScanClient.findQueued`"""
+        return self.__submit(self.__client.findQueued, content_hash)
+
+    def resubmit(self, content_hash, name='UnNamed', queue=True):
+        """:return: :class:`ScanFuture` for :func:`~scan.client.scanclient.ScanClient.resubmit`"""
+        return self.__submit(self.__client.resubmit, content_hash, name, queue)
+
+    def scanInfos(self, timeout=20):
+        """:return: :class:`ScanFuture` for :func:`~scan.client.scanclient.ScanClient.scanInfos`"""
+        return self.__submit(self.__client.scanInfos, timeout)
+
+    def scanInfo(self, scanID, timeout=10):
+        """:return: :class:`ScanFuture` for :func:`~scan.client.scanclient.ScanClient.scanInfo`"""
+        return self.__submit(self.__client.scanInfo, scanID, timeout)
+
+    def scanCmds(self, scanID):
+        """:return: :class:`ScanFuture` for :func:`~scan.client.scanclient.ScanClient.scanCmds`"""
+        return self.__submit(self.__client.scanCmds, scanID)
+
+    def lastSerial(self, scanID):
+        """:return: :class:`ScanFuture` for :func:`~scan.client.scanclient.ScanClient.lastSerial`"""
+        return self.__submit(self.__client.lastSerial, scanID)
+
+    def getData(self, scanID, compact=False):
+        """:return: :class:`ScanFuture` for :func:`~scan.client.scanclient.ScanClient.getData`"""
+        return self.__submit(self.__client.getData, scanID, compact)
+
+    def getDataSince(self, scanID, serial, data=None, compact=False):
+        """:return: :class:`ScanFuture` for :func:`~scan.client.scanclient.ScanClient.getDataSince`"""
+        return self.__submit(self.__client.getDataSince, scanID, serial, data, compact)
+
+    def pause(self, scanID=-1):
+        """:return: :class:`ScanFuture` for :func:`~scan.client.scanclient.ScanClient.pause`"""
+        return self.__submit(self.__client.pause, scanID)
+
+    def resume(self, scanID=-1):
+        """:return: :class:`ScanFuture` for :func:`~scan.client.scanclient.ScanClient.resume`"""
+        return self.__submit(self.__client.resume, scanID)
+
+    def abort(self, scanID=-1):
+        """:return: :class:`ScanFuture` for :func:`~scan.client.scanclient.ScanClient.abort`"""
+        return self.__submit(self.__client.abort, scanID)
+
+    def delete(self, scanID):
+        """:return: :class:`ScanFuture` for :func:`~scan.client.scanclient.ScanClient.delete`"""
+        return self.__submit(self.__client.delete, scanID)
+
+    def clear(self):
+        """:return: :class:`ScanFuture` for :func:`~scan.client.scanclient.ScanClient.clear`"""
+        return self.__submit(self.__client.clear)
+
+    def waitUntilDone(self, scanID, poll=1.0):
+        """Wait until scan finishes.
+
+        Like :func:`~scan.client.scanclient.ScanClient.waitUntilDone`,
+        but no thread is blocked while waiting.
+        The scan state is checked every `poll` seconds.
+
+        :param scanID: ID of scan on which to wait
+        :param poll: Seconds between checks
+
+        :return: :class:`ScanFuture` for the scan info,
+                 or the error if scan was aborted or failed.
+        """
+        executor = self.__executor
+        if executor is None:
+            executor = getDefaultExecutor()
+        future = ScanFuture()
+        def reschedule():
+            try:
+                executor.schedule(poll, check)
+            except Exception as ex:
+                # Executor was shut down
+                future.setException(ex)
+        def check():
+            try:
+                info = self.__client.scanInfo(scanID)
+            except:
+                # Keep checking while disconnected/timed out
+                reschedule()
+                return
+            if info.state in ( 'Aborted', 'Failed' ):
+                future.setException(Exception(str(info)))
+            elif info.isDone():
+                future.setResult(info)
+            else:
+                reschedule()
+        executor.schedule(0, check)
+        return future
+
+    def __repr__(self):
+        return "Async" + repr(self.__client)
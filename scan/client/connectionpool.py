@@ -0,0 +1,203 @@
+"""HTTP Connection Pool
+
+Keeps HTTP/1.1 connections to the scan server open
+between requests, so that repeated REST calls
+like `scanInfo` or `lastSerial` do not each pay
+for a new TCP connection setup and teardown.
+"""
+
+import httplib
+import select
+import socket
+import threading
+import time
+
+class ConnectionPool(object):
+    """Pool of persistent HTTP connections
+
+    Idle connections are kept per host and port,
+    re-used by the next request to that server,
+    and closed once they have been idle for too long.
+    Safe to use from multiple threads.
+
+    :param maxsize:      Maximum number of idle connections kept per host and port.
+                         When more connections were opened for concurrent requests,
+                         the surplus is closed as they are released.
+    :param idle_timeout: Seconds after which an idle connection is closed.
+
+    Example:
+
+    >>> pool = ConnectionPool(maxsize=2)
+    >>> client = ScanClient('localhost', pool=pool)
+    """
+
+    # Methods that may safely be repeated when a re-used connection
+    # turns out to have been closed by the server
+    __idempotent = ( 'GET', 'PUT', 'DELETE' )
+
+    def __init__(self, maxsize=4, idle_timeout=30.0):
+        self.__maxsize = maxsize
+        self.__idle_timeout = idle_timeout
+        self.__lock = threading.Lock()
+        # (host, port) -> [ (connection, time of release), ... ], most recent last
+        self.__idle = dict()
+
+    def __evict(self, idle, now):
+        """Remove expired entries from list of idle connections.
+
+        Must be called with lock held.
+
+        :return: List of connections that need to be closed
+        """
+        expired = [ conn for (conn, released) in idle if now - released > self.__idle_timeout ]
+        if expired:
+            idle[:] = [ entry for entry in idle if now - entry[1] <= self.__idle_timeout ]
+        return expired
+
+    def __isAlive(self, conn):
+        """Check if idle connection is still usable
+
+        An idle connection should not have anything to read.
+        If it does, the server has closed it or sent garbage.
+        """
+        if conn.sock is None:
+            return False
+        try:
+            readable = select.select([ conn.sock ], [], [], 0)[0]
+        except (select.error, socket.error, ValueError):
+            return False
+        return not readable
+
+    def __acquire(self, host, port, timeout):
+        """Get idle connection or create new one
+
+        :return: (connection, re-used?)
+        """
+        now = time.time()
+        conn = None
+        with self.__lock:
+            idle = self.__idle.get((host, port))
+            if idle:
+                expired = self.__evict(idle, now)
+                if idle:
+                    conn = idle.pop()[0]
+            else:
+                expired = []
+        for old in expired:
+            old.close()
+
+        if timeout is None:
+            timeout = socket.getdefaulttimeout()
+        if conn is not None  and  self.__isAlive(conn):
+            conn.timeout = timeout
+            conn.sock.settimeout(timeout)
+            return (conn, True)
+        if conn is not None:
+            conn.close()
+        conn = httplib.HTTPConnection(host, port, timeout=timeout)
+        conn.connect()
+        # Small request/response exchanges on a persistent connection
+        # would otherwise be delayed by Nagle's algorithm
+        conn.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        return (conn, False)
+
+    def __release(self, host, port, conn):
+        """Return connection to pool for re-use"""
+        now = time.time()
+        with self.__lock:
+            idle = self.__idle.setdefault((host, port), list())
+            expired = self.__evict(idle, now)
+            if len(idle) < self.__maxsize:
+                idle.append((conn, now))
+            else:
+                expired.append(conn)
+        for old in expired:
+            old.close()
+
+    def request(self, host, port, method, path, body=None, headers=dict(), timeout=None, consume=None):
+        """Perform HTTP request
+
+        :param host:    Host name
+        :param port:    TCP port
+        :param method:  'GET', 'PUT', ...
+        :param path:    Path and query of the URL
+        :param body:    Optional data to send, either a string
+                        or an iterable of strings which are sent
+                        with chunked transfer encoding as they are produced
+        :param headers: Dictionary of additional request headers
+        :param timeout: Timeout in seconds, `None` for default socket timeout
+        :param consume: Optional function that is called with the file-like
+                        response to read and decode it while it is received.
+                        May be called again if the request needs to be repeated.
+                        By default, the complete response is read into a string.
+
+        :return: (status, reason, data) of the response,
+                 where data is the result of `consume` for successful requests
+        :raise socket.error, httplib.HTTPException: On communication errors
+        """
+        chunked = body is not None  and  not isinstance(body, basestring)
+        while True:
+            (conn, reused) = self.__acquire(host, port, timeout)
+            try:
+                if chunked:
+                    self.__sendChunked(conn, method, path, body, headers)
+                else:
+                    conn.request(method, path, body, headers)
+                response = conn.getresponse()
+                if consume is not None  and  response.status < 300:
+                    data = consume(response)
+                    # Drain whatever the consumer left unread
+                    response.read()
+                else:
+                    data = response.read()
+            except (httplib.HTTPException, socket.error):
+                conn.close()
+                # A re-used connection may have been closed by the server
+                # after passing the __isAlive() check. Retry on a new connection,
+                # but only for requests that are safe to repeat.
+                # A chunked body can't be sent again.
+                if reused  and  method in ConnectionPool.__idempotent  and  not chunked:
+                    continue
+                raise
+            except:
+                # Consumer failed, remaining response is unusable
+                conn.close()
+                raise
+            if response.will_close:
+                conn.close()
+            else:
+                self.__release(host, port, conn)
+            return (response.status, response.reason, data)
+
+    def __sendChunked(self, conn, method, path, body, headers):
+        """Send request with chunked transfer encoding
+
+        :param body: Iterable of strings
+        """
+        conn.putrequest(method, path)
+        for header, value in headers.items():
+            conn.putheader(header, value)
+        conn.putheader('Transfer-Encoding', 'chunked')
+        conn.endheaders()
+        for chunk in body:
+            if chunk:
+                conn.send('%x\r\n%s\r\n' % (len(chunk), chunk))
+        conn.send('0\r\n\r\n')
+
+    def idleCount(self, host, port):
+        """:return: Number of idle connections for host and port"""
+        with self.__lock:
+            return len(self.__idle.get((host, port), ()))
+
+    def clear(self):
+        """Close all idle connections"""
+        with self.__lock:
+            idle = self.__idle
+            self.__idle = dict()
+        for entries in idle.values():
+            for (conn, released) in entries:
+                conn.close()
+
+
+# Pool shared by all ScanClient instances that don't provide their own
+default_pool = ConnectionPool()
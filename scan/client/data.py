@@ -8,6 +8,8 @@ try:
 except:
     import xml.etree.ElementTree as ET
 from datetime import  datetime
+from itertools import izip
+from scan.client.logdata import numpy, _asNumPy, _alignIDs, _selectValues, iterateTable
 
 def getTimeSeries(data, name, convert='plain'):
     '''Get values aligned by different types of time.
@@ -51,19 +53,126 @@ def alignSerial(data, channel):
         yield (data[channel]['id'][i], data[channel]['value'][i], data[channel]['time'][i])
 
 
-##TODO: step
 def alignTime(data, channel, intv = 0):
-    
     '''
     Iterate data by time.
                           
     :param: channel: Name of channel(device) needed to be iterate.
+    :param: intv: Time interval in milliseconds.
+                  0 for every sample, otherwise the last sample in each interval.
     
-    :return: Iterator object.   
+    :return: Iterator object for ( (time1, value1), (time2, value2), ...)
     '''
-    R = range(len(data[channel]['time']))
-    for i in iter(R):
-        yield (data[channel]['time'][i], data[channel]['value'][i])
+    if intv > 0:
+        for sample in resample(data, channel, intv):
+            yield sample
+    else:
+        for sample in izip(data[channel]['time'], data[channel]['value']):
+            yield sample
+
+
+__aggregates = ( 'last', 'mean', 'min', 'max', 'count' )
+
+def resample(data, channel, intv, aggregate='last'):
+    '''Resample data of a channel into time intervals
+    
+    Streams through the samples once,
+    only keeping the state of the current interval.
+    Intervals are aligned to multiples of `intv`
+    since the epoch, so all channels use the same intervals.
+    Assumes that the time stamps of a channel are ascending.
+    
+    :param channel:   Name of channel(device)
+    :param intv:      Time interval in milliseconds
+    :param aggregate: How to combine the samples in each interval:
+                      'last' value, 'mean', 'min' or 'max' of the numeric values,
+                      or 'count' of samples.
+    
+    :return: Iterator for ( (time1, value1), (time2, value2), ...)
+             with start time of each interval that has samples.
+             'mean', 'min' and 'max' ignore text values, resulting in None when
+             an interval has no numeric values.
+
+    Example:
+    
+    >>> # One value per second
+    >>> for time, value in resample(data, 'signal', 1000, 'mean'):
+    ...     print getDatetime(time), value
+    '''
+    if intv <= 0:
+        raise ValueError("Interval must be positive, got %s" % str(intv))
+    if aggregate not in __aggregates:
+        raise ValueError("Unknown aggregate '%s', expecting one of %s" % (aggregate, ', '.join(__aggregates)))
+    numeric = aggregate in ( 'mean', 'min', 'max' )
+    start = None
+    for time, value in izip(data[channel]['time'], data[channel]['value']):
+        bucket = time // intv * intv
+        if bucket != start:
+            if start is not None:
+                yield ( start, __aggregate(aggregate, last, count, numbers, total, low, high) )
+            start = bucket
+            count = numbers = 0
+            total = 0.0
+            low = high = None
+        count += 1
+        last = value
+        if numeric  and  isinstance(value, ( int, long, float ))  and  not isinstance(value, bool):
+            numbers += 1
+            total += value
+            if low is None:
+                low = high = value
+            elif value < low:
+                low = value
+            elif value > high:
+                high = value
+    if start is not None:
+        yield ( start, __aggregate(aggregate, last, count, numbers, total, low, high) )
+
+
+def __aggregate(aggregate, last, count, numbers, total, low, high):
+    '''Value of one interval for resample()'''
+    if aggregate == 'last':
+        return last
+    if aggregate == 'count':
+        return count
+    if low is None:
+        # No numeric values
+        return None
+    if aggregate == 'min':
+        return low
+    if aggregate == 'max':
+        return high
+    return total / numbers
+
+
+def getTimeTable(data, intv, *devices, **kwargs):
+    '''Create data table aligned by time
+    
+    Resamples each device into time intervals,
+    then aligns the devices by interval.
+    Like :func:`getTable`, a device without a sample in an interval
+    repeats its previous value, or None before its first sample.
+    
+    :param intv:    Time interval in milliseconds
+    :param devices: One or more devices
+    :param kwargs:  aggregate='last', 'mean', 'min', 'max' or 'count',
+                    see :func:`resample`
+    
+    :return: Table. result[0] holds the start time of each interval,
+                    then the values for first device, for second device and so on.
+    '''
+    aggregate = kwargs['aggregate'] if 'aggregate' in kwargs else 'last'
+    # Use start time of interval as 'sample ID' for iterateTable,
+    # passing (time, value) as the value to get the time of each row
+    iters = [ ( (sample[0], sample[0], sample) for sample in resample(data, dev, intv, aggregate) )
+              for dev in devices ]
+    result = [ [] for i in range(len(devices) + 1) ]
+    for row in iterateTable(*iters):
+        # Devices with a sample in this interval have the latest time
+        result[0].append(max(sample[0] for sample in row if sample is not None))
+        for i in range(len(devices)):
+            result[i+1].append(None if row[i] is None else row[i][1])
+    return result
 
 
 def getTable(data, *devices, **kwargs):
@@ -72,6 +181,7 @@ def getTable(data, *devices, **kwargs):
     Aligns samples for given list of devices by sample ID.
     Assuming that serialID in data is Ascending.
     Ignoring the serialID 'gap'.
+    When NumPy is available, the alignment uses vectorized operations.
                           
     :param devices: One or more devices
     :param kwargs:  with_id=True to add sample serial id,
@@ -84,6 +194,11 @@ def getTable(data, *devices, **kwargs):
     with_id = kwargs['with_id'] if 'with_id' in kwargs else False
     with_time = kwargs['with_time'] if 'with_time' in kwargs else False
     
+    if numpy is not None:
+        result = _getTableNumPy(data, devices, with_id, with_time)
+        if result is not None:
+            return result
+
     devsIters = [ alignSerial(data, dev) for dev in devices]  # prepare devices iterators 
     cur_samps = [devIt.next() for devIt in devsIters]  # initial devices iterators  
     result = [[] for dev in devices]
@@ -131,6 +246,40 @@ def getTable(data, *devices, **kwargs):
     return result 
 
 
+def _getTableNumPy(data, devices, with_id, with_time):
+    '''Implementation of getTable with NumPy
+
+    :return: Table or None if data cannot be aligned with NumPy
+    '''
+    if len(devices) < 1:
+        return None
+    aligned = _alignIDs(data, devices)
+    if aligned is None:
+        return None
+    ids, indices = aligned
+    result = [ _selectValues(data[dev]['value'], index) for dev, index in zip(devices, indices) ]
+    if with_time:
+        # Time of each row is the latest time of the samples
+        # that the devices have for this or a later row
+        dev_times = [ _asNumPy(data[dev]['time']) for dev in devices ]
+        dtype = numpy.result_type(*[ t for t in dev_times if len(t) > 0 ] or [ numpy.int64 ])
+        times = numpy.zeros(len(ids), dtype=dtype)
+        have_time = numpy.zeros(len(ids), dtype=bool)
+        for dev, t in zip(devices, dev_times):
+            if len(t) < 1:
+                continue
+            pending = numpy.searchsorted(_asNumPy(data[dev]['id'], numpy.int64), ids, side='left')
+            valid = pending < len(t)
+            t = t[numpy.minimum(pending, len(t)-1)]
+            later = valid & (~have_time | (t > times))
+            times[later] = t[later]
+            have_time |= valid
+        result.insert(0, times.tolist())
+    if with_id:
+        result.insert(0, ids.tolist())
+    return result
+
+
 class Data(object):
     '''
     classdocs
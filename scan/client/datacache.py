@@ -0,0 +1,260 @@
+"""Data Cache
+
+Keeps the logged data of completed scans on disk.
+
+Each scan is stored in one file.
+A small header describes the devices and their columns,
+followed by the raw machine values of the numeric columns,
+so loading a scan copies memory-mapped bytes into arrays
+instead of downloading and parsing XML.
+The data is copied, the arrays are not backed by the file.
+"""
+
+import marshal
+import os
+import re
+import struct
+import sys
+import tempfile
+from array import array
+from scan.client.logdata import INT64_TYPE
+
+try:
+    import mmap
+except ImportError:
+    # Not available in Jython, read file instead
+    mmap = None
+
+class DataCache(object):
+    """On-disk cache for the logged data of completed scans
+
+    Scans are identified by server host, port, scan ID and
+    creation time, since scan IDs are re-used when a scan server restarts.
+    Only data of scans that are done is cached,
+    because the data of an active scan may still change.
+    When the total size of cached files exceeds `maxsize`,
+    the least recently used scans are removed.
+
+    :param directory: Directory for cached files,
+                      default is `.scan_data_cache` in the user's home directory
+    :param maxsize:   Maximum total size of cached files in bytes
+
+    Example:
+
+    >>> client = ScanClient('localhost', cache=DataCache())
+    >>> data = client.getData(id)
+    """
+
+    # File name extension and header of cached files
+    __suffix = '.scandata'
+    __magic = 'SCANDAT1'
+
+    def __init__(self, directory=None, maxsize=500*1024*1024):
+        if directory is None:
+            directory = os.path.join(os.path.expanduser('~'), '.scan_data_cache')
+        self.__directory = directory
+        self.__maxsize = maxsize
+        if not os.path.isdir(directory):
+            os.makedirs(directory)
+
+    def getDirectory(self):
+        """:return: Directory that holds cached files"""
+        return self.__directory
+
+    def __filename(self, host, port, info):
+        """File name for a scan"""
+        host = re.sub(r'[^A-Za-z0-9.-]', '_', host)
+        return os.path.join(self.__directory, "%s_%d_%d_%d%s" % (host, port, info.id, info.created, self.__suffix))
+
+    def __files(self):
+        """:return: [ (last access, size, filename), ... ] for all cached files"""
+        result = list()
+        for name in os.listdir(self.__directory):
+            if name.endswith(self.__suffix):
+                filename = os.path.join(self.__directory, name)
+                try:
+                    stat = os.stat(filename)
+                except OSError:
+                    # Removed by other process
+                    continue
+                result.append(( stat.st_mtime, stat.st_size, filename ))
+        return result
+
+    def size(self):
+        """:return: Total size of cached files in bytes"""
+        return sum([ size for ( mtime, size, filename ) in self.__files() ])
+
+    def get(self, host, port, info, compact=False):
+        """Get cached data of a scan
+
+        :param host: Scan server host
+        :param port: Scan server port
+        :param info: :class:`~scan.client.scaninfo.ScanInfo` of the scan
+        :param compact: Use arrays instead of lists for numeric columns
+
+        The numeric columns are memory-mapped from the file
+        and copied once into new arrays, or lists unless `compact`.
+        The returned data is therefore not backed by the file,
+        which may be removed or replaced while the data is in use.
+
+        :return: Data dictionary or None if scan is not cached
+        """
+        if not info.isDone():
+            return None
+        filename = self.__filename(host, port, info)
+        try:
+            with open(filename, 'rb') as file:
+                if mmap is None:
+                    content = file.read()
+                else:
+                    content = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+                try:
+                    data = self.__decode(content, compact)
+                finally:
+                    if mmap is not None:
+                        content.close()
+            # Mark as recently used
+            os.utime(filename, None)
+        except (IOError, OSError, EOFError, ValueError, TypeError, struct.error):
+            # Not cached, removed by other process, or written by incompatible version
+            return None
+        return data
+
+    def put(self, host, port, info, data):
+        """Add data of a scan to cache
+
+        Does nothing for scans that are not done
+        or when the data is larger than the cache.
+
+        :param host: Scan server host
+        :param port: Scan server port
+        :param info: :class:`~scan.client.scaninfo.ScanInfo` of the scan
+        :param data: Data dictionary, using lists or arrays
+        """
+        if not info.isDone():
+            return
+        ( fd, tmpname ) = tempfile.mkstemp(suffix='.tmp', dir=self.__directory)
+        try:
+            with os.fdopen(fd, 'wb') as file:
+                self.__encode(file, data)
+            if os.path.getsize(tmpname) > self.__maxsize:
+                os.remove(tmpname)
+                return
+            filename = self.__filename(host, port, info)
+            if os.name == 'nt'  and  os.path.exists(filename):
+                os.remove(filename)
+            os.rename(tmpname, filename)
+        except:
+            if os.path.exists(tmpname):
+                os.remove(tmpname)
+            raise
+        self.__evict()
+
+    def __evict(self):
+        """Remove least recently used files until cache fits maxsize"""
+        files = self.__files()
+        total = sum([ size for ( mtime, size, filename ) in files ])
+        files.sort()
+        for ( mtime, size, filename ) in files:
+            if total <= self.__maxsize:
+                break
+            try:
+                os.remove(filename)
+            except OSError:
+                pass
+            total -= size
+
+    def clear(self):
+        """Remove all cached files"""
+        for ( mtime, size, filename ) in self.__files():
+            try:
+                os.remove(filename)
+            except OSError:
+                pass
+
+    def __encode(self, file, data):
+        """Write data dictionary
+
+        Format:
+        Magic, header size, marshaled header,
+        then column data aligned to 8 bytes.
+        Header lists the devices with their columns,
+        which are either ( typecode, itemsize, offset, count )
+        for arrays or a list of values.
+        """
+        devices = list()
+        arrays = list()
+        offset = 0
+        for name, samples in data.items():
+            columns = dict()
+            for column in ( 'id', 'time', 'value' ):
+                values = samples[column]
+                if column == 'value':
+                    values = self.__floatArray(values)
+                elif type(values) is not array:
+                    values = array(INT64_TYPE, values)
+                if type(values) is array:
+                    columns[column] = ( values.typecode, values.itemsize, offset, len(values) )
+                    arrays.append(values)
+                    offset += len(values) * values.itemsize
+                    padding = -offset % 8
+                    arrays.append(padding)
+                    offset += padding
+                else:
+                    columns[column] = list(values)
+            devices.append(( name, columns ))
+        header = marshal.dumps(( sys.byteorder, devices ))
+        start = len(self.__magic) + 8 + len(header)
+        padding = -start % 8
+        file.write(self.__magic)
+        file.write(struct.pack('<Q', len(header) + padding))
+        file.write(header)
+        file.write('\0' * padding)
+        for values in arrays:
+            if type(values) is array:
+                values.tofile(file)
+            else:
+                file.write('\0' * values)
+
+    def __floatArray(self, values):
+        """:return: 'value' column as array of floats, or unchanged when it's not all floats"""
+        if type(values) is array:
+            return values
+        for value in values:
+            if type(value) is not float:
+                return values
+        return array('d', values)
+
+    def __decode(self, content, compact):
+        """Read data dictionary, see __encode"""
+        if content[0:len(self.__magic)] != self.__magic:
+            raise ValueError("Not a data cache file")
+        start = len(self.__magic) + 8
+        size = struct.unpack('<Q', content[len(self.__magic):start])[0]
+        ( byteorder, devices ) = marshal.loads(content[start:start+size])
+        if byteorder != sys.byteorder:
+            raise ValueError("Data cache file uses different byte order")
+        start += size
+        data = dict()
+        for name, columns in devices:
+            samples = dict()
+            for column, values in columns.items():
+                if type(values) is tuple:
+                    ( typecode, itemsize, offset, count ) = values
+                    values = array(typecode)
+                    if values.itemsize != itemsize:
+                        raise ValueError("Data cache file uses different array item size")
+                    offset += start
+                    if isinstance(content, str):
+                        values.fromstring(content[offset:offset+count*itemsize])
+                    else:
+                        # View of the memory-mapped file, only copied into the array
+                        values.fromstring(buffer(content, offset, count*itemsize))
+                    if not compact:
+                        values = values.tolist()
+                samples[column] = values
+            data[name] = samples
+        return data
+
+    def __repr__(self):
+        return "DataCache('%s', %d)" % (self.__directory, self.__maxsize)
@@ -0,0 +1,58 @@
+"""Data Cursor
+
+Incrementally fetch the logged data of a scan.
+"""
+
+from scan.client.logdata import getLastSerial
+
+class DataCursor(object):
+    """Incrementally fetch the logged data of a scan
+
+    Keeps the data that has already been fetched
+    and only adds samples logged since the last update.
+    The server is only asked for data when its
+    `lastSerial` indicates a change.
+
+    :param client: :class:`~scan.client.scanclient.ScanClient`
+    :param scanID: ID of scan
+    :param compact: Use arrays instead of lists for numeric columns
+
+    Example:
+
+    >>> cursor = DataCursor(client, id)
+    >>> while not client.scanInfo(id).isDone():
+    ...     if cursor.update():
+    ...         table = createTable(cursor.data, 'xpos', 'signal')
+    ...         # .. plot table ..
+    ...     time.sleep(1)
+    """
+    def __init__(self, client, scanID, compact=False):
+        self.__client = client
+        self.__scanID = scanID
+        self.__compact = compact
+        # Data fetched so far, same format as ScanClient.getData()
+        self.data = dict()
+        # ID of last sample in data
+        self.serial = -1
+
+    def getScanID(self):
+        """:return: ID of scan"""
+        return self.__scanID
+
+    def update(self):
+        """Fetch new samples
+
+        :return: Data dictionary with only the new samples
+                 and only for devices that have new samples,
+                 empty when there is no new data
+        """
+        last = self.__client.lastSerial(self.__scanID)
+        if last == self.serial:
+            return dict()
+        new_data = self.__client.getDataSince(self.__scanID, self.serial, self.data, self.__compact)
+        self.serial = max(self.serial, getLastSerial(new_data))
+        # Devices without new samples are listed with empty columns
+        return dict([ ( device, samples ) for device, samples in new_data.items() if len(samples['id']) > 0 ])
+
+    def __repr__(self):
+        return "DataCursor(%s, %d)" % (repr(self.__client), self.__scanID)
@@ -1,4 +1,13 @@
 """Log Data Support
+
+Logged data is held in a dictionary with one entry per device.
+Each entry has 'id', 'time' and 'value' columns.
+By default, the columns are lists.
+When requested as 'compact' data, numeric columns are
+arrays of machine values, which require much less memory
+than lists of Python numbers.
+Only the 'value' column of a device that logged text
+remains a list.
 """
 
 try:
@@ -6,39 +15,196 @@ try:
 except:
     import xml.etree.ElementTree as ET
 
+import heapq
+from array import array
 from datetime import  datetime
 
-def parseXMLData(xml_text):
+# NumPy is optional. When available, tables are aligned with vectorized operations
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+# Array type for sample IDs and times, which need 64 bits.
+# 'q' is not available in Python 2, where 'l' may be 64 bits.
+# Otherwise fall back to 'd', which holds millisecond times exactly.
+try:
+    INT64_TYPE = array('q').typecode
+except ValueError:
+    INT64_TYPE = 'l' if array('l').itemsize == 8 else 'd'
+
+def parseXMLData(xml_text, compact=False):
     """Parse XML log data
     
     :param xml_text: XML Log data as returned from scan server
+    :param compact: Use arrays for numeric columns?
     
     :return: { 'device1': { 'id': ids.., 'time': times.., 'value': values.. } }
     """
-    data = dict()
-    xml = ET.fromstring(xml_text)
-    if not xml.tag == "data":
-        raise Exception("Expected <data>, but got <%s>" % xml.tag)
-    
-    for dev in xml.findall("device"):
-        name = dev.find("name").text
-        samples = dev.find("samples")
-        ids = list()
-        times = list()
-        values = list()
-        for sample in samples.findall("sample"):
-            id = int(sample.attrib['id'])
-            time = int(sample.find("time").text)
-            try:
-                value = float(sample.find("value").text)
-            except:
-                value = sample.find("value").text
-            ids.append(id)
-            times.append(time)
-            values.append(value)
-        
-        data[name] = { 'id': ids, 'time': times, 'value': values }
-    return data
+    return parseXMLDataSince(xml_text, -1, compact=compact)
+
+
+class _LogDataTarget(object):
+    """XML parser target for log data
+    
+    Fills the 'id', 'time' and 'value' columns
+    while the XML is being parsed, without building
+    an element tree.
+    """
+    def __init__(self, serial, compact):
+        self.serial = serial
+        self.compact = compact
+        self.new_data = dict()
+        self.root = None
+        self.text = None
+        self.name = None
+        self.ids = self.times = self.values = None
+        self.id = self.time = None
+
+    def start(self, tag, attrib):
+        # Checks ordered by how often they happen
+        self.text = None
+        if tag == "sample":
+            self.id = int(attrib['id'])
+        elif tag == "device":
+            self.name = None
+            if self.compact:
+                self.ids = array(INT64_TYPE)
+                self.times = array(INT64_TYPE)
+                self.values = array('d')
+            else:
+                self.ids = list()
+                self.times = list()
+                self.values = list()
+        elif self.root is None:
+            self.root = tag
+            if not tag == "data":
+                raise Exception("Expected <data>, but got <%s>" % tag)
+
+    def data(self, text):
+        # Text is usually received in one piece,
+        # but may be split, for example at the end of a chunk
+        if self.text is None:
+            self.text = text
+        else:
+            self.text += text
+
+    def end(self, tag):
+        if tag == "value":
+            if self.id > self.serial:
+                try:
+                    value = float(self.text)
+                except:
+                    value = self.text
+                    if type(self.values) is array:
+                        # Text value, compact array can't hold it
+                        self.values = list(self.values)
+                self.ids.append(self.id)
+                self.times.append(self.time)
+                self.values.append(value)
+        elif tag == "time":
+            if self.id > self.serial:
+                self.time = int(self.text)
+        elif tag == "name":
+            self.name = self.text
+        elif tag == "device":
+            self.new_data[self.name] = { 'id': self.ids, 'time': self.times, 'value': self.values }
+
+    def close(self):
+        if self.root is None:
+            raise Exception("Expected <data>, but got nothing")
+        return self.new_data
+
+
+def __extend(column, samples):
+    """Extend column with samples
+
+    :return: Extended column, which may be a new list
+             when samples can't be added to a compact array
+    """
+    if type(column) is array  and  type(samples) is not array:
+        try:
+            samples = array(column.typecode, samples)
+        except TypeError:
+            column = list(column)
+    column.extend(samples)
+    return column
+
+
+def __appendData(data, new_data):
+    """Append new samples to data dictionary"""
+    for name, samples in new_data.items():
+        if name in data:
+            for column in ( 'id', 'time', 'value' ):
+                data[name][column] = __extend(data[name][column], samples[column])
+        else:
+            # Copy of columns, list or array
+            data[name] = { 'id': samples['id'][:], 'time': samples['time'][:], 'value': samples['value'][:] }
+
+
+def parseXMLDataSince(xml_text, serial, data=None, compact=False):
+    """Parse XML log data, only using samples logged after a given serial
+    
+    Samples with an ID at or below the `serial` are skipped
+    without converting their time and value.
+    
+    :param xml_text: XML Log data as returned from scan server
+    :param serial: ID of last sample already known, -1 for all samples
+    :param data: Optional data dictionary to which new samples are appended
+    :param compact: Use arrays for numeric columns?
+    
+    :return: Data dictionary with only the new samples,
+             { 'device1': { 'id': ids.., 'time': times.., 'value': values.. } }
+    """
+    parser = ET.XMLParser(target=_LogDataTarget(serial, compact))
+    parser.feed(xml_text)
+    new_data = parser.close()
+    if data is not None:
+        __appendData(data, new_data)
+    return new_data
+
+
+def parseXMLDataStream(source, serial=-1, data=None, chunk_size=65536, compact=False):
+    """Parse XML log data while reading it
+    
+    Reads the XML in chunks from a file-like source,
+    for example the response from the scan server,
+    and decodes samples as they arrive.
+    Never holds the complete XML text nor an element tree in memory.
+    
+    :param source: Object with `read(size)` method that provides the XML log data
+    :param serial: ID of last sample already known, -1 for all samples
+    :param data: Optional data dictionary to which new samples are appended
+    :param chunk_size: Number of bytes to read at once
+    :param compact: Use arrays for numeric columns?
+    
+    :return: Data dictionary with only the new samples,
+             { 'device1': { 'id': ids.., 'time': times.., 'value': values.. } }
+    """
+    parser = ET.XMLParser(target=_LogDataTarget(serial, compact))
+    while True:
+        chunk = source.read(chunk_size)
+        if not chunk:
+            break
+        parser.feed(chunk)
+    new_data = parser.close()
+    if data is not None:
+        __appendData(data, new_data)
+    return new_data
+
+
+def getLastSerial(data):
+    """Get ID of last sample
+    
+    :param data: Data as returned by :func:`~scan.client.scanclient.ScanClient.getData`
+    
+    :return: Largest sample ID in data, -1 if there are no samples
+    """
+    last = -1
+    for device in data.values():
+        if len(device['id']) > 0:
+            last = max(last, device['id'][-1])
+    return last
 
 
 def getDatetime(time):
@@ -94,39 +260,50 @@ def iterateTable(*iters):
     """
     N = len(iters)
     
-    # 'Current' value for each iter or None when at end
-    raw_data = list()
+    # 'Current' sample for each iter or None when at end
+    raw_data = [ None for i in range(N) ]
+    # Heap of the sample IDs of the 'current' samples,
+    # and the devices waiting for each of these IDs.
+    # Devices that log together share a sample ID,
+    # so there is one heap operation per row, not per sample.
+    pending = list()
+    waiting = dict()
     for i in range(N):
         try:
-            raw_data.append(iters[i].next())
+            raw_data[i] = iters[i].next()
         except StopIteration:
-            raw_data.append(None)
+            continue
+        id = raw_data[i][0]
+        if id in waiting:
+            waiting[id].append(i)
+        else:
+            waiting[id] = [ i ]
+            pending.append(id)
+    heapq.heapify(pending)
 
     # Values for current 'row'
     values = [ None for i in range(N) ]
-    while True:
-        # Locate smallest sample ID
-        current_id = None
-        for i in range(N):
-            if raw_data[i]:
-                if current_id is None   or  raw_data[i][0] < current_id:
-                    current_id = raw_data[i][0]
+    heappush = heapq.heappush
+    while pending:
+        # Smallest sample ID is at top of heap
+        current_id = heapq.heappop(pending)
         
-        # Any data left?
-        if current_id is None:
-            break
-        
-        # For each device, get sample for current_id
-        for i in range(N):
-            if raw_data[i] is not None  and  raw_data[i][0] <= current_id:
-                # Device has new raw data for current_id. Use it ..
-                values[i] = raw_data[i][2]
-                # .. and prepare for next iteration
-                try:
-                    raw_data[i] = iters[i].next()
-                except StopIteration:
-                    raw_data[i] = None
-            # else: leave values[i] unchanged, repeating previous data
+        # For each device with sample for current_id, use it
+        # and prepare for next iteration.
+        # Others leave values[i] unchanged, repeating previous data
+        for i in waiting.pop(current_id):
+            values[i] = raw_data[i][2]
+            try:
+                sample = raw_data[i] = iters[i].next()
+            except StopIteration:
+                raw_data[i] = None
+                continue
+            devices = waiting.get(sample[0])
+            if devices is None:
+                waiting[sample[0]] = [ i ]
+                heappush(pending, sample[0])
+            else:
+                devices.append(i)
         
         # Add values for current_id to result
         yield values
@@ -136,12 +313,17 @@ def createTable(data, *devices):
     """Create data table
     
     Aligns samples for given list of devices by sample ID.
+    When NumPy is available, the alignment uses vectorized operations.
     
     :param data: Data as returned by :func:`~scan.client.scanclient.ScanClient.getData`
     :param devices: One or more devices
     
     :return: Table. result[0] has values for first device, result[1] for second device and so on.     
     """
+    if numpy is not None:
+        table = _createTableNumPy(data, devices)
+        if table is not None:
+            return table
     N = len(devices)
     iters = [ iterateSamples(data, device) for device in devices ]
     table = [ list() for i in range(N) ]
@@ -149,3 +331,76 @@ def createTable(data, *devices):
         for i in range(N):
             table[i].append(row[i])
     return table
+
+
+def _asNumPy(column, dtype=None):
+    """Get column as NumPy array
+
+    Compact columns are used without copying.
+    """
+    if isinstance(column, array)  and  len(column) > 0:
+        if column.typecode == 'd':
+            return numpy.frombuffer(column, dtype=numpy.float64).astype(dtype or numpy.float64, copy=False)
+        if column.typecode in ( 'l', 'q' )  and  column.itemsize == 8:
+            return numpy.frombuffer(column, dtype=numpy.int64).astype(dtype or numpy.int64, copy=False)
+    return numpy.asarray(column, dtype=dtype)
+
+
+def _alignIDs(data, devices):
+    """Align sample IDs of devices with NumPy
+
+    :param data: Data as returned by :func:`~scan.client.scanclient.ScanClient.getData`
+    :param devices: Devices to align
+
+    :return: ( ids, indices ) where `ids` holds the sorted sample IDs
+             of all devices, i.e. the rows of the table,
+             and indices[i] has the index of the sample of device i
+             that applies to each row, -1 before its first sample.
+             None if sample IDs of a device are not strictly increasing.
+    """
+    columns = list()
+    for device in devices:
+        ids = _asNumPy(data[device]['id'], numpy.int64)
+        if len(ids) > 1  and  not numpy.all(ids[1:] > ids[:-1]):
+            return None
+        columns.append(ids)
+    if len(columns) < 1:
+        return ( numpy.zeros(0, dtype=numpy.int64), [] )
+    ids = numpy.unique(numpy.concatenate(columns))
+    # Last sample with ID <= row ID: Forward-fill from previous rows
+    indices = [ numpy.searchsorted(column, ids, side='right') - 1 for column in columns ]
+    return ( ids, indices )
+
+
+def _selectValues(values, index):
+    """Select values for the rows of a table
+
+    :param values: 'value' column of a device
+    :param index: Index into values for each row, -1 for 'no value'
+
+    :return: List of values, None where index is -1
+    """
+    # Rows before the first sample are at the start
+    missing = int(numpy.searchsorted(index, 0))
+    if missing == len(index):
+        return [ None ] * missing
+    if isinstance(values, array):
+        column = _asNumPy(values)
+    else:
+        # Object array keeps the original Python values
+        column = numpy.empty(len(values), dtype=object)
+        column[:] = values
+    return [ None ] * missing + column[index[missing:]].tolist()
+
+
+def _createTableNumPy(data, devices):
+    """Implementation of :func:`createTable` with NumPy
+
+    :return: Table or None if data cannot be aligned with NumPy
+    """
+    aligned = _alignIDs(data, devices)
+    if aligned is None:
+        return None
+    ( ids, indices ) = aligned
+    return [ _selectValues(data[device]['value'], index)
+             for ( device, index ) in zip(devices, indices) ]
@@ -10,11 +10,15 @@ try:
 except:
     import xml.etree.ElementTree as ET
 import urllib
-from scan.client.logdata import parseXMLData
-from scan.commands.commandsequence import CommandSequence
+from scan.client.logdata import parseXMLDataStream
+from scan.commands.command import Command
+from scan.commands.commandsequence import CommandSequence, iterSCN
+from scan.client.scanregistry import contentHash, default_registry
 from scaninfo import ScanInfo
 
-# Python code uses urllib2.
+# Python code uses httplib with persistent connections
+# held in a ConnectionPool.
+# Originally, it used urllib2.
 # When accessed from jython, there were two problems.
 #
 # 1) https://github.com/PythonScanClient/PyScanClient/issues/18
@@ -40,21 +44,35 @@ if os.name == 'java':
     from java.io import BufferedReader, InputStreamReader, OutputStream
     from java.net import HttpURLConnection, URL
 
-    def perform_request(url, method='GET', data=None, timeout=None):
+    from StringIO import StringIO
+
+    def perform_request(url, method='GET', data=None, timeout=None, pool=None, consume=None):
+        # The Java HttpURLConnection keeps connections alive
+        # in its own pool, as long as the response is read
+        # to the end and the connection is not disconnected.
+        # The 'pool' is therefore ignored.
+        # The response is read into memory before it's passed to 'consume'.
         try:
             connection = URL(url).openConnection()
-            connection.setRequestProperty("Connection", "close")
             connection.setRequestProperty("User-Agent", "PyScanClient")
             connection.setRequestProperty("Accept", "text/xml")
             connection.setDoOutput(True)
             connection.setRequestMethod(method)
-            if data is not None:
+            if isinstance(data, basestring):
                 data = java.lang.String(data).getBytes()
                 connection.setRequestProperty("Content-Type", "text/xml")
                 connection.setRequestProperty("Content-Length", str(len(data)))
                 out = connection.getOutputStream()
                 out.write(data)
                 out.close()
+            elif data is not None:
+                # Send chunks of data as they are produced
+                connection.setRequestProperty("Content-Type", "text/xml")
+                connection.setChunkedStreamingMode(0)
+                out = connection.getOutputStream()
+                for chunk in data:
+                    out.write(java.lang.String(chunk).getBytes())
+                out.close()
     
             inp = BufferedReader(InputStreamReader(connection.getInputStream()))
             result = java.lang.StringBuilder()
@@ -65,61 +83,62 @@ if os.name == 'java':
                 result.append(line).append('\n')
             inp.close()
             result = result.toString()
-            connection.disconnect()
-            return result
         except java.lang.Exception as e:
             raise Exception("%s: %s" % (url, str(e)))
+        if consume is not None:
+            return consume(StringIO(result))
+        return result
 
 else:
-    import urllib2
+    import httplib
+    import socket
+    import urlparse
+    from scan.client.connectionpool import default_pool
 
-    def perform_request(url, method='GET', data=None, timeout=None):
+    def perform_request(url, method='GET', data=None, timeout=None, pool=None, consume=None):
         """Perform HTTP request with scan server
         
-        :param url:    URL
-        :param method: 'GET', 'PUT', ...
-        :param data:   Optional data
+        :param url:     URL
+        :param method:  'GET', 'PUT', ...
+        :param data:    Optional data, string or iterable of strings
+                        to send with chunked transfer encoding
+        :param timeout: Optional timeout in seconds
+        :param pool:    :class:`~scan.client.connectionpool.ConnectionPool`,
+                        `None` to use the default pool
+        :param consume: Optional function that reads and decodes
+                        the file-like response while it is received
        
-        :return: XML response from scan server
+        :return: XML response from scan server, or result of `consume`
         """
-        response = None
+        if not method in ( 'GET', 'POST', 'PUT', 'DELETE' ):
+            raise Exception('Undefined HttpRequest Type %s' % method)
+        if pool is None:
+            pool = default_pool
+        parts = urlparse.urlsplit(url)
+        path = parts.path
+        if parts.query:
+            path += '?' + parts.query
+        headers = { 'User-Agent': 'PyScanClient', 'Accept': 'text/xml' }
+        if data is not None:
+            headers['Content-Type'] = 'text/xml'
+        elif method in ( 'POST', 'PUT' ):
+            # Empty body, but server still expects a length
+            data = ''
         try:
-            # Register a Request Object with url:
-            req = urllib2.Request(url)
-            # Add XML header
-            if data is not None:
-                req.add_header('content-type' , 'text/xml')
-            # Get OpenerDirector Object
-            opener = urllib2.build_opener()
-            
-            if method=='GET':
-                if timeout:
-                    response = opener.open(req, timeout=timeout)
-                else:
-                    response = opener.open(req)
-                
-            elif method=='POST':
-                response = opener.open(req, data)
-                
-            elif method=='DELETE':
-                req.get_method = lambda : 'DELETE'
-                response = opener.open(req)
-                
-            elif method=='PUT':
-                req.get_method = lambda : 'PUT'
-                response = opener.open(req, data)
-            else:
-                raise Exception('Undefined HttpRequest Type %s' % method)
-            
-            return response.read()
-        except urllib2.URLError as e:
-            if hasattr(e, 'reason'):
-                raise Exception("Failed to reach scan server at %s: %s" % (url, e.reason))
-            elif hasattr(e, 'code'):
-                raise Exception("Scan server at %s returned error code %d" % (url, e.code))
-        finally:
-            if response:
-                response.close()
+            (status, reason, result) = pool.request(parts.hostname, parts.port or 80,
+                                                    method, path, data, headers, timeout, consume)
+        except (httplib.HTTPException, socket.error) as e:
+            raise Exception("Failed to reach scan server at %s: %s" % (url, str(e)))
+        if status >= 400:
+            raise Exception("Scan server at %s returned error code %d" % (url, status))
+        return result
+
+
+def _isNotFound(error):
+    """:return: `True` if error from `perform_request` means that the server does not know the URL"""
+    message = str(error)
+    # CPython reports the HTTP status, Jython the java.io exception for 404
+    return 'error code 404' in message  or  'FileNotFoundException' in message
 
 
 class ScanClient(object):
@@ -127,6 +146,14 @@ class ScanClient(object):
     
     :param host: The IP address or name of scan server host.
     :param port: The TCP port of the scan server.
+    :param pool: :class:`~scan.client.connectionpool.ConnectionPool`
+                 for persistent connections to the server.
+                 By default, all clients share one pool.
+    :param cache: Optional :class:`~scan.client.datacache.DataCache`
+                  for the logged data of completed scans.
+    :param registry: :class:`~scan.client.scanregistry.ScanRegistry`
+                     for submitted scans.
+                     By default, all clients share one registry.
     
     Example:
     
@@ -134,16 +161,22 @@ class ScanClient(object):
     """
     __baseURL = None
        
-    def __init__(self, host='localhost', port=4810):
+    def __init__(self, host='localhost', port=4810, pool=None, cache=None, registry=None):
         self.__host = host
         self.__port = int(port) #no matter what type of 'port' input, self._port keeps to be int.
-        #May implement a one to one host+port with instance in the future.
+        self.__pool = pool
+        self.__cache = cache
+        self.__registry = default_registry if registry is None else registry
         self.__baseURL = "http://" + self.__host + ':' + str(self.__port)
 
     
     def __repr__(self):
         return "ScanClient('%s', %d)" % (self.__host, self.__port)
 
+    def __perform(self, url, method='GET', data=None, timeout=None, consume=None):
+        """Perform HTTP request via this client's connection pool"""
+        return perform_request(url, method, data, timeout, self.__pool, consume)
+
 
     def serverInfo(self):
         """Get scan server information
@@ -159,14 +192,15 @@ class ScanClient(object):
         >>> client = ScanClient()
         >>> print client.serverInfo()
         """
-        return perform_request(self.__baseURL + "/server/info")
+        return self.__perform(self.__baseURL + "/server/info")
 
                 
     def simulate(self, cmds):
         """Submit scan to scan server for simulation
         
-        :param cmds: List of commands,
-                     :class:`~scan.commands.commandsequence.CommandSequence`
+        :param cmds: Command, list of commands,
+                     :class:`~scan.commands.commandsequence.CommandSequence`,
+                     generator for commands
                      or text with raw XML format.
         
         :return: Simulation result as dictionary `{ 'simulation': "Printable text", 'seconds': 193.0 }`
@@ -176,17 +210,11 @@ class ScanClient(object):
         >>> result = client.simulate([ Set('x', 5), Delay(2) ])
         >>> print result['simulation']
         """
-        if isinstance(cmds, str):
-            scan = cmds            
-        elif isinstance(cmds, CommandSequence):
-            scan = cmds.genSCN()
-        else:
-            # Warp list, tuple, other iterable
-            scan = CommandSequence(cmds).genSCN()
+        scan = self.__scanXML(cmds)
             
         url = self.__baseURL + "/simulate"
 
-        result = perform_request(url, 'POST', scan)
+        result = self.__perform(url, 'POST', scan)
         xml = ET.fromstring(result)
         if xml.tag != 'simulation':
             raise Exception("Expected scan <simulation>, got <%s>" % xml.tag)
@@ -198,9 +226,13 @@ class ScanClient(object):
     def submit(self, cmds, name='UnNamed', queue=True):
         """Submit scan to scan server for execution
         
-        :param cmds: List of commands,
-                     :class:`~scan.commands.commandsequence.CommandSequence`
+        :param cmds: Command, list of commands,
+                     :class:`~scan.commands.commandsequence.CommandSequence`,
+                     generator for commands
                      or text with raw XML format.
+                     Commands from a generator are uploaded while they are generated.
+                     Other commands are added to the registry,
+                     see :func:`findQueued` and :func:`resubmit`.
         :param name: Name of scan
         :param queue: Submit to scan server queue, or execute as soon as possible?
         
@@ -215,14 +247,17 @@ class ScanClient(object):
         >>> cmds.append(Set('x', 10))
         >>> id = client.submit( cmds, "My Second Scan")
         """
+        scan = self.__scanXML(cmds)
+        scanID = self.__submit(scan, name, queue)
+        # Generated commands are not held in memory, so they cannot be registered
+        if isinstance(scan, basestring):
+            self.__registry.add(self.__baseURL, contentHash(scan), scanID, scan)
+        return scanID
+
+    def __submit(self, scan, name, queue):
+        """:return: ID of submitted scan"""
         quoted_name = urllib.quote(name, '')
-        if isinstance(cmds, str):
-            result = self.__submitScanXML(cmds, quoted_name, queue)     
-        elif isinstance(cmds, CommandSequence):
-            result = self.__submitScanSequence(cmds, quoted_name, queue)
-        else:
-            # Warp list, tuple, other iterable
-            result = self.__submitScanSequence(CommandSequence(cmds), quoted_name, queue)
+        result = self.__submitScanXML(scan, quoted_name, queue)
         
         xml = ET.fromstring(result)
         if xml.tag != 'id':
@@ -230,13 +265,107 @@ class ScanClient(object):
         return int(xml.text)
 
 
+    def findQueued(self, content_hash):
+        """Find a submitted scan that has not completed
+        
+        Checks the scans that this or other clients
+        sharing the same :class:`~scan.client.scanregistry.ScanRegistry`
+        submitted with the same content.
+        
+        :param content_hash: Content hash of the commands,
+                             see :func:`~scan.commands.commandsequence.CommandSequence.contentHash`
+        :return: ID of scan that is idle, running or paused, or `None`
+        :raise Exception: When the server cannot be reached.
+                          Scans that the server no longer knows
+                          are removed from the registry.
+        
+        Example::
+        
+        >>> cmds = table.createScan()
+        >>> id = client.findQueued(cmds.contentHash())
+        >>> if id is None:
+        ...     id = client.submit(cmds, 'Table')
+        """
+        for scanID in reversed(self.__registry.getScanIDs(self.__baseURL, content_hash)):
+            try:
+                info = self.scanInfo(scanID)
+            except Exception as e:
+                if not _isNotFound(e):
+                    raise
+                # Server no longer knows about the scan
+                self.__registry.removeScanID(self.__baseURL, content_hash, scanID)
+                continue
+            if not info.isDone():
+                return scanID
+        return None
+
+
+    def resubmit(self, content_hash, name='UnNamed', queue=True):
+        """Submit a scan again
+        
+        Submits the XML of an earlier submission with that content,
+        without creating the XML from the commands.
+        When the registry no longer holds that XML,
+        the commands of the earlier scan are read from the server.
+        
+        :param content_hash: Content hash of the commands,
+                             see :func:`~scan.commands.commandsequence.CommandSequence.contentHash`
+        :param name: Name of scan
+        :param queue: Submit to scan server queue, or execute as soon as possible?
+        
+        :return: ID of submitted scan
+        
+        Example::
+        
+        >>> id = client.submit(cmds, 'Table')
+        >>> hash = cmds.contentHash()
+        >>> # Later..
+        >>> id = client.resubmit(hash, 'Table again')
+        """
+        scan = self.__registry.getXML(self.__baseURL, content_hash)
+        if scan is None:
+            for scanID in reversed(self.__registry.getScanIDs(self.__baseURL, content_hash)):
+                try:
+                    scan = self.scanCmds(scanID)
+                    break
+                except Exception as e:
+                    if not _isNotFound(e):
+                        raise
+                    # Server no longer knows about the scan
+                    self.__registry.removeScanID(self.__baseURL, content_hash, scanID)
+        if scan is None:
+            raise Exception("No submitted scan with content hash %s" % content_hash)
+        scanID = self.__submit(scan, name, queue)
+        self.__registry.add(self.__baseURL, content_hash, scanID, scan)
+        return scanID
+
+
+    def __scanXML(self, cmds):
+        """Get XML for scan
+        
+        :param cmds: Commands as described for :func:`submit`
+        :return: XML text, or generator for chunks of XML text
+                 when commands are provided by a generator or iterator
+        """
+        if isinstance(cmds, str):
+            return cmds
+        if isinstance(cmds, CommandSequence):
+            return cmds.genSCN()
+        if isinstance(cmds, Command)  or  iter(cmds) is not cmds:
+            # Single command, list, tuple or other iterable that can be read again
+            return CommandSequence(cmds).genSCN()
+        # Generator or iterator: Serialize commands as they are generated,
+        # and send the chunks while they are produced
+        return iterSCN(cmds, pretty=False)
+
     def __submitScanXML(self, scanXML, scanName, queue=True):
         """Submit scan in raw XML-form.
         
         Using   POST {BaseURL}/scan/{scanName}
         Return  <id>{id}</id>
         
-        :param scanXML: The XML content of your new scan
+        :param scanXML: The XML content of your new scan,
+                        string or generator for chunks of the XML
         :param scanName: The name you want to give the new scan
         :param queue: Submit to scan server queue, or execute as soon as possible?
         
@@ -251,20 +380,8 @@ class ScanClient(object):
         url = self.__baseURL + "/scan/" + scanName
         if not queue:
             url = url + "?queue=false"
-        r = perform_request(url, 'POST', scanXML)
+        r = self.__perform(url, 'POST', scanXML)
         return r
-    
-            
-    def __submitScanSequence(self, cmdSeq, scanName, queue=True):
-        """Submit a CommandSequence
-        
-        :param cmdSeq: :class:`scan.commands.commandsequence.CommandSequence`
-        :param scanName: The name needed to give the new scan
-        :param queue: Submit to scan server queue, or execute as soon as possible?
-
-        :return: Raw XML for scan ID
-        """
-        return self.__submitScanXML(cmdSeq.genSCN(),scanName, queue)
       
            
     def scanInfos(self, timeout=20):
@@ -280,7 +397,7 @@ class ScanClient(object):
         >>> infos = client.scanInfos()
         >>> print [ str(info) for info in infos ]
         """
-        xml = perform_request(self.__baseURL + "/scans", timeout=timeout)
+        xml = self.__perform(self.__baseURL + "/scans", timeout=timeout)
         scans = ET.fromstring(xml)
         result = list()
         for scan in scans.findall('scan'):
@@ -302,7 +419,7 @@ class ScanClient(object):
         >>> client = ScanClient()
         >>> print client.scanInfo(42)
         """
-        xml = perform_request(self.__baseURL + "/scan/" + str(scanID), timeout=timeout)
+        xml = self.__perform(self.__baseURL + "/scan/" + str(scanID), timeout=timeout)
         return ScanInfo(ET.fromstring(xml))
 
     def scanCmds(self, scanID):
@@ -325,7 +442,7 @@ class ScanClient(object):
         >>> client.submit(client.scanCmds(scanid))
         """
         url = self.__baseURL + "/scan/" + str(scanID) + '/commands'
-        xml = perform_request(url)
+        xml = self.__perform(url)
         return xml
 
 
@@ -336,6 +453,8 @@ class ScanClient(object):
         Allows clients which monitor the progress of a scan to poll
         for changes in the logged data without always having to pull
         the complete data log.
+        A :class:`~scan.client.scanmonitor.ScanMonitor` performs such polling
+        in the background and can be shared by several consumers.
         
         :param scanID: The ID of scan for which to fetch information.
         
@@ -352,7 +471,7 @@ class ScanClient(object):
         >>>     time.sleep(10
         """
         url = self.__baseURL + "/scan/" + str(scanID) + '/last_serial'
-        xml = perform_request(url)
+        xml = self.__perform(url)
         ET.fromstring(xml)
         return int(ET.fromstring(xml).text)
 
@@ -372,7 +491,7 @@ class ScanClient(object):
         :return: XML with info about devices.
         """
         url = self.__baseURL + "/scan/" + str(scanID) + '/devices'
-        xml = perform_request(url)
+        xml = self.__perform(url)
         return xml
 
     def __getInfo(self, scanID):
@@ -411,6 +530,105 @@ class ScanClient(object):
             time.sleep(1)
 
 
+    def waitUntilAllDone(self, scanIDs, callback=None, poll=1.0, max_poll=10.0):
+        """Wait until several scans finish.
+        
+        Instead of polling each scan, all scans are checked
+        with one `GET {BaseURL}/scans` per poll.
+        While no scan changes its state or progress,
+        the poll period doubles up to `max_poll`.
+        
+        Unlike :func:`waitUntilDone`, a scan that failed or was aborted
+        does not raise an exception. Check the state of the returned infos.
+        
+        :param scanIDs: IDs of scans on which to wait
+        :param callback: Optional function that is called with the
+                         :class:`~scan.client.scaninfo.ScanInfo`
+                         of each scan as soon as it is done
+        :param poll: Initial seconds between checks
+        :param max_poll: Maximum seconds between checks
+        
+        :return: Dictionary of scan ID to :class:`~scan.client.scaninfo.ScanInfo`
+        
+        Example::
+        
+        >>> def showDone(info):
+        ...     print info
+        >>> ids = [ client.submit(cmds, name) for name in names ]
+        >>> infos = client.waitUntilAllDone(ids, callback=showDone)
+        >>> failed = [ info for info in infos.values() if info.state != 'Finished' ]
+        """
+        return self.__waitScans(scanIDs, None, callback, poll, max_poll)
+
+    def waitUntilAnyDone(self, scanIDs, callback=None, poll=1.0, max_poll=10.0):
+        """Wait until at least one of several scans finishes.
+        
+        See :func:`waitUntilAllDone`
+        
+        :param scanIDs: IDs of scans on which to wait
+        :param callback: Optional function that is called with the
+                         :class:`~scan.client.scaninfo.ScanInfo`
+                         of each scan that is done
+        :param poll: Initial seconds between checks
+        :param max_poll: Maximum seconds between checks
+        
+        :return: Dictionary of scan ID to :class:`~scan.client.scaninfo.ScanInfo`
+                 for the scans that are done
+        """
+        return self.__waitScans(scanIDs, 1, callback, poll, max_poll)
+
+    def __waitScans(self, scanIDs, count, callback, poll, max_poll):
+        """Wait until `count` of the scans are done, `None` for all"""
+        # Each scan is only counted once
+        pending = list(set(scanIDs))
+        if count is None:
+            count = len(pending)
+        else:
+            count = min(count, len(pending))
+        done = dict()
+        delay = poll
+        last = None
+        while True:
+            try:
+                infos = self.scanInfos()
+            except:
+                # Keep checking while disconnected/timed out
+                time.sleep(delay)
+                continue
+            current = dict()
+            for info in infos:
+                current[info.id] = info
+            for scanID in pending[:]:
+                info = current.get(scanID)
+                if info is None:
+                    # Scan is not listed, for example an older scan.
+                    # Ask for it, which raises an exception for unknown scan IDs.
+                    try:
+                        info = self.scanInfo(scanID)
+                    except Exception as e:
+                        if _isNotFound(e):
+                            raise
+                        # Keep checking while disconnected/timed out
+                        continue
+                    current[scanID] = info
+                if info.isDone():
+                    pending.remove(scanID)
+                    done[scanID] = info
+                    if callback is not None:
+                        callback(info)
+            if len(done) >= count:
+                return done
+            # Back off while nothing changes
+            status = [ ( current[scanID].state, current[scanID].performed_work_units )
+                       for scanID in pending if scanID in current ]
+            if status == last:
+                delay = min(delay * 2, max_poll)
+            else:
+                delay = poll
+            last = status
+            time.sleep(delay)
+
+
     def pause(self, scanID=-1):
         """Pause a running scan
         
@@ -424,7 +642,7 @@ class ScanClient(object):
         >>> client.pause(id)
         """
         url = self.__baseURL + "/scan/" + str(scanID) + '/pause'
-        perform_request(url, 'PUT')
+        self.__perform(url, 'PUT')
 
 
     def resume(self, scanID=-1):
@@ -441,7 +659,7 @@ class ScanClient(object):
         >>> client.resume(id)
         """
         url=self.__baseURL + "/scan/" + str(scanID) + '/resume'
-        perform_request(url, 'PUT')
+        self.__perform(url, 'PUT')
 
 
     def abort(self, scanID=-1):
@@ -457,7 +675,7 @@ class ScanClient(object):
         >>> client.abort(id)
         """
         url = self.__baseURL + "/scan/" + str(scanID) + '/abort'
-        perform_request(url, 'PUT')
+        self.__perform(url, 'PUT')
 
 
     def delete(self, scanID):
@@ -473,7 +691,7 @@ class ScanClient(object):
         >>> client.abort(id)
         >>> client.delete(id)
         """
-        perform_request(self.__baseURL + "/scan/" + str(scanID), 'DELETE')
+        self.__perform(self.__baseURL + "/scan/" + str(scanID), 'DELETE')
 
 
     def clear(self):
@@ -485,7 +703,7 @@ class ScanClient(object):
         
         >>> client.clear()
         """
-        perform_request(self.__baseURL + "/scans/completed", 'DELETE')
+        self.__perform(self.__baseURL + "/scans/completed", 'DELETE')
 
     def patch(self, scanID, address, property, value):  # @ReservedAssignment
         """Update scan on server.
@@ -513,13 +731,15 @@ class ScanClient(object):
         >>> client.resume(id)
         """
         xml = "<patch><address>%d</address><property>%s</property><value>%s</value></patch>" % (address, property, str(value))
-        perform_request(self.__baseURL + "/scan/" + str(scanID) + '/patch', 'PUT', xml)
+        self.__perform(self.__baseURL + "/scan/" + str(scanID) + '/patch', 'PUT', xml)
 
 
-    def getData(self, scanID):
+    def getData(self, scanID, compact=False):
         """Fetch logged data of a scan
         
         :param scanID: ID of scan
+        :param compact: Use arrays instead of lists for numeric columns
+                        to reduce memory usage for large scans.
         
         :return: Data dictionary
         
@@ -548,8 +768,52 @@ class ScanClient(object):
            Sample values
         time:
            Times in Posix milliseconds
+        
+        With `compact=True`, the columns are `array.array` instead of lists.
+        The 'value' column remains a list for devices that logged text.
+        
+        When the client has a data cache, data of completed scans
+        is read from the cache if available, otherwise added to it.
+        Each call then first fetches the :func:`scanInfo`, also when the data is cached,
+        to check that the scan is done and to identify it by its creation time,
+        since scan IDs are re-used when the scan server restarts.
         """
+        info = None
+        if self.__cache is not None:
+            # Check if done _before_ fetching data, so cached data is complete
+            info = self.scanInfo(scanID)
+            data = self.__cache.get(self.__host, self.__port, info, compact)
+            if data is not None:
+                return data
         url = self.__baseURL + "/scan/" + str(scanID) + '/data'
-        xml = perform_request(url)
-        return parseXMLData(xml)
+        data = self.__perform(url, consume=lambda response: parseXMLDataStream(response, compact=compact))
+        if info is not None:
+            self.__cache.put(self.__host, self.__port, info, data)
+        return data
 
+
+    def getDataSince(self, scanID, serial, data=None, compact=False):
+        """Fetch logged data of a scan that is newer than a given serial
+        
+        The scan server always returns all logged data,
+        but only samples after the `serial` are decoded.
+        Combine with :func:`lastSerial` to avoid fetching data
+        that has not changed, or use a
+        :class:`~scan.client.datacursor.DataCursor`.
+        
+        :param scanID: ID of scan
+        :param serial: ID of last sample already known, -1 for all samples
+        :param data: Optional data dictionary to which new samples are appended
+        :param compact: Use arrays instead of lists for numeric columns
+        
+        :return: Data dictionary with only the new samples,
+                 same format as :func:`getData`
+        
+        Example:
+           >>> data = client.getData(id)
+           >>> serial = getLastSerial(data)
+           >>> # .. later ..
+           >>> new_samples = client.getDataSince(id, serial, data)
+        """
+        url = self.__baseURL + "/scan/" + str(scanID) + '/data'
+        return self.__perform(url, consume=lambda response: parseXMLDataStream(response, serial, data, compact=compact))
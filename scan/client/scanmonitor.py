@@ -0,0 +1,260 @@
+"""Scan Monitor
+
+Polls a scan server in a background thread and
+informs listeners about changes,
+so several consumers share one polling stream
+instead of each polling the server.
+"""
+
+import threading
+from scan.client.datacursor import DataCursor
+from scan.client.scanclient import ScanClient
+
+class ScanListener(object):
+    """Listener to a :class:`ScanMonitor`
+
+    Derived classes override the methods of interest.
+    They are invoked on the thread of the monitor
+    and should return quickly.
+    """
+    def scanAdded(self, info):
+        """Scan appeared on the server
+
+        :param info: :class:`~scan.client.scaninfo.ScanInfo`
+        """
+        pass
+
+    def stateChanged(self, info, old_state):
+        """State of scan changed
+
+        :param info: :class:`~scan.client.scaninfo.ScanInfo`
+        :param old_state: Previous state
+        """
+        pass
+
+    def progressChanged(self, info):
+        """Work units of scan changed
+
+        :param info: :class:`~scan.client.scaninfo.ScanInfo`
+        """
+        pass
+
+    def dataAdded(self, info, data, new_data):
+        """Scan logged new data
+
+        Only called for listeners that were added for a specific scan ID.
+
+        :param info: :class:`~scan.client.scaninfo.ScanInfo`
+        :param data: All data of the scan fetched so far
+        :param new_data: Only the new samples, same format as `data`
+        """
+        pass
+
+
+class ScanMonitor(object):
+    """Monitor the scans of a scan server
+
+    A background thread polls the scan infos of all scans.
+    For scans that have listeners which were added for that scan,
+    it also fetches new data once the last sample serial changes.
+    While nothing changes, the poll period doubles up to `max_poll`.
+
+    :param client: :class:`~scan.client.scanclient.ScanClient`
+    :param poll: Initial seconds between polls
+    :param max_poll: Maximum seconds between polls
+    :param compact: Use arrays instead of lists for numeric data columns
+
+    Example:
+
+    >>> class Progress(ScanListener):
+    ...     def progressChanged(self, info):
+    ...         print "%s: %d %%" % (info.name, info.percentage())
+    >>> monitor = getScanMonitor('localhost')
+    >>> monitor.addListener(Progress())
+    """
+    def __init__(self, client, poll=1.0, max_poll=10.0, compact=False):
+        self.__client = client
+        self.__poll = poll
+        self.__max_poll = max_poll
+        self.__compact = compact
+        self.__lock = threading.Lock()
+        # Held while polling, so only one thread polls at a time
+        self.__poll_lock = threading.Lock()
+        # Listeners for all scans
+        self.__listeners = list()
+        # Scan ID -> Listeners for that scan
+        self.__scan_listeners = dict()
+        # Scan ID -> Last known ScanInfo
+        self.__infos = dict()
+        # Scan ID -> DataCursor for scans with scan listeners
+        self.__cursors = dict()
+        # Scan IDs of cursors that have all data of a completed scan
+        self.__complete = set()
+        self.__stop = threading.Event()
+        self.__wakeup = threading.Event()
+        self.__thread = None
+
+    def getClient(self):
+        """:return: :class:`~scan.client.scanclient.ScanClient`"""
+        return self.__client
+
+    def addListener(self, listener, scanID=None):
+        """Add listener
+
+        :param listener: :class:`ScanListener`
+        :param scanID: Scan ID to only receive updates for that scan,
+                       including data updates,
+                       or `None` to receive state and progress updates
+                       for all scans.
+        """
+        with self.__lock:
+            if scanID is None:
+                self.__listeners.append(listener)
+            else:
+                self.__scan_listeners.setdefault(scanID, list()).append(listener)
+        # Poll soon to inform new listener
+        self.__wakeup.set()
+
+    def removeListener(self, listener, scanID=None):
+        """Remove listener
+
+        :param listener: :class:`ScanListener`
+        :param scanID: Scan ID that was used to add the listener
+        """
+        with self.__lock:
+            if scanID is None:
+                self.__listeners.remove(listener)
+            else:
+                listeners = self.__scan_listeners[scanID]
+                listeners.remove(listener)
+                if not listeners:
+                    del self.__scan_listeners[scanID]
+                    self.__cursors.pop(scanID, None)
+                    self.__complete.discard(scanID)
+
+    def start(self):
+        """Start polling"""
+        if self.__thread is not None:
+            return
+        self.__stop.clear()
+        self.__thread = threading.Thread(target=self.__run, name="ScanMonitor")
+        self.__thread.setDaemon(True)
+        self.__thread.start()
+
+    def stop(self):
+        """Stop polling"""
+        if self.__thread is None:
+            return
+        self.__stop.set()
+        self.__wakeup.set()
+        self.__thread.join()
+        self.__thread = None
+
+    def isRunning(self):
+        """:return: `True` while polling"""
+        return self.__thread is not None
+
+    def __run(self):
+        delay = self.__poll
+        while not self.__stop.isSet():
+            try:
+                changed = self.poll()
+            except:
+                # Keep trying while disconnected/timed out
+                changed = False
+            if changed:
+                delay = self.__poll
+            else:
+                delay = min(delay * 2, self.__max_poll)
+            self.__wakeup.wait(delay)
+            self.__wakeup.clear()
+
+    def __notify(self, listeners, method, *args):
+        for listener in listeners:
+            try:
+                getattr(listener, method)(*args)
+            except:
+                pass
+
+    def poll(self):
+        """Poll the server once
+
+        Called by the background thread.
+        May also be called directly, without starting the thread,
+        to perform updates on the caller's thread.
+        When the background thread is polling at the same time,
+        the call waits until that poll is done.
+
+        :return: `True` if anything changed
+        """
+        with self.__poll_lock:
+            return self.__pollServer()
+
+    def __pollServer(self):
+        """Poll the server, called with poll lock held"""
+        infos = self.__client.scanInfos()
+        changed = False
+        current = dict()
+        for info in infos:
+            current[info.id] = info
+            with self.__lock:
+                listeners = self.__listeners + self.__scan_listeners.get(info.id, [])
+            old = self.__infos.get(info.id)
+            if old is None:
+                self.__notify(listeners, 'scanAdded', info)
+                changed = True
+            else:
+                if old.state != info.state:
+                    self.__notify(listeners, 'stateChanged', info, old.state)
+                    changed = True
+                if old.performed_work_units != info.performed_work_units  or \
+                   old.total_work_units != info.total_work_units:
+                    self.__notify(listeners, 'progressChanged', info)
+                    changed = True
+        self.__infos = current
+
+        with self.__lock:
+            scans = [ ( scanID, list(listeners) ) for scanID, listeners in self.__scan_listeners.items() ]
+        for scanID, listeners in scans:
+            info = current.get(scanID)
+            if info is None:
+                continue
+            with self.__lock:
+                if scanID in self.__complete:
+                    continue
+                cursor = self.__cursors.get(scanID)
+                if cursor is None:
+                    cursor = self.__cursors[scanID] = DataCursor(self.__client, scanID, self.__compact)
+            new_data = cursor.update()
+            if info.isDone():
+                # Scan was done before this update, so no more data will follow
+                with self.__lock:
+                    self.__complete.add(scanID)
+            if new_data:
+                self.__notify(listeners, 'dataAdded', info, cursor.data, new_data)
+                changed = True
+        return changed
+
+    def __repr__(self):
+        return "ScanMonitor(%s)" % repr(self.__client)
+
+
+__monitors = dict()
+__monitors_lock = threading.Lock()
+
+def getScanMonitor(host='localhost', port=4810):
+    """Get shared scan monitor
+
+    :param host: The IP address or name of scan server host.
+    :param port: The TCP port of the scan server.
+
+    :return: Running :class:`ScanMonitor` for that server,
+             shared by all callers
+    """
+    key = ( host, int(port) )
+    with __monitors_lock:
+        monitor = __monitors.get(key)
+        if monitor is None:
+            monitor = __monitors[key] = ScanMonitor(ScanClient(host, port))
+        monitor.start()
+        return monitor
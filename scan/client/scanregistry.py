@@ -0,0 +1,131 @@
+"""Scan Registry
+
+Remembers which scans were submitted to a scan server,
+indexed by the content hash of their commands,
+so identical scans can be found on the server
+and submitted again without re-creating their XML.
+"""
+
+import hashlib
+import threading
+
+def contentHash(xml):
+    """Compute content hash of scan XML
+
+    :param xml: XML text of a scan
+    :return: Hex digest
+    """
+    if isinstance(xml, unicode):
+        xml = xml.encode('utf-8')
+    return hashlib.sha1(xml).hexdigest()
+
+
+class ScanRegistry(object):
+    """Registry of submitted scans
+
+    For each scan server and content hash, holds the
+    IDs of the scans that were submitted with that content,
+    and the XML that was submitted.
+    To limit memory usage, the XML is only kept up to
+    a total size. Beyond that, the XML of the least recently
+    submitted scans is dropped, keeping their IDs.
+    Safe to use from multiple threads.
+
+    :param maxsize: Maximum number of content hashes kept per server.
+                    When more scans are submitted, the oldest entries are removed.
+    :param maxbytes: Maximum total length of XML kept for all servers,
+                     0 to not keep any XML.
+    """
+    def __init__(self, maxsize=100, maxbytes=4*1024*1024):
+        self.__maxsize = maxsize
+        self.__maxbytes = maxbytes
+        self.__lock = threading.Lock()
+        # server -> { hash: [ [ scan ID, ... ], xml or None ] }
+        self.__entries = dict()
+        # server -> [ hash, ... ], most recent last
+        self.__order = dict()
+        # [ ( server, hash ), ... ] of entries with XML, most recent last
+        self.__xml_order = list()
+        # Total length of kept XML
+        self.__bytes = 0
+
+    def __dropXML(self, server, content_hash):
+        """Drop XML of entry. Must be called with lock held."""
+        entry = self.__entries[server][content_hash]
+        if entry[1] is not None:
+            self.__bytes -= len(entry[1])
+            entry[1] = None
+            self.__xml_order.remove(( server, content_hash ))
+
+    def add(self, server, content_hash, scanID, xml):
+        """Add submitted scan
+
+        :param server: Scan server, for example its URL
+        :param content_hash: Content hash of the scan
+        :param scanID: ID of the submitted scan
+        :param xml: XML of the submitted scan
+        """
+        with self.__lock:
+            entries = self.__entries.setdefault(server, dict())
+            order = self.__order.setdefault(server, list())
+            entry = entries.get(content_hash)
+            if entry is None:
+                entry = entries[content_hash] = [ [ scanID ], None ]
+            else:
+                entry[0].append(scanID)
+                order.remove(content_hash)
+            order.append(content_hash)
+            # Keep XML, most recently submitted last
+            key = ( server, content_hash )
+            if entry[1] is not None:
+                self.__xml_order.remove(key)
+                self.__xml_order.append(key)
+            elif len(xml) <= self.__maxbytes:
+                entry[1] = xml
+                self.__bytes += len(xml)
+                self.__xml_order.append(key)
+            while len(order) > self.__maxsize:
+                oldest = order.pop(0)
+                self.__dropXML(server, oldest)
+                del entries[oldest]
+            while self.__bytes > self.__maxbytes:
+                self.__dropXML(*self.__xml_order[0])
+
+    def getScanIDs(self, server, content_hash):
+        """:return: IDs of scans submitted with that content, most recent last"""
+        with self.__lock:
+            entry = self.__entries.get(server, {}).get(content_hash)
+            return list(entry[0]) if entry else []
+
+    def getXML(self, server, content_hash):
+        """:return: XML of scan submitted with that content, or `None` if not kept"""
+        with self.__lock:
+            entry = self.__entries.get(server, {}).get(content_hash)
+            return entry[1] if entry else None
+
+    def getBytes(self):
+        """:return: Total length of kept XML"""
+        with self.__lock:
+            return self.__bytes
+
+    def removeScanID(self, server, content_hash, scanID):
+        """Remove scan ID, for example because the server no longer has that scan
+
+        The XML is kept to allow submitting the scan again.
+        """
+        with self.__lock:
+            entry = self.__entries.get(server, {}).get(content_hash)
+            if entry  and  scanID in entry[0]:
+                entry[0].remove(scanID)
+
+    def clear(self):
+        """Remove all entries"""
+        with self.__lock:
+            self.__entries = dict()
+            self.__order = dict()
+            self.__xml_order = list()
+            self.__bytes = 0
+
+
+# Registry shared by all ScanClient instances that don't provide their own
+default_registry = ScanRegistry()
@@ -1,4 +1,4 @@
-from scan.commands.commandsequence import CommandSequence
+from scan.commands.commandsequence import CommandSequence, iterSCN
 from scan.commands.command import Command
 from scan.commands.comment import Comment
 from scan.commands.configlog import ConfigLog
@@ -12,3 +12,5 @@ from scan.commands.set import Set
 from scan.commands.wait import Wait
 from scan.commands.parallel import Parallel
 from scan.commands.sequence import Sequence
+from scan.commands.optimizer import optimizeScan
+from scan.commands.scnparser import parseSCN
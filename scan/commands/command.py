@@ -3,16 +3,95 @@ Created on Mar 8,2015
 @author: qiuyx
 '''
 from abc import abstractmethod, ABCMeta
+try:
+    import xml.etree.cElementTree as ET
+except:
+    import xml.etree.ElementTree as ET
 
 class Command(object):
     __metaclass__ = ABCMeta
     """Base class for all commands."""
     
+    # Commands have no instance dictionary to keep large scans compact.
+    # _xml_cache holds ( level, pretty, text ) of last genXMLText()
+    # for commands without a body
+    __slots__ = ( '_xml_cache', )
+    
     @abstractmethod
     def genXML(self):
         """:return: XML representation of the command."""
         pass
 
+    def getBody(self):
+        """:return: Commands in the body of this command"""
+        return []
+
+    def _genXML(self, body):
+        """Create XML for a command with a body
+
+        Commands that have a body implement this
+        so that :func:`genXMLText` can re-use the text of body commands.
+
+        :param body: Elements to use for the body commands
+        :return: XML representation of the command.
+        """
+        return self.genXML()
+
+    def _invalidate(self):
+        """Discard cached XML text, called when the command changes"""
+        self._xml_cache = None
+
+    def genXMLText(self, level=0, pretty=True):
+        """XML text of the command
+        
+        The text of commands without a body is cached.
+        When such a command is serialized again, its text is only
+        re-generated if the command changed.
+        Commands with a body are serialized each time,
+        splicing in the cached text of their body commands.
+        
+        The cache holds the text of each command without a body
+        for as long as the command exists, so it costs about as much
+        memory as one copy of the XML for all commands.
+        The text of commands with a body is not kept,
+        since it would hold the XML of each nesting level again.
+        
+        :param level: Indentation level
+        :param pretty: Indent the XML?
+        :return: XML representation of the command as text,
+                 without trailing whitespace.
+        """
+        body = self.getBody()
+        if not body:
+            try:
+                cache = self._xml_cache
+            except AttributeError:
+                cache = None
+            if cache is not None  and  cache[0] == level  and  cache[1] == pretty:
+                return cache[2]
+        # scan.util imports commands, so import when needed
+        from scan.util.xml_helper import writeXML
+        if body:
+            placeholders = [ ET.Element('command') for command in body ]
+            xml = self._genXML(placeholders)
+            commands = dict(zip(placeholders, body))
+            def splice(elem, level):
+                command = commands.get(elem)
+                if command is None:
+                    return None
+                return command.genXMLText(level, pretty)
+        else:
+            xml = self.genXML()
+            splice = None
+        chunks = list()
+        writeXML(xml, chunks.append, level, True, pretty, splice)
+        text = ''.join(chunks).rstrip()
+        if body:
+            self._xml_cache = None
+        else:
+            self._xml_cache = ( level, pretty, text )
+        return text
+
     @abstractmethod
     def __repr__(self):
         """:return: Representation that can be used to create the command in python."""
@@ -3,13 +3,8 @@ Created on Mar 8 ,2015
 
 @author: qiuyx
 '''
-try:
-    import xml.etree.cElementTree as ET
-except:
-    import xml.etree.ElementTree as ET
-
+import hashlib
 from scan.commands.command import Command
-from scan.util.xml_helper import indent
 
 class CommandSequence(list):
     """A sequence of scan commands
@@ -34,6 +29,9 @@ class CommandSequence(list):
     def append(self, *commands):
         """Append more commands to the sequence
         
+        Lists, tuples or other iterables of commands,
+        also nested ones, are flattened into the sequence.
+        
         :param commands: One or more commands, or existing list of commands.
         """
         for command in commands:
@@ -42,16 +40,57 @@ class CommandSequence(list):
                 super(CommandSequence, self).append(command)
             else:
                 # Assume iterable tuple, list, set, .. and append its content
-                self.append(list(command))
+                self.append(*command)
+    
+    def genSCN(self, pretty=True):
+        """:param pretty: Indent the XML?
+           :return: Command in XML format suitable for scan server
+        """
+        return ''.join(iterSCN(self, pretty))
+    
+    def iterSCN(self, pretty=True):
+        """Generate XML for scan server in chunks
+        
+        :param pretty: Indent the XML?
+        :return: Generator for chunks of the XML text
+        """
+        return iterSCN(self, pretty)
+    
+    def writeSCN(self, file, pretty=True):
+        """Write XML for scan server to file
+        
+        :param file: File-like object
+        :param pretty: Indent the XML?
+        """
+        for chunk in iterSCN(self, pretty):
+            file.write(chunk)
+    
+    def contentHash(self):
+        """Compute content hash
+        
+        Identical commands result in the same hash,
+        see :class:`~scan.client.scanregistry.ScanRegistry`.
+        
+        :return: Hex digest of the XML created by :func:`genSCN`
+        """
+        digest = hashlib.sha1()
+        for chunk in iterSCN(self):
+            if isinstance(chunk, unicode):
+                chunk = chunk.encode('utf-8')
+            digest.update(chunk)
+        return digest.hexdigest()
     
-    def genSCN(self):
-        """:return: Command in XML format suitable for scan server"""
-        scn = ET.Element('commands')
-        for c in self:
-            scn.append(c.genXML())
+    @staticmethod
+    def fromXML(source):
+        """Create command sequence from scan XML
         
-        indent(scn)
-        return ET.tostring(scn)
+        :param source: XML text or file-like object with the XML,
+                       see :func:`~scan.commands.scnparser.parseSCN`
+        :return: :class:`CommandSequence`
+        """
+        # Parser imports all commands, which import this module
+        from scan.commands.scnparser import parseSCN
+        return CommandSequence(parseSCN(source))
     
     def format(self):
         """Format for printing
@@ -84,6 +123,72 @@ class CommandSequence(list):
         return "CommandSequence(" + str(self) + ")"
 
 
+def __iterCommands(commands):
+    """Generate commands, flattening nested lists"""
+    for command in commands:
+        if isinstance(command, Command):
+            yield command
+        else:
+            for nested in __iterCommands(command):
+                yield nested
+
+def iterSCN(commands, pretty=True, chunk_size=65536):
+    """Generate XML for scan server in chunks
+    
+    Serializes one command at a time, so the XML
+    for all commands is never joined into one text.
+    The text of commands without a body is cached, see :func:`~scan.commands.command.Command.genXMLText`,
+    so serializing mostly unchanged commands again is fast.
+    With `pretty`, the result is the same as
+    :func:`CommandSequence.genSCN`.
+    
+    :param commands: Commands, lists of commands or generator for commands
+    :param pretty: Indent the XML?
+    :param chunk_size: Approximate size of chunks in bytes
+    :return: Generator for chunks of the XML text
+    
+    Example:
+    
+    >>> for chunk in iterSCN(Set('x', i) for i in range(100000)):
+    ...     file.write(chunk)
+    """
+    chunk = list()
+    write = chunk.append
+    count = 0
+    
+    # Look ahead to know if a command is the last one, which ends the indentation
+    commands = __iterCommands(commands)
+    try:
+        command = commands.next()
+    except StopIteration:
+        yield "<commands />"
+        return
+    if pretty:
+        write("<commands>\n  ")
+    else:
+        write("<commands>")
+    while command is not None:
+        try:
+            following = commands.next()
+        except StopIteration:
+            following = None
+        if pretty:
+            write(command.genXMLText(1, True) + ("\n" if following is None else "\n  "))
+        else:
+            write(command.genXMLText(1, False))
+        command = following
+        # Check size of chunk every few commands
+        count += 1
+        if count % 100 == 0  and  sum(map(len, chunk)) >= chunk_size:
+            yield ''.join(chunk)
+            del chunk[:]
+    if pretty:
+        write("</commands>\n")
+    else:
+        write("</commands>")
+    yield ''.join(chunk)
+
+
 if __name__ == "__main__":
     from comment import Comment
     from loop import Loop
@@ -17,6 +17,8 @@ class Comment(Command):
     Example:
         >>> cmd = Comment("Scan Start.") 
     """
+    __slots__ = ( '__text', )
+
     def __init__(self, text="This is an example comment."):
         self.__text=text
     
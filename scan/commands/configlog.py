@@ -17,6 +17,8 @@ class ConfigLog(Command):
     Example:
         >>> cmd = ConfigLog(True)
     """
+    __slots__ = ( '__auto', '__errHandler' )
+
     def __init__(self, auto, errhandler=None):
         self.__auto=auto
         self.__errHandler=errhandler
@@ -17,6 +17,8 @@ class Delay(Command):
     Example:
         >>> cmd = Delay(2.5)
     """
+    __slots__ = ( '__seconds', '__errHandler' )
+
     def __init__(self, seconds, errhandler=None):
         self.__seconds = seconds
         self.__errHandler = errhandler
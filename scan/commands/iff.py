@@ -4,6 +4,14 @@ try:
 except:
     import xml.etree.ElementTree as ET
 
+# Comparisons supported by the If command, mapped to their XML names
+IF_COMPARISONS = {'=':'EQUALS',
+                  '!=':'UNEQUAL',
+                  '>':'ABOVE',
+                  '>=':'AT_LEAST',
+                  '<':'BELOW',
+                  '<=':'AT_MOST'}
+
 class If(Command):
     """Conditionally execute commands.
     
@@ -21,12 +29,8 @@ class If(Command):
         >>> cmd = If('pv1', '=', 10, [ Comment("It's 10") ])
     """
 
-    __comparisons= {'=':'EQUALS',
-                    '!=':'UNEQUAL',
-                    '>':'ABOVE',
-                    '>=':'AT_LEAST',
-                    '<':'BELOW',
-                    '<=':'AT_MOST'}
+    __slots__ = ( '__device', '__body', '__comparison', '__desiredValue', '__tolerance',
+                  '__errHandler' )
 
     def __init__(self, device, comparison, value, body=None, *args, **kwargs):
         if not isinstance(device, str):
@@ -41,7 +45,7 @@ class If(Command):
             self.__body = list()
         if args:
             self.__body += args
-        if not comparison in If.__comparisons:
+        if not comparison in IF_COMPARISONS:
             raise Exception("Invalid comparison '%s'" % comparison)
         self.__comparison = comparison
         self.__desiredValue = value
@@ -69,16 +73,17 @@ class If(Command):
         return self.__body
         
     def genXML(self):
+        return self._genXML([ command.genXML() for command in self.__body ])
+        
+    def _genXML(self, body):
         xml = ET.Element('if')
         
         ET.SubElement(xml, 'device').text = self.__device
-        ET.SubElement(xml, 'comparison').text = If.__comparisons[self.__comparison]
+        ET.SubElement(xml, 'comparison').text = IF_COMPARISONS[self.__comparison]
         ET.SubElement(xml, 'value').text = str(self.__desiredValue)
         ET.SubElement(xml, "tolerance").text = str(self.__tolerance)
              
-        body = ET.SubElement(xml,'body')
-        for command in self.__body:
-            body.append(command.genXML())
+        ET.SubElement(xml,'body').extend(body)
             
         if self.__errHandler:
             ET.SubElement(xml,'error_handler').text = str(self.__errHandler)
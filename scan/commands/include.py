@@ -23,6 +23,8 @@ class Include(Command):
     Example::
         >>> cmd = Include('PrepMotor.scn', macros='motor=MyMotor1')
     """
+    __slots__ = ( '__scanFile', '__macros', '__errHandler' )
+
     def __init__(self, scan, macros=None, errhandler=None):
         self.__scanFile = scan
         self.__macros = macros
@@ -28,9 +28,14 @@ class Log(Command):
         >>> cmd = Log(devices=["pv1", "pv2"])
         >>> cmd = Log(devices=["pv1", "pv2"], errhandler="OnErrorContinue")
     """
+    __slots__ = ( '__devices', '__errHandler' )
+
     def __init__(self, devices=None, *args, **kwargs):
         if isinstance(devices, str):
             self.__devices = [ devices ]
+        elif isinstance(devices, tuple):
+            # Immutable, so can be shared with other Log commands
+            self.__devices = devices
         elif devices:
             self.__devices = list(devices)
         else:
@@ -66,6 +66,9 @@ class Loop(Command):
     This can be useful for scanning the X/Y surface of a sample.    
     
     """
+    __slots__ = ( '__device', '__start', '__end', '__step', '__body',
+                  '__completion', '__readback', '__tolerance', '__timeout', '__errHandler' )
+
     def __init__(self, device, start, end, step, body=None, *args, **kwargs):
         if not isinstance(device, str):
             raise Exception("Expect device name, got '%s'" % str(device))
@@ -98,6 +101,7 @@ class Loop(Command):
         :param completion: Await callback completion?
         """
         self.__completion = completion
+        self._invalidate()
 
     def setReadback(self, readback):
         """Change readback
@@ -107,6 +111,7 @@ class Loop(Command):
                or name of specific device to check for readback.
         """
         self.__readback = readback
+        self._invalidate()
 
     def setTolerance(self, tolerance):
         """Change tolerance
@@ -114,6 +119,7 @@ class Loop(Command):
         :param tolerance:  Tolerance when checking numeric `readback`.
         """
         self.__tolerance = tolerance
+        self._invalidate()
 
     def setTimeout(self, timeout):
         """Change timeout
@@ -121,6 +127,7 @@ class Loop(Command):
         :param timeout:    Timeout in seconds, used for `completion` and `readback`.
         """
         self.__timeout = timeout
+        self._invalidate()
         
     def getBody(self):
         """Obtain list of body commands.
@@ -138,6 +145,9 @@ class Loop(Command):
         return self.__body
         
     def genXML(self):
+        return self._genXML([ command.genXML() for command in self.__body ])
+        
+    def _genXML(self, body):
         xml = ET.Element('loop')
         
         ET.SubElement(xml, 'device').text = self.__device
@@ -160,9 +170,7 @@ class Loop(Command):
         if need_timeout  and  self.__timeout > 0:
             ET.SubElement(xml, "timeout").text = str(self.__timeout)
                
-        body = ET.SubElement(xml,'body')
-        for command in self.__body:
-            body.append(command.genXML())
+        ET.SubElement(xml,'body').extend(body)
             
         if self.__errHandler:
             ET.SubElement(xml,'error_handler').text = str(self.__errHandler)
@@ -0,0 +1,211 @@
+"""Scan Optimizer
+
+Rewrites scan commands into a shorter scan that performs the same steps,
+so the scan server has less to parse and execute.
+
+Rules:
+
+`flatten`
+   Replace a `Parallel` or `Sequence` without timeout or error handler
+   that wraps a single command by that command.
+   Inline the body of such a `Sequence` where commands run one after the other.
+   Remove such wrappers when they are empty.
+
+`loops`
+   Replace a run of `Set` commands that write the same device,
+   using the same options, with integer values that change by a
+   constant step, by a `Loop`.
+
+`sets`
+   Remove a `Set` without completion, readback or error handler
+   when the next command sets the same device.
+   Not used by default, because this also removes 'pulses'
+   like `Set('trigger', 1), Set('trigger', 0)`.
+
+`logs`
+   Remove a `Log` that directly follows the same `Log`.
+   Not used by default, because the scan will then log fewer samples.
+"""
+
+import copy
+from scan.commands.commandsequence import CommandSequence
+from scan.commands.iff import If
+from scan.commands.log import Log
+from scan.commands.loop import Loop
+from scan.commands.parallel import Parallel
+from scan.commands.sequence import Sequence
+from scan.commands.set import Set
+
+#: All rules
+RULES = ( 'flatten', 'loops', 'sets', 'logs' )
+
+#: Rules that are used by default
+DEFAULT_RULES = ( 'flatten', 'loops' )
+
+def optimizeScan(commands, rules=DEFAULT_RULES, min_loop=3):
+    """Optimize scan commands
+
+    The original commands are not modified.
+
+    :param commands: Commands, lists of commands or :class:`~scan.commands.commandsequence.CommandSequence`
+    :param rules: Rules to apply, see :data:`RULES`
+    :param min_loop: Minimum number of `Set` commands to replace by a `Loop`
+
+    :return: ( :class:`~scan.commands.commandsequence.CommandSequence`, number of removed commands )
+
+    Example:
+
+    >>> cmds, removed = optimizeScan([ Set('x', 1), Set('x', 2), Set('x', 3) ])
+    >>> print cmds
+    [
+        Loop('x', 1, 3, 1)
+    ]
+    """
+    for rule in rules:
+        if not rule in RULES:
+            raise Exception("Unknown optimizer rule '%s'" % rule)
+    if min_loop < 2:
+        raise Exception("Need min_loop >= 2, got %d" % min_loop)
+    original = CommandSequence(commands)
+    optimized = CommandSequence(__optimizeBody(copy.deepcopy(list(original)), rules, min_loop))
+    return optimized, __count(original) - __count(optimized)
+
+def __count(commands):
+    """:return: Number of commands, including nested commands"""
+    count = 0
+    for command in commands:
+        count += 1 + __count(command.getBody())
+    return count
+
+def __hasOptions(command):
+    """:return: Does Parallel or Sequence have timeout or error handler?"""
+    return command.getTimeout() > 0  or  bool(command.getErrHandler())
+
+def __unwrap(command):
+    """:return: Command without trivial Parallel or Sequence wrapper, `None` if it does nothing"""
+    while isinstance(command, (Parallel, Sequence))  and  not __hasOptions(command):
+        body = command.getBody()
+        if len(body) == 0:
+            return None
+        if len(body) > 1:
+            break
+        command = body[0]
+    return command
+
+def __optimizeNested(command, rules, min_loop):
+    """Optimize body of command in place"""
+    body = command.getBody()
+    if not body:
+        return
+    if isinstance(command, Parallel):
+        # Commands run in parallel, each one can only be optimized by itself
+        optimized = list()
+        for nested in body:
+            __optimizeNested(nested, rules, min_loop)
+            if 'flatten' in rules:
+                nested = __unwrap(nested)
+            if nested is not None:
+                optimized.append(nested)
+        body[:] = optimized
+    elif isinstance(command, (Loop, If, Sequence)):
+        body[:] = __optimizeBody(body, rules, min_loop)
+
+def __optimizeBody(commands, rules, min_loop):
+    """:return: Optimized list of commands that run one after the other"""
+    result = list()
+    for command in commands:
+        __optimizeNested(command, rules, min_loop)
+        if 'flatten' in rules:
+            command = __unwrap(command)
+            if command is None:
+                continue
+            if isinstance(command, Sequence)  and  not __hasOptions(command):
+                result.extend(command.getBody())
+                continue
+        result.append(command)
+    if 'loops' in rules:
+        result = __createLoops(result, min_loop)
+    if 'sets' in rules:
+        result = __removeSets(result)
+    if 'logs' in rules:
+        result = __removeLogs(result)
+    return result
+
+def __isIntegerSet(command):
+    return isinstance(command, Set)  and  isinstance(command.getDevice(), str)  and \
+           type(command.getValue()) in ( int, long )
+
+def __setOptions(command):
+    """:return: Options of Set command that affect what it does"""
+    readback = command.getReadback()
+    wait = command.getCompletion()  or  readback
+    return ( bool(command.getCompletion()),
+             readback,
+             command.getTolerance() if readback else None,
+             command.getTimeout() if wait else None,
+             command.getErrHandler() )
+
+def __progression(commands, start):
+    """:return: ( end, step ) of Set commands that form an arithmetic progression"""
+    first = commands[start]
+    end = start + 1
+    step = None
+    if not __isIntegerSet(first):
+        return end, step
+    options = __setOptions(first)
+    while end < len(commands):
+        command = commands[end]
+        if not __isIntegerSet(command)  or \
+           command.getDevice() != first.getDevice()  or \
+           __setOptions(command) != options:
+            break
+        diff = command.getValue() - commands[end-1].getValue()
+        if diff == 0  or  (step is not None  and  diff != step):
+            break
+        step = diff
+        end += 1
+    return end, step
+
+def __createLoops(commands, min_loop):
+    """:return: Commands with runs of Set commands replaced by Loop"""
+    result = list()
+    i = 0
+    while i < len(commands):
+        end, step = __progression(commands, i)
+        if end - i < min_loop:
+            result.append(commands[i])
+            i += 1
+            continue
+        first = commands[i]
+        ( completion, readback, tolerance, timeout, errhandler ) = __setOptions(first)
+        loop = Loop(first.getDevice(), first.getValue(), commands[end-1].getValue(), step,
+                    completion=completion, readback=readback, timeout=timeout or 0,
+                    errhandler=errhandler)
+        if readback:
+            loop.setTolerance(tolerance)
+        result.append(loop)
+        i = end
+    return result
+
+def __removeSets(commands):
+    """:return: Commands without Set commands that are immediately overwritten"""
+    result = list()
+    for i in range(len(commands)):
+        command = commands[i]
+        if isinstance(command, Set)  and  i+1 < len(commands):
+            following = commands[i+1]
+            if isinstance(following, Set)  and  following.getDevice() == command.getDevice()  and \
+               not (command.getCompletion()  or  command.getReadback()  or  command.getErrHandler()):
+                continue
+        result.append(command)
+    return result
+
+def __removeLogs(commands):
+    """:return: Commands without repeated Log commands"""
+    result = list()
+    for command in commands:
+        if isinstance(command, Log)  and  result  and  isinstance(result[-1], Log)  and \
+           command.genXMLText(0, False) == result[-1].genXMLText(0, False):
+            continue
+        result.append(command)
+    return result
@@ -42,6 +42,8 @@ class Parallel(Command):
     .. with timeout:
         >>> cmd = Parallel(body=[command1, command2], timeout=10)
     """
+    __slots__ = ( '__body', '__timeout', '__errHandler' )
+
     def __init__(self, body=None, *args, **kwargs):
         if isinstance(body, Command):
             self.__body = [ body ]
@@ -57,20 +59,30 @@ class Parallel(Command):
     def getBody(self):
         return self.__body
 
+    def getTimeout(self):
+        """:return: Timeout in seconds, 0 for none"""
+        return self.__timeout
+
+    def getErrHandler(self):
+        """:return: Error handler"""
+        return self.__errHandler
+
     def append(self, *commands):
         for cmd in commands:
             self.__body.append(cmd)
+        self._invalidate()
     
     def genXML(self):
+        return self._genXML([ cmd.genXML() for cmd in self.__body ])
+    
+    def _genXML(self, body):
         xml = ET.Element('parallel')
         
         if self.__timeout > 0:
             ET.SubElement(xml, "timeout").text = str(self.__timeout)
 
-        if len(self.__body)!=0:
-            body = ET.SubElement(xml,'body')
-            for cmd in self.__body:
-                body.append(cmd.genXML())
+        if len(body)!=0:
+            ET.SubElement(xml,'body').extend(body)
                 
         if self.__errHandler:
             ET.SubElement(xml,'error_handler').text = str(self.__errHandler)
@@ -0,0 +1,224 @@
+"""Scan XML Parser
+
+Turns the XML of a scan, as created by
+:func:`~scan.commands.commandsequence.CommandSequence.genSCN`
+or returned by :func:`~scan.client.scanclient.ScanClient.scanCmds`,
+back into command objects.
+"""
+
+from StringIO import StringIO
+try:
+    import xml.etree.cElementTree as ET
+except:
+    import xml.etree.ElementTree as ET
+from scan.commands.comment import Comment
+from scan.commands.configlog import ConfigLog
+from scan.commands.delay import Delay
+from scan.commands.iff import If, IF_COMPARISONS
+from scan.commands.include import Include
+from scan.commands.log import Log
+from scan.commands.loop import Loop
+from scan.commands.parallel import Parallel
+from scan.commands.script import Script
+from scan.commands.sequence import Sequence
+from scan.commands.set import Set
+from scan.commands.wait import Wait, WAIT_COMPARISONS
+
+# Map XML comparison names back to the comparisons used by the commands
+__if_comparisons = dict([ (name, op) for op, name in IF_COMPARISONS.items() ])
+__wait_comparisons = dict([ (name, op) for op, name in WAIT_COMPARISONS.items() ])
+
+def __number(text):
+    """:return: int or float for numeric text, otherwise the text"""
+    try:
+        value = float(text)
+    except (TypeError, ValueError):
+        return text
+    if text.lstrip('+-').isdigit():
+        return int(text)
+    return value
+
+def __value(text):
+    """:return: Value of Set command, "quoted" text or number"""
+    if text is None:
+        return ''
+    if len(text) >= 2  and  text.startswith('"')  and  text.endswith('"'):
+        return text[1:-1]
+    if text in ( 'True', 'False' ):
+        return text == 'True'
+    return __number(text)
+
+def __options(elem, device):
+    """:return: Keyword arguments for completion, readback, tolerance, timeout, errhandler"""
+    options = dict()
+    if elem.findtext('completion') == 'true':
+        options['completion'] = True
+    readback = elem.findtext('readback')
+    if readback:
+        options['readback'] = True if readback == device else readback
+        options['tolerance'] = __number(elem.findtext('tolerance'))
+    timeout = elem.findtext('timeout')
+    if timeout:
+        options['timeout'] = __number(timeout)
+    errhandler = elem.findtext('error_handler')
+    if errhandler:
+        options['errhandler'] = errhandler
+    return options
+
+def __errhandler(elem):
+    """:return: Keyword arguments for errhandler"""
+    errhandler = elem.findtext('error_handler')
+    return { 'errhandler': errhandler } if errhandler else {}
+
+def __texts(elem, path):
+    """:return: Texts of the elements in a list like 'devices/device'"""
+    return [ item.text for item in elem.findall(path) ]
+
+def __comment(elem, body):
+    return Comment(elem.findtext('text') or '')
+
+def __configLog(elem, body):
+    return ConfigLog(elem.findtext('automatic') == 'true', elem.findtext('error_handler'))
+
+def __delay(elem, body):
+    return Delay(__number(elem.findtext('seconds')), elem.findtext('error_handler'))
+
+def __if(elem, body):
+    return If(elem.findtext('device'), __if_comparisons[elem.findtext('comparison')],
+              __number(elem.findtext('value')), body,
+              tolerance=__number(elem.findtext('tolerance')), **__errhandler(elem))
+
+def __include(elem, body):
+    return Include(elem.findtext('scan_file'), elem.findtext('macros'), elem.findtext('error_handler'))
+
+def __log(elem, body):
+    devices = __texts(elem, 'devices/device')
+    errhandler = elem.findtext('error_handler')
+    if errhandler:
+        return Log(devices, errhandler=errhandler)
+    return Log(devices)
+
+def __loop(elem, body):
+    device = elem.findtext('device')
+    start = __number(elem.findtext('start'))
+    end = __number(elem.findtext('end'))
+    step = __number(elem.findtext('step'))
+    options = __options(elem, device)
+    if options:
+        return Loop(device, start, end, step, body, **options)
+    return Loop(device, start, end, step, body)
+
+def __parallel(elem, body):
+    timeout = elem.findtext('timeout')
+    return Parallel(body, timeout=__number(timeout) if timeout else 0, **__errhandler(elem))
+
+def __script(elem, body):
+    args = [ __number(arg) for arg in __texts(elem, 'arguments/argument') ]
+    errhandler = elem.findtext('error_handler')
+    if args:
+        return Script(elem.findtext('path'), args, errHandler=errhandler)
+    return Script(elem.findtext('path'), errHandler=errhandler)
+
+def __sequence(elem, body):
+    return Sequence(*body, **__errhandler(elem))
+
+def __set(elem, body):
+    # Most common command, so avoid keyword arguments
+    find = elem.findtext
+    device = find('device')
+    readback = find('readback')
+    if readback:
+        if readback == device:
+            readback = True
+        tolerance = __number(find('tolerance'))
+    else:
+        readback = False
+        tolerance = 0.0
+    timeout = find('timeout')
+    return Set(device, __value(find('value')), find('completion') == 'true',
+               readback, tolerance, __number(timeout) if timeout else 0.0,
+               find('error_handler'))
+
+def __wait(elem, body):
+    tolerance = elem.findtext('tolerance')
+    timeout = elem.findtext('timeout')
+    return Wait(elem.findtext('device'), __number(elem.findtext('value')),
+                __wait_comparisons[elem.findtext('comparison')],
+                __number(tolerance) if tolerance else 0.0,
+                __number(timeout) if timeout else 0.0,
+                elem.findtext('error_handler'))
+
+# XML tag -> function( element, body ) that creates the command.
+# Body holds the commands of the 'body' sub-element.
+__parsers = {
+    'comment':    __comment,
+    'config_log': __configLog,
+    'delay':      __delay,
+    'if':         __if,
+    'include':    __include,
+    'log':        __log,
+    'loop':       __loop,
+    'parallel':   __parallel,
+    'script':     __script,
+    'sequence':   __sequence,
+    'set':        __set,
+    'wait':       __wait,
+}
+
+def __checkCommands(elem):
+    """Check that all sub-elements of 'commands' or 'body' are commands"""
+    for child in elem:
+        if not child.tag in __parsers:
+            raise Exception("Unknown command <%s>" % child.tag)
+
+def parseSCN(source):
+    """Parse scan XML into commands
+
+    The commands are created in one streaming pass while the
+    (C) ElementTree parses the XML.
+    Each command is created as soon as its end tag is parsed,
+    and its element is then cleared,
+    so only empty top-level elements remain in memory.
+
+    :param source: XML text or file-like object with the XML
+    :return: List of commands
+
+    Example:
+
+    >>> cmds = parseSCN(client.scanCmds(id))
+    >>> with open('scan.scn') as file:
+    ...     cmds = CommandSequence.fromXML(file)
+    """
+    if isinstance(source, basestring):
+        if isinstance(source, unicode):
+            source = source.encode('utf-8')
+        source = StringIO(source)
+    parsers = __parsers
+    # Commands whose parent element is still being parsed
+    commands = []
+    # Bodies of commands that are still being parsed
+    bodies = []
+    for event, elem in ET.iterparse(source):
+        tag = elem.tag
+        parser = parsers.get(tag)
+        # Set and Loop have a <wait> sub-element without children,
+        # while the Wait command has sub-elements.
+        # No other command tag is used for a sub-element.
+        if parser is not None  and  (len(elem)  or  tag != 'wait'):
+            if tag in ( 'if', 'loop', 'parallel', 'sequence' )  and  elem.find('body') is not None:
+                body = bodies.pop()
+            else:
+                body = []
+            commands.append(parser(elem, body))
+            elem.clear()
+        elif tag == 'body':
+            __checkCommands(elem)
+            count = len(elem)
+            bodies.append(commands[len(commands)-count:])
+            del commands[len(commands)-count:]
+            elem.clear()
+    # Last element is the root
+    if elem.tag != 'commands':
+        raise Exception("Expected <commands>, got <%s>" % elem.tag)
+    __checkCommands(elem)
+    return commands
@@ -43,6 +43,8 @@ class Script(Command):
     Example Script commands:
         >>> cmd = Script("MyScript", "pos", 42.3)
     """
+    __slots__ = ( '__path', '__args', '__errHandler' )
+
     def __init__(self, script='the_script.py', *args, **kwargs):
         self.__path = script
         # If args[0] is already a list, use that
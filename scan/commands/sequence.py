@@ -41,6 +41,8 @@ class Sequence(Command):
         >>> cmd = Sequence( Comment("One"), Comment("Two"), Comment("Three"))
     
     """
+    __slots__ = ( '__body', '__errHandler' )
+
     def __init__(self, body=None, *args, **kwargs):
         self.__body = list()
         if body:
@@ -55,14 +57,28 @@ class Sequence(Command):
                 self.append(*cmd.__body)
             else:
                 self.__body.append(cmd)
+        self._invalidate()
+    
+    def getBody(self):
+        """:return: Body commands, with nested sequences flattened"""
+        return self.__body
+        
+    def getTimeout(self):
+        """:return: 0, a sequence has no timeout"""
+        return 0
+
+    def getErrHandler(self):
+        """:return: Error handler"""
+        return self.__errHandler
         
     def genXML(self):
+        return self._genXML([ cmd.genXML() for cmd in self.__body ])
+    
+    def _genXML(self, body):
         xml = ET.Element('sequence')
         
-        if len(self.__body)!=0:
-            body = ET.SubElement(xml,'body')
-            for cmd in self.__body:
-                body.append(cmd.genXML())
+        if len(body)!=0:
+            ET.SubElement(xml,'body').extend(body)
                 
         if self.__errHandler:
             ET.SubElement(xml,'error_handler').text = str(self.__errHandler)
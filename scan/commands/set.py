@@ -40,6 +40,9 @@ class Set(Command):
     we wait for up to `timeout` seconds for the readback to be within tolerance.    
     """
 
+    __slots__ = ( '__device', '__value', '__completion', '__readback', '__tolerance',
+                  '__timeout', '__errHandler' )
+
     def __init__(self, device, value, completion=False, readback=False, tolerance=0.0, timeout=0.0, errhandler=None):
         self.__device = device
         self.__value = value
@@ -53,12 +56,37 @@ class Set(Command):
         """:return: Device name"""
         return self.__device
     
+    def getValue(self):
+        """:return: Value"""
+        return self.__value
+    
+    def getCompletion(self):
+        """:return: Await callback completion?"""
+        return self.__completion
+    
+    def getReadback(self):
+        """:return: `False`, `True` or name of device to check for readback"""
+        return self.__readback
+    
+    def getTolerance(self):
+        """:return: Tolerance when checking numeric `readback`"""
+        return self.__tolerance
+    
+    def getTimeout(self):
+        """:return: Timeout in seconds"""
+        return self.__timeout
+    
+    def getErrHandler(self):
+        """:return: Error handler"""
+        return self.__errHandler
+    
     def setCompletion(self, completion):
         """Change completion
         
         :param completion: Await callback completion?
         """
         self.__completion = completion
+        self._invalidate()
 
     def setReadback(self, readback):
         """Change readback
@@ -68,6 +96,7 @@ class Set(Command):
                or name of specific device to check for readback.
         """
         self.__readback = readback
+        self._invalidate()
 
     def setTolerance(self, tolerance):
         """Change tolerance
@@ -75,6 +104,7 @@ class Set(Command):
         :param tolerance:  Tolerance when checking numeric `readback`.
         """
         self.__tolerance = tolerance
+        self._invalidate()
 
     def setTimeout(self, timeout):
         """Change timeout
@@ -82,6 +112,7 @@ class Set(Command):
         :param timeout:    Timeout in seconds, used for `completion` and `readback`.
         """
         self.__timeout = timeout
+        self._invalidate()
         
     def genXML(self):
         xml = ET.Element('set')
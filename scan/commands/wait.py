@@ -9,6 +9,16 @@ try:
 except:
     import xml.etree.ElementTree as ET
 
+# Comparisons supported by the Wait command, mapped to their XML names
+WAIT_COMPARISONS = {'=':'EQUALS',
+                    '!=':'UNEQUAL',
+                    '>':'ABOVE',
+                    '>=':'AT_LEAST',
+                    '<':'BELOW',
+                    '<=':'AT_MOST',
+                    'increase by':'INCREASE_BY',
+                    'decrease by':'DECREASE_BY'}
+
 class Wait(Command):
     """Wait until a condition is met, i.e. a device reaches a value.
     
@@ -30,19 +40,13 @@ class Wait(Command):
         
     """
     
-    __comparisons= {'=':'EQUALS',
-                    '!=':'UNEQUAL',
-                    '>':'ABOVE',
-                    '>=':'AT_LEAST',
-                    '<':'BELOW',
-                    '<=':'AT_MOST',
-                    'increase by':'INCREASE_BY',
-                    'decrease by':'DECREASE_BY'}
+    __slots__ = ( '__device', '__desiredValue', '__comparison', '__tolerance', '__timeout',
+                  '__errHandler' )
 
     def __init__(self, device, value, comparison='=', tolerance=0.0, timeout=0.0, errhandler=None):
         self.__device = device
         self.__desiredValue = value
-        if not comparison in Wait.__comparisons:
+        if not comparison in WAIT_COMPARISONS:
             raise Exception("Invalid comparison '%s'" % comparison)
         self.__comparison = comparison
         self.__tolerance = tolerance
@@ -59,9 +63,10 @@ class Wait(Command):
         :param  comparison:  How current value is compared to the desired value.
                              Options: '=', '>', '>=', '<' , '<=', 'increase by','decrease by'
          """
-        if not comparison in Wait.__comparisons:
+        if not comparison in WAIT_COMPARISONS:
             raise Exception("Invalid comparison '%s'" % comparison)
         self.__comparison = comparison
+        self._invalidate()
 
     def setTolerance(self, tolerance):
         """Change tolerance
@@ -69,6 +74,7 @@ class Wait(Command):
         :param tolerance:  Tolerance when checking numeric `readback`.
         """
         self.__tolerance = tolerance
+        self._invalidate()
 
     def setTimeout(self, timeout):
         """Change timeout
@@ -76,6 +82,7 @@ class Wait(Command):
         :param timeout:    Timeout in seconds, used for `completion` and `readback`.
         """
         self.__timeout = timeout
+        self._invalidate()
         
     def genXML(self):
         xml = ET.Element('wait')
@@ -84,7 +91,7 @@ class Wait(Command):
             
         ET.SubElement(xml, 'value').text = str(self.__desiredValue)
         
-        ET.SubElement(xml, 'comparison').text = Wait.__comparisons[self.__comparison]
+        ET.SubElement(xml, 'comparison').text = WAIT_COMPARISONS[self.__comparison]
         
         if self.__tolerance > 0.0:
             ET.SubElement(xml,'tolerance').text = str(self.__tolerance)
@@ -4,7 +4,11 @@ or list "[ 1, 2 ]" or tuple "( 2, 4 )"
 
 @author: Kay Kasemir
 """
+import ast
+import itertools
 import re
+import threading
+from collections import OrderedDict
 
 # Regular expression for a number,
 # captured as one group,
@@ -21,10 +25,41 @@ __re_loop = "[Ll]oop *\((?:" + __re_dbl + ",)?" + __re_dbl + "(?:," + __re_dbl +
 range_matcher = re.compile(__re_range)
 loop_matcher = re.compile(__re_loop)
 
-def getRangeOrLoop(cell, matcher):
-    """Using either the range_matcher or loop_matcher,
-       get the (start, end, step) or None
+# Cache of parsed cells, least recently used first
+__cache = OrderedDict()
+__cache_lock = threading.Lock()
+
+# Maximum number of cached cells
+__cache_size = 10000
+
+# Maximum length of cached lists, longer ones are parsed each time
+__cache_max_length = 1000
+
+def __cached(key, parse, *args):
+    """Get result of parse(*args) from cache
+
+       Computes and caches the result if it is not in the cache.
+       Lists longer than __cache_max_length are not cached.
+       Results are shared, so they must not be modified.
     """
+    with __cache_lock:
+        try:
+            result = __cache.pop(key)
+            __cache[key] = result
+            return result
+        except KeyError:
+            pass
+    # Parse without holding the lock, since parsing may use the cache
+    result = parse(*args)
+    if isinstance(result, list)  and  len(result) > __cache_max_length:
+        return result
+    with __cache_lock:
+        __cache[key] = result
+        while len(__cache) > __cache_size:
+            __cache.popitem(last=False)
+    return result
+
+def __parseRangeOrLoop(cell, matcher):
     # Check for "range(...)" or "loop(...)"
     m = matcher.match(cell)
     if m:
@@ -39,13 +74,14 @@ def getRangeOrLoop(cell, matcher):
         return (start, end, step)
     else:
         return None
-    
-def getIterable(cell):
-    """If cell contains a range, list or tuple, return that iterable.
-       Otherwise returns None
+
+def getRangeOrLoop(cell, matcher):
+    """Using either the range_matcher or loop_matcher,
+       get the (start, end, step) or None
     """
-    cell = str(cell).strip()
+    return __cached(( matcher.pattern, cell ), __parseRangeOrLoop, cell, matcher)
 
+def __parseIterable(cell):
     # Check for "range(...)"
     rng = getRangeOrLoop(cell, range_matcher)
     if rng is not None:
@@ -58,15 +94,67 @@ def getIterable(cell):
             result.append(value)
             value += step
         return result
-    else:
-        # Eval a list or tuple
-        if (cell.startswith("(") or
-            cell.startswith("[")):
-            cell_range = eval(cell)
-            if isinstance(cell_range, (list, tuple)):
-                return cell_range
+    elif (cell.startswith("(") or
+          cell.startswith("[")):
+        # Parse a list or tuple of literals, never evaluating expressions
+        try:
+            cell_range = ast.literal_eval(cell)
+        except (ValueError, SyntaxError):
+            raise Exception("Cell must contain list or tuple of numbers or 'text', got " + cell)
+        if isinstance(cell_range, (list, tuple)):
+            return cell_range
     return None
 
+def getIterable(cell):
+    """If cell contains a range, list or tuple, return that iterable.
+       Otherwise returns None
+       
+       Lists and tuples may only contain literals like numbers or 'text'.
+       The result is cached and shared with other calls for the same cell,
+       so it must not be modified.
+    """
+    cell = str(cell).strip()
+    if not (cell.startswith("range") or
+            cell.startswith("(") or
+            cell.startswith("[")):
+        return None
+    return __cached(cell, __parseIterable, cell)
+    
+def __parseProgression(cell):
+    values = getIterable(cell)
+    if values is None  or  len(values) < 2:
+        return None
+    for value in values:
+        if not type(value) in ( int, long, float ):
+            return None
+    start = values[0]
+    step = values[1] - start
+    if step == 0:
+        return None
+    # Allow for rounding errors of fractional range steps
+    tolerance = abs(step) * 1e-6
+    for i in range(2, len(values)):
+        if abs(values[i] - (start + i*step)) > tolerance:
+            return None
+    return tuple([ float("%.12g" % value) if type(value) is float else value
+                   for value in ( start, values[-1], step ) ])
+
+def getProgression(cell):
+    """If cell contains a range, list or tuple of at least two
+       numbers that change by a constant step, get (start, end, step).
+       Otherwise returns None
+       
+       Input:
+       "range(1, 12, 5)"
+       
+       Returns:
+       (1.0, 11.0, 5.0)
+    """
+    cell = str(cell).strip()
+    if getIterable(cell) is None:
+        return None
+    return __cached(( 'progression', cell ), __parseProgression, cell)
+
 def expandRangeInRow(row):
     """Given a row, look for cells that contain
           range(start, end, step)
@@ -105,25 +193,51 @@ def expandRangeInRow(row):
     return None
 
 
+def __cellValues(cell):
+    """Get values of a cell
+
+       Returns list of texts for a cell with a range, list or tuple,
+       where texts that are again ranges, lists or tuples are expanded as well.
+       Returns [ '' ] for a cell that expands to nothing,
+       and [ cell ] for a cell with nothing to expand.
+    """
+    cell_range = getIterable(cell)
+    if cell_range is None:
+        return [ cell ]
+    if len(cell_range) == 0:
+        return [ '' ]
+    result = []
+    for value in cell_range:
+        result.extend(__cellValues(str(value)))
+    return result
+
 def expandRanges(rows):
     """Given a table of rows, expand rows that contain
           range(start, end, step)
        into multiple rows.
        
-       Iterates until there is nothing to expand.
+       Each row is expanded into all combinations of its cell values,
+       where the right-most cell changes fastest.
+       
+       Returns list of rows.
+    """
+    return list(iterExpandedRanges(rows))
+
+def iterExpandedRanges(rows):
+    """Given rows, expand rows that contain
+          range(start, end, step)
+       into multiple rows while they are read.
+       
+       Same result as :func:`expandRanges`,
+       but the rows are read and expanded as needed.
+       
+       Returns generator for the expanded rows.
     """
-    result = []
-    nothing = True
     for row in rows:
-        expanded = expandRangeInRow(row)
-        if expanded is not None:
-            nothing = False
-            result.extend(expanded)
+        cells = [ __cellValues(cell) for cell in row ]
+        if all(len(values) == 1  and  values[0] is cell for values, cell in zip(cells, row)):
+            # Nothing to expand
+            yield row
         else:
-            result.append(row)
-    # If nothing was expanded, return as is
-    if nothing:
-        return result
-    # Expanded at least one cell on one row
-    # check if there are more cells 
-    return expandRanges(result)
+            for expanded_row in itertools.product(*cells):
+                yield list(expanded_row)
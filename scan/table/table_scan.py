@@ -197,6 +197,17 @@ The resulting scan, however, becomes a sequence of 1000 `Set` commands::
 
 For larger loops respectively ranges, the loop will be more efficient.
 
+When creating the scan with `createScan(loops=True)`, a `range` or list
+whose values change by a constant step is turned into a `Loop`,
+as if the cell contained the corresponding `loop(start, end, step)`.
+The `range(1,4,1)` from above then becomes::
+
+   Loop('position', 1, 3, 1)
+
+This is only possible for the right-most range or list of a row,
+for a device that is not accessed in parallel,
+and when the cells before it only contain comments or plain values.
+
 Within a row, multiple ranges or lists are recursively expanded from right to left,
 similar to the nesting of loops:
 
@@ -584,10 +595,11 @@ API
 """
 # @author: Kay Kasemir
 
+from collections import OrderedDict
 from scan.commands import Command, Comment, Delay, Log, Parallel
 from scan.util.scan_settings import getScanSettings, SettingsBasedSet, SettingsBasedLoop, SettingsBasedWait
 from scan.util.seconds import parseSeconds
-from range_helper import getRangeOrLoop, loop_matcher, expandRanges
+from range_helper import getRangeOrLoop, loop_matcher, getIterable, getProgression, iterExpandedRanges
 from scan.util.spreadsheet import readSpreadsheet, writeSpreadsheet
 
 def loadTableScan(filename, pre=None, post=None, start=None, stop=None):
@@ -615,6 +627,53 @@ def is_list(x):
         return True
     return False
 
+class _ScanState(object):
+    """State of one scan created from a table
+    
+    Each :func:`TableScan.iterScan` uses its own state,
+    so several scans can be created from the same table at the same time.
+    
+    :param log_always: Optional list of device names that are always logged
+    """
+    def __init__(self, log_always=None):
+        # Line of the table
+        self.line = 0
+        # Where commands of the current row are added
+        self.commands = list()
+        # Parallel commands to execute in this row
+        self.parallel = list()
+        # Devices to log, in the order they were added
+        self.log_devices = OrderedDict()
+        self.log_snapshot = None
+        if log_always is not None:
+            for device in log_always:
+                self.addLogDevice(device)
+
+    def flushParallel(self, commands):
+        """:param commands: Where accumulated parallel commands are appended
+           :return: True if there were any parallel commands
+        """
+        if len(self.parallel) > 0:
+            # Complete accumulated parallel commands before starting the run
+            commands.append(Parallel(self.parallel))
+            self.parallel = list()
+            return True
+        return False
+
+    def addLogDevice(self, device):
+        """Add device to those that are logged"""
+        if not device in self.log_devices:
+            self.log_devices[device] = True
+            self.log_snapshot = None
+
+    def createLog(self):
+        """:return: Log command for the current log devices"""
+        # Log commands share the same tuple of devices until more devices are added
+        if self.log_snapshot is None:
+            self.log_snapshot = tuple(self.log_devices)
+        return Log(self.log_snapshot)
+
+
 class TableScan:
     """Create Table scan
     
@@ -708,25 +767,224 @@ class TableScan:
         except ValueError:
             return text # Keep as string
     
-    def __flushParallel(self, commands):
-        """:param commands: Where accumulated parallel commands are appended
-           :return: True if there were any parallel commands
+    def __createLoop(self, row, col_device):
+        """Replace range or list cell by loop
+        
+        The right-most range or list cell of a row is replaced by a `loop`
+        if its values change by a constant step,
+        it is a column for a device that is not accessed in parallel,
+        the columns before it only have comments or device values
+        that remain the same for all values of the range or list,
+        and the columns after it have no `loop`.
+        A `loop` after it would become a nested loop,
+        which changes direction on each pass for a negative step.
+        
+        :param row: Row of the table
+        :param col_device: Device settings for each column
+        :return: Row with loop, or original row
         """
-        if len(self.parallel_commands) > 0:
-            # Complete accumulated parallel_commands before starting the run
-            commands.append(Parallel(self.parallel_commands))
-            self.parallel_commands = list()
-            return True
-        return False
-    
-    def createScan(self, lineinfo=True):
+        c = self.cols - 1
+        while c >= 0  and  getIterable(row[c]) is None:
+            c -= 1
+        if c < 0:
+            return row
+        device = col_device[c]
+        if device is None  or  self.headers[c] in self.special  or  device.getParallel():
+            return row
+        progression = getProgression(row[c])
+        # Loop uses floating point values, which need to be exact
+        if progression is None  or  max([ abs(value) for value in progression ]) >= 2**53:
+            return row
+        for before in range(c):
+            if len(row[before]) <= 0  or  self.headers[before].lower() == TableScan.COMMENT.lower():
+                continue
+            if col_device[before] is None  or  self.headers[before] in self.special  or \
+               getRangeOrLoop(row[before], loop_matcher) is not None:
+                return row
+        for after in range(c+1, self.cols):
+            if getRangeOrLoop(row[after], loop_matcher) is not None:
+                return row
+        loop_row = list(row)
+        loop_row[c] = "loop(%s)" % ", ".join([ repr(float(value)) for value in progression ])
+        return loop_row
+
+    def __compileColumns(self, settings, col_device):
+        """Create handlers for the columns
+        
+        Each handler is called as `handler(state, row, c)` for a non-empty cell
+        in column `c` of a row.
+        It adds commands to the current row of the :class:`_ScanState`
+        and returns the number of columns that it handled.
+        
+        :param settings: :class:`~scan.util.scan_settings.ScanSettings`
+        :param col_device: Device settings for each column
+        :return: List of handlers, one per column
+        """
+        handlers = list()
+        for c in range(self.cols):
+            what = self.headers[c]
+            if what in self.special:
+                handler = self.__specialHandler(self.special[what])
+            elif what.lower() == TableScan.COMMENT.lower():
+                handler = self.__handleComment
+            elif what.lower() == TableScan.WAITFOR.lower():
+                handler = self.__waitForHandler(settings, c)
+            elif what.lower() in ( TableScan.VALUE.lower(), TableScan.OR_TIME.lower() ):
+                handler = self.__misplacedHandler(what)
+            else:
+                handler = self.__deviceHandler(col_device[c])
+            handlers.append(handler)
+        return handlers
+
+    def __specialHandler(self, special_handler):
+        def handle(state, row, c):
+            state.flushParallel(state.commands)
+            value = self.__getValue(row[c])
+            command = special_handler(value)
+            state.commands.append(command)
+            return 1
+        return handle
+
+    def __handleComment(self, state, row, c):
+        state.flushParallel(state.commands)
+        text = row[c]
+        state.commands.append(Comment(text))           
+        # TODO if self.settings.comment:
+        #       row_commands.append(SetCommand(self.settings.comment, text))
+        return 1
+
+    def __misplacedHandler(self, what):
+        def handle(state, row, c):
+            raise Exception("Line %d: Found value '%s' in '%s' column after empty '%s' column.\nRow: %s" %
+                            (state.line, row[c], what, TableScan.WAITFOR, str(row)))
+        return handle
+
+    def __waitForHandler(self, settings, c):
+        # Use timeout from TableScan.OR_TIME?
+        use_time = c+2 < self.cols  and  self.headers[c+2] == TableScan.OR_TIME
+        # Skip TableScan.VALUE in addition to current column,
+        # so misplaced value handlers are not called unless there's an empty "WAIT_FOR"
+        if c+2 < self.cols  and  self.headers[c+2].lower() == TableScan.OR_TIME.lower():
+            handled = 3
+        else:
+            handled = 2
+        # Name in "Wait For" column -> ( settings for Wait, name of device to log )
+        devices = dict()
+        def handle(state, row, c):
+            row_commands = state.commands
+            waitfor = row[c]
+            value = self.__getValue(row[c+1])
+            timeout = 0
+            errhandler = None
+            if use_time:
+                or_time = row[c+2].strip()
+                if len(or_time) > 0:
+                    timeout = parseSeconds(or_time)
+                    errhandler = "OnErrorContinue"
+ 
+            condition = waitfor.lower()
+            if condition != TableScan.COMPLETION:
+                # Complete accumulated parallel commands before starting the run
+                state.flushParallel(row_commands)
+
+            # Optional commands to mark start of a "Wait For"
+            if self.start:
+                row_commands += self.start
+
+            if condition == TableScan.COMPLETION:
+                # Assert that there are any parallel commands,
+                # because otherwise the 'WaitFor - Completion' was likely an error
+                if state.flushParallel(row_commands):
+                    command = row_commands[-1]
+                    if timeout > 0:
+                        row_commands[-1] = Parallel(command.getBody(), timeout = timeout, errhandler = errhandler)
+                else:
+                    raise Exception("Line %d has no parallel commands to complete" % state.line)
+            elif condition in ( TableScan.SECONDS, TableScan.TIME ):
+                if value:
+                    row_commands.append(Delay(parseSeconds(value)))
+            else:
+                device = devices.get(waitfor)
+                if device is None:
+                    device = devices[waitfor] = ( settings.parseDeviceSettings(waitfor),
+                                                  settings.getDefaultSettings(waitfor).getName() )
+                cmd = SettingsBasedWait(device[0], value, timeout=timeout, errhandler=errhandler)
+                row_commands.append(cmd)
+                state.addLogDevice(device[1])
+            
+            if state.log_devices:
+                row_commands.append(state.createLog())
+
+            # Optional commands to mark end of a "Wait For"
+            if self.stop:
+                row_commands += self.stop
+            return handled
+        return handle
+
+    def __deviceHandler(self, device):
+        # 'Normal' column that sets a device directly or in loop
+        parallel = device.getParallel()
+        name = device.getName()
+        def handle(state, row, c):
+            value = self.__getValue(row[c])
+            
+            if type(value) is float:
+                loop = None
+            else:
+                loop = getRangeOrLoop(str(value), loop_matcher)
+
+            if loop is None:
+                command = SettingsBasedSet(device, value)
+                if parallel:
+                    # Add one more parallel command
+                    state.parallel.append(command)
+                else:
+                    # Normal command, flush accumulated parallel commands
+                    state.flushParallel(state.commands)
+                    state.commands.append(command)
+            else:
+                # Create loop
+                body = list()
+                command = SettingsBasedLoop(device, loop[0], loop[1], loop[2], body)
+                if parallel:
+                    state.parallel.append(command)
+                else:                            
+                    state.flushParallel(state.commands)
+                    state.commands.append(command)
+                    
+                    # Place remaining commands in row into body of this loop
+                    state.commands = command.getBody()
+            
+            state.addLogDevice(name)
+            return 1
+        return handle
+
+    def createScan(self, lineinfo=True, loops=False):
         """Create scan.
 
         :param lineinfo: By default Comment commands are added for line info.
                          If scan settings include a "table_scan_row",
                          that PV will also be set.
+        :param loops: Create a `Loop` instead of one row per value
+                      for `range` and list cells whose values change
+                      by a constant step, where possible.
         :return: List of commands.
         """
+        return list(self.iterScan(lineinfo, loops))
+
+    def iterScan(self, lineinfo=True, loops=False):
+        """Create scan, generating the commands row by row.
+
+        Cells with ranges are expanded while the rows are handled,
+        so a large table can be submitted without holding
+        all its rows and commands in memory:
+
+        >>> client.submit(table.iterScan(), 'Large Table')
+
+        :param lineinfo: See :func:`createScan`
+        :param loops: See :func:`createScan`
+        :return: Generator for the top-level commands.
+        """
         # Parse column headers.
         settings = getScanSettings()
         col_device = [ None for i in range(self.cols) ]
@@ -749,158 +1007,59 @@ class TableScan:
                 col_device[i] = settings.parseDeviceSettings(self.headers[i])
             i += 1
         
+        rows = self.rows
+        if loops:
+            rows = [ self.__createLoop(row, col_device) for row in rows ]
         # Add first column of line numbers
-        numbered = []
-        for row in self.rows:
-            numbered_row = list(row)
-            numbered_row.insert(0, len(numbered)+1)
-            numbered.append(numbered_row)
+        numbered = ( [ r+1 ] + rows[r] for r in range(len(rows)) )
         # Expand any range(start, end, step) cells
         # (which will duplicate the line numbers)
-        expanded_rows = expandRanges(numbered)
+        expanded_rows = iterExpandedRanges(numbered)
         
         # Assemble commands for each row in the table
         current_line = 0
-        commands = list()
-        log_devices = list()
-        if self.log_always is not None:
-            log_devices = list(self.log_always)
+        state = _ScanState(self.log_always)
+        handlers = self.__compileColumns(settings, col_device)
         if self.pre:
-            commands += self.pre
+            for command in self.pre:
+                yield command
         for numbered_row in expanded_rows:
             line = numbered_row[0]
             row = numbered_row[1:]
-            row_commands = commands
+            # Top-level commands of this row.
+            # Loops may still receive commands for the remaining columns,
+            # so they are passed on once the row is complete.
+            commands = list()
+            state.commands = commands
+            state.line = line
             if line != current_line:
                 if lineinfo:
-                    row_commands.append(Comment("# Line %d" % line))
+                    commands.append(Comment("# Line %d" % line))
                     if settings.table_scan_row:
-                        row_commands.append(SettingsBasedSet(settings.table_scan_row, line))
+                        commands.append(SettingsBasedSet(settings.table_scan_row, line))
                 current_line = line
-            # Parallel commands to execute in this row
-            self.parallel_commands = list()
+            state.parallel = list()
             # Handle all columns
             c = 0
             while c < self.cols:
-                what = self.headers[c]
                 if len(row[c]) <= 0:
-                    pass # Empty column, nothing to do
-                elif what in self.special:
-                    self.__flushParallel(row_commands)
-                    special_handler = self.special[what]
-                    value = self.__getValue(row[c])
-                    command = special_handler(value)
-                    row_commands.append(command)
-                elif what.lower() == TableScan.COMMENT.lower():
-                    self.__flushParallel(row_commands)
-                    text = row[c]
-                    row_commands.append(Comment(text))           
-                    # TODO if self.settings.comment:
-                    #       row_commands.append(SetCommand(self.settings.comment, text))
-                elif what.lower() == TableScan.WAITFOR.lower():
-                    waitfor = row[c]
-                    value = self.__getValue(row[c+1])
-                    timeout = 0
-                    errhandler = None
-                    if c+2 < self.cols  and  self.headers[c+2] == TableScan.OR_TIME:
-                        or_time = row[c+2].strip()
-                        if len(or_time) > 0:
-                            timeout = parseSeconds(or_time)
-                            errhandler = "OnErrorContinue"
- 
-                    if waitfor.lower() != TableScan.COMPLETION:
-                        # Complete accumulated parallel_commands before starting the run
-                        self.__flushParallel(row_commands)
-
-                    # Optional commands to mark start of a "Wait For"
-                    if self.start:
-                        row_commands += self.start
-
-                    if waitfor.lower() == TableScan.COMPLETION:
-                        # Assert that there are any parallel commands,
-                        # because otherwise the 'WaitFor - Completion' was likely an error
-                        if self.__flushParallel(row_commands):
-                            command = row_commands[-1]
-                            if timeout > 0:
-                                row_commands[-1] = Parallel(command.getBody(), timeout = timeout, errhandler = errhandler)
-                        else:
-                            raise Exception("Line %d has no parallel commands to complete" % line)
-                    elif waitfor.lower() in ( TableScan.SECONDS, TableScan.TIME ):
-                        if value:
-                            row_commands.append(Delay(parseSeconds(value)))
-                    else:
-                        cmd = SettingsBasedWait(waitfor, value, timeout=timeout, errhandler=errhandler)
-                        row_commands.append(cmd)
-                        waitfor_device = settings.getDefaultSettings(waitfor).getName()
-                        if not waitfor_device in log_devices:
-                            log_devices.append(waitfor_device)
-                    
-                    if len(log_devices) > 0:
-                        row_commands.append(Log(log_devices))
-
-                    # Optional commands to mark end of a "Wait For"
-                    if self.stop:
-                        row_commands += self.stop
-                    
-                    # Skip TableScan.VALUE in addition to current column,
-                    # so next two Exceptions should not happen unless there's an empty "WAIT_FOR"
-                    if c+2 < self.cols  and  self.headers[c+2].lower() == TableScan.OR_TIME.lower():
-                        c = c + 2
-                    else:
-                        c = c + 1
-                elif what.lower() == TableScan.VALUE.lower():
-                    raise Exception("Line %d: Found value '%s' in '%s' column after empty '%s' column.\nRow: %s" %
-                                    (line, row[c], TableScan.VALUE, TableScan.WAITFOR, str(row)))
-                elif what.lower() == TableScan.OR_TIME.lower():
-                    raise Exception("Line %d: Found value '%s' in '%s' column after empty '%s' column.\nRow: %s" %
-                                    (line, row[c], TableScan.OR_TIME, TableScan.WAITFOR, str(row)))
+                    c = c + 1 # Empty column, nothing to do
                 else:
-                    # 'Normal' column that sets a device directly or in loop
-                    device = col_device[c]
-                    value = self.__getValue(row[c])
-                    
-                    if type(value) is float:
-                        loop = None
-                    else:
-                        loop = getRangeOrLoop(str(value), loop_matcher)
-
-                    if loop is None:
-                        command = SettingsBasedSet(what, value)
-                        if device.getParallel():
-                            # Add one more parallel command
-                            self.parallel_commands.append(command)
-                        else:
-                            # Normal command, flush accumulated parallel commands
-                            self.__flushParallel(row_commands)
-                            row_commands.append(command)
-                    else:
-                        # Create loop
-                        body = list()
-                        command = SettingsBasedLoop(what, loop[0], loop[1], loop[2], body)
-                        if device.getParallel():
-                            self.parallel_commands.append(command)
-                        else:                            
-                            self.__flushParallel(row_commands)
-                            row_commands.append(command)
-                            
-                            # Place remaining commands in row into body of this loop
-                            row_commands = command.getBody()
-                    
-                    if not device.getName() in log_devices:
-                        log_devices.append(device.getName())
-                c = c + 1
+                    c = c + handlers[c](state, row, c)
             # End of columns in row
             # Complete accumulated parallel commands
-            self.__flushParallel(row_commands)
+            state.flushParallel(state.commands)
+            for command in commands:
+                yield command
         
         # End of row
         if self.post:
             # End one long run at end of table
-            commands += self.post
+            for command in self.post:
+                yield command
             
         if lineinfo:
-            commands.append(Comment("# End"))
-        return commands
+            yield Comment("# End")
 
         
     def __repr__(self):
@@ -1 +1,2 @@
-from scan_settings import ScanSettings, setScanSettings, SettingsBasedLoop, SettingsBasedSet, SettingsBasedWait
\ No newline at end of file
+from scan_settings import ScanSettings, setScanSettings, SettingsBasedLoop, SettingsBasedSet, SettingsBasedWait
+from simulation import ScanSimulator
\ No newline at end of file
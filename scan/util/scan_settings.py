@@ -11,6 +11,7 @@ Provides information on how to access a device.
   * Look for exact match, or use a tolrance of +- 0.5?
   
 * With what timeout?
+* How fast does it change, for estimating the duration of a scan?
 
 When installing the scan client library,
 derive your site-specific implementation
@@ -46,8 +47,11 @@ class DeviceSettings(object):
     :param tolerance:  Tolerance for numeric readback comparison.
     :param comparison: Comparison to use in Wait commands
     :param parallel:   Perform in parallel?
+    :param rate:       Rate of change in units per second, for example speed of a motor,
+                       used to estimate how long it takes to reach a value.
+                       `None` if unknown.
     """
-    def __init__(self, name, completion=False, readback=False, timeout=0.0, tolerance=None, comparison='>=', parallel=False):
+    def __init__(self, name, completion=False, readback=False, timeout=0.0, tolerance=None, comparison='>=', parallel=False, rate=None):
         self._name = name
         self._completion = completion
         self._readback = readback
@@ -55,6 +59,7 @@ class DeviceSettings(object):
         self._tolerance = tolerance
         self._comparison = comparison
         self._parallel = parallel
+        self._rate = rate
     
     def getName(self):
         """:returns: Device name."""
@@ -85,13 +90,20 @@ class DeviceSettings(object):
     def getParallel(self):
         """:returns: To be performed in parallel."""
         return self._parallel
+
+    def getRate(self):
+        """:returns: Rate of change in units per second, or None."""
+        return self._rate
     
     def __repr__(self):
         rb = self.getReadback()
         if rb:
             rb = "'" + rb + "'"
-        return "DeviceSettings('%s', completion=%s, readback=%s, timeout=%g, tolerance=%s, comparison='%s', parallel=%s)" % (
-                self._name, str(self._completion), rb,  self._timeout, str(self._tolerance), self._comparison, str(self._parallel))
+        result = "DeviceSettings('%s', completion=%s, readback=%s, timeout=%g, tolerance=%s, comparison='%s', parallel=%s" % (
+                  self._name, str(self._completion), rb,  self._timeout, str(self._tolerance), self._comparison, str(self._parallel))
+        if self._rate is not None:
+            result += ", rate=%g" % self._rate
+        return result + ")"
 
 
 
@@ -120,10 +132,11 @@ class ScanSettings(object):
             
             {
                ".*daq.*": { "completion": true },
-               "pcharge": { comparison": "increase by" },
+               "pcharge": { comparison": "increase by", "rate": 1e10 },
                "setpoint": { "completion": true, 
                              "tolerance": 0.1, 
-                             "readback": "readback"}
+                             "readback": "readback",
+                             "rate": 0.5 }
             }
         """
         with open(json_filename) as config_file:
@@ -136,7 +149,8 @@ class ScanSettings(object):
                                    readback=f(attr.get('readback', False)),
                                    timeout=attr.get('timeout', 0.0),
                                    tolerance=attr.get('tolerance', 0.0),
-                                   comparison=attr.get('comparison', ">=")
+                                   comparison=attr.get('comparison', ">="),
+                                   rate=attr.get('rate')
                                    )
 
     def getReadbackName(self, device_name):
@@ -156,7 +170,7 @@ class ScanSettings(object):
         
         return device_name
         
-    def defineDeviceClass(self, name_pattern, completion=False, readback=False, timeout=0.0, tolerance=None, comparison='>='):
+    def defineDeviceClass(self, name_pattern, completion=False, readback=False, timeout=0.0, tolerance=None, comparison='>=', rate=None):
         """Define a class of devices based on name
         
         Call this in the constructor of your derived class.
@@ -174,8 +188,9 @@ class ScanSettings(object):
         :param timeout:      Time out for callback and readback in seconds. 0 to wait forever.
         :param tolerance:    Tolerance for numeric readback comparison.
         :param comparison:   Comparison to use in Wait commands.
+        :param rate:         Rate of change in units per second, used to estimate the duration of scans.
         """
-        self.device_settings.insert(0, DeviceSettings(name_pattern, completion, readback, timeout, tolerance, comparison))                
+        self.device_settings.insert(0, DeviceSettings(name_pattern, completion, readback, timeout, tolerance, comparison, rate=rate))                
                         
     def getDefaultSettings(self, name):
         """Get the default settings for a device
@@ -192,7 +207,8 @@ class ScanSettings(object):
                 rb = setting._readback
                 if rb == True:
                     rb = self.getReadbackName(name)
-                return DeviceSettings(name, setting.getCompletion(), rb, setting.getTimeout(), setting.getTolerance(), setting.getComparison())
+                return DeviceSettings(name, setting.getCompletion(), rb, setting.getTimeout(), setting.getTolerance(), setting.getComparison(),
+                                      rate=setting.getRate())
         return DeviceSettings(name)
     
     def parseDeviceSettings(self, prefixed_device):
@@ -255,7 +271,7 @@ class ScanSettings(object):
             readback = device
         
         return DeviceSettings(default.getName(), completion=completion, readback=readback, timeout=default.getTimeout(), tolerance=default.getTolerance(),
-                              comparison=default.getComparison(), parallel=parallel)
+                              comparison=default.getComparison(), parallel=parallel, rate=default.getRate())
 
     def __str__(self):
         return str(self.device_settings)
@@ -274,10 +290,16 @@ def setScanSettings(settings):
     __scan_settings = settings
 
 
+def __deviceSettings(prefixed_device):
+    """:return: :class:`DeviceSettings` for prefixed device name, or the provided :class:`DeviceSettings`"""
+    if isinstance(prefixed_device, DeviceSettings):
+        return prefixed_device
+    return __scan_settings.parseDeviceSettings(prefixed_device)
+
 def SettingsBasedSet(prefixed_device, value, **kwargs):
     """Set a device to a value.
     
-    :param device:     Device name
+    :param device:     Device name, or :class:`DeviceSettings`
     :param value:      Value
 
     Defaults to :class:`~scan.util.scan_settings.ScanSettings`,
@@ -291,7 +313,7 @@ def SettingsBasedSet(prefixed_device, value, **kwargs):
     :param timeout:    Timeout in seconds, used for `completion` and `readback`.
     :param errhandler: Error handler
     """
-    settings = __scan_settings.parseDeviceSettings(prefixed_device)
+    settings = __deviceSettings(prefixed_device)
     completion = kwargs['completion'] if 'completion' in kwargs else settings.getCompletion()
     readback   = kwargs['readback'] if 'readback' in kwargs else settings.getReadback()
     tolerance  = kwargs['tolerance'] if 'tolerance' in kwargs else settings.getTolerance()
@@ -309,7 +331,7 @@ def SettingsBasedLoop(prefixed_device, start, end, step, body=None, *args, **kwa
     
     Optional check of completion and readback verification.
     
-    :param device:     Device name
+    :param device:     Device name, or :class:`DeviceSettings`
     :param start:      Initial value
     :param end:        Final value
     :param step:       Step size
@@ -327,7 +349,7 @@ def SettingsBasedLoop(prefixed_device, start, end, step, body=None, *args, **kwa
     :param timeout:    Timeout in seconds, used for `completion` and `readback` check.
     :param errhandler: Error handler
     """
-    settings = __scan_settings.parseDeviceSettings(prefixed_device)
+    settings = __deviceSettings(prefixed_device)
     completion = kwargs['completion'] if 'completion' in kwargs else settings.getCompletion()
     readback   = kwargs['readback'] if 'readback' in kwargs else settings.getReadback()
     tolerance  = kwargs['tolerance'] if 'tolerance' in kwargs else settings.getTolerance()
@@ -344,7 +366,7 @@ def SettingsBasedLoop(prefixed_device, start, end, step, body=None, *args, **kwa
 def SettingsBasedWait(prefixed_device, value, **kwargs):
     """Wait until a condition is met, i.e. a device reaches a value.
     
-    :param  device:      Name of PV or device.
+    :param  device:      Name of PV or device, or :class:`DeviceSettings`.
     :param  value:       Desired value.
 
     Defaults to :class:`~scan.util.scan_settings.ScanSettings`,
@@ -356,7 +378,7 @@ def SettingsBasedWait(prefixed_device, value, **kwargs):
     :param  timeout:    Timeout in seconds. Default 0 to wait 'forever'.
     :param  errhandler: Default None.
     """
-    settings = __scan_settings.parseDeviceSettings(prefixed_device)
+    settings = __deviceSettings(prefixed_device)
     comparison = kwargs['comparison'] if 'comparison' in kwargs else settings.getComparison()
     tolerance  = kwargs['tolerance'] if 'tolerance' in kwargs else settings.getTolerance()
     timeout    = kwargs['timeout'] if 'timeout' in kwargs else settings.getTimeout()
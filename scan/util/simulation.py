@@ -0,0 +1,254 @@
+"""
+Scan simulation
+===============
+
+Estimates the duration of a scan on the client,
+without submitting it to the scan server.
+
+The duration of `Delay` commands is known.
+For `Set`, `Loop` and `Wait` commands that await completion or a readback,
+the time is estimated from the rate of the device
+as configured in :class:`~scan.util.scan_settings.ScanSettings`:
+
+.. code-block:: python
+
+   settings.defineDeviceClass("motor.*", completion=True, rate=0.5)
+
+Devices without a known rate are assumed to change right away.
+
+Example
+-------
+
+>>> simulator = ScanSimulator()
+>>> result = simulator.simulate([ Set('motor_x', 5), Delay(2) ])
+>>> print result['seconds']
+
+API
+---
+"""
+import math
+try:
+    import xml.etree.cElementTree as ET
+except:
+    import xml.etree.ElementTree as ET
+
+from scan.commands.commandsequence import CommandSequence
+from scan.util.scan_settings import getScanSettings
+from scan.util.seconds import formatSecondsAsTime
+
+class ScanSimulator(object):
+    """Simulate scan on the client
+
+    Result is similar to :func:`~scan.client.scanclient.ScanClient.simulate`.
+    The simulation is an estimate. It cannot predict how long a `Script`
+    takes, it does not read `Include` files, and it assumes that the
+    body of `If` commands is executed unless the device value is known.
+
+    :param settings: :class:`~scan.util.scan_settings.ScanSettings` with device rates,
+                     default is the global scan settings.
+    :param values:   Optional dictionary of device names and their
+                     current values, used as the start values of a simulation.
+    """
+    # Comparison in XML -> check( value, desired, tolerance )
+    __comparisons = {
+        'EQUALS':   lambda value, desired, tolerance: abs(value - desired) <= tolerance,
+        'UNEQUAL':  lambda value, desired, tolerance: abs(value - desired) > tolerance,
+        'ABOVE':    lambda value, desired, tolerance: value > desired,
+        'AT_LEAST': lambda value, desired, tolerance: value >= desired,
+        'BELOW':    lambda value, desired, tolerance: value < desired,
+        'AT_MOST':  lambda value, desired, tolerance: value <= desired,
+    }
+
+    def __init__(self, settings=None, values=None):
+        self.__settings = settings
+        self.__start_values = dict(values) if values else dict()
+        # Device name -> rate
+        self.__rates = dict()
+
+    def __value(self, text):
+        """:return: Number, or text of a "quoted" string"""
+        if text is None:
+            return None
+        if len(text) >= 2  and  text.startswith('"')  and  text.endswith('"'):
+            return text[1:-1]
+        try:
+            return float(text)
+        except ValueError:
+            return text
+
+    def __isNumber(self, value):
+        return isinstance(value, float)
+
+    def simulate(self, cmds):
+        """Simulate scan
+
+        :param cmds: List of commands,
+                     :class:`~scan.commands.commandsequence.CommandSequence`
+                     or text with raw XML format.
+        :return: Simulation result as dictionary `{ 'simulation': "Printable text", 'seconds': 193.0 }`
+        """
+        if isinstance(cmds, basestring):
+            elements = list(ET.fromstring(cmds))
+        else:
+            elements = [ cmd.genXML() for cmd in CommandSequence(cmds) ]
+        self.__log = list()
+        self.__seconds = 0.0
+        self.__values = dict(self.__start_values)
+        # Loop element -> direction of loop that reverses each time
+        self.__directions = dict()
+        self.__simulateBody(elements)
+        return { 'simulation': "\n".join(self.__log), 'seconds': self.__seconds }
+
+    def __rate(self, device):
+        """:return: Rate of device from scan settings, or None"""
+        try:
+            return self.__rates[device]
+        except KeyError:
+            settings = self.__settings or getScanSettings()
+            rate = self.__rates[device] = settings.getDefaultSettings(device).getRate()
+            return rate
+
+    def __info(self, text, seconds=0.0):
+        """Log info for a command, and advance simulated time"""
+        if seconds > 0:
+            text += " (%s)" % self.__formatSeconds(seconds)
+        self.__log.append("%s - %s" % (formatSecondsAsTime(self.__seconds), text))
+        self.__seconds += seconds
+
+    def __formatSeconds(self, seconds):
+        if seconds < 60:
+            return "%.1f sec" % seconds
+        return formatSecondsAsTime(seconds)
+
+    def __timeout(self, seconds, timeout):
+        """:return: Seconds, limited by timeout"""
+        if timeout  and  float(timeout) > 0:
+            return min(seconds, float(timeout))
+        return seconds
+
+    def __change(self, device, value):
+        """:return: Estimated seconds for device to reach value"""
+        rate = self.__rate(device)
+        current = self.__values.get(device)
+        if rate  and  self.__isNumber(value)  and  self.__isNumber(current):
+            return abs(value - current) / abs(rate)
+        return 0.0
+
+    def __setDevice(self, device, value, fields):
+        """Set device, which may await completion or readback"""
+        seconds = 0.0
+        if fields.get('completion') == 'true'  or  fields.get('wait') == 'true':
+            seconds = self.__timeout(self.__change(device, value), fields.get('timeout'))
+        self.__values[device] = value
+        if self.__isNumber(value):
+            self.__info("Set '%s' = %g" % (device, value), seconds)
+        else:
+            self.__info("Set '%s' = '%s'" % (device, value), seconds)
+
+    def __loopValues(self, elem, start, end, step):
+        """:return: Values of a loop, considering direction of nested loops"""
+        if step == 0:
+            return [ start ]
+        low = min(start, end)
+        high = max(start, end)
+        # Step that 'points' the wrong way reverses the direction each time
+        if start != end  and  (end - start) * step < 0:
+            direction = self.__directions.get(elem, 1 if step > 0 else -1)
+            self.__directions[elem] = -direction
+        else:
+            direction = 1 if step > 0 else -1
+        count = int(math.floor((high - low) / abs(step) + 1e-9)) + 1
+        if direction > 0:
+            return [ low + i*abs(step) for i in range(count) ]
+        return [ high - i*abs(step) for i in range(count) ]
+
+    def __simulateBody(self, elements):
+        for elem in elements:
+            self.__simulate(elem)
+
+    def __simulate(self, elem):
+        tag = elem.tag
+        fields = dict([ (child.tag, child.text) for child in elem ])
+        if tag == 'comment':
+            self.__info("Comment '%s'" % fields.get('text'))
+        elif tag == 'delay':
+            self.__info("Delay", float(fields.get('seconds')))
+        elif tag == 'set':
+            self.__setDevice(fields.get('device'), self.__value(fields.get('value')), fields)
+        elif tag == 'loop':
+            device = fields.get('device')
+            values = self.__loopValues(elem, float(fields.get('start')), float(fields.get('end')), float(fields.get('step')))
+            body = elem.find('body')
+            for value in values:
+                self.__setDevice(device, value, fields)
+                if body is not None:
+                    self.__simulateBody(body)
+        elif tag == 'wait':
+            self.__wait(fields)
+        elif tag == 'parallel':
+            self.__parallel(elem, fields)
+        elif tag == 'sequence':
+            body = elem.find('body')
+            if body is not None:
+                self.__simulateBody(body)
+        elif tag == 'if':
+            self.__if(elem, fields)
+        elif tag == 'log':
+            self.__info("Log " + ", ".join([ "'%s'" % device.text for device in elem.findall('devices/device') ]))
+        elif tag == 'config_log':
+            self.__info("Automatic logging %s" % ('on' if fields.get('automatic') == 'true' else 'off'))
+        elif tag == 'script':
+            self.__info("Script '%s'" % fields.get('path'))
+        elif tag == 'include':
+            self.__info("Include '%s' (not simulated)" % fields.get('scan_file'))
+        else:
+            raise Exception("Cannot simulate <%s>" % tag)
+
+    def __wait(self, fields):
+        device = fields.get('device')
+        desired = self.__value(fields.get('value'))
+        comparison = fields.get('comparison')
+        current = self.__values.get(device)
+        seconds = 0.0
+        if comparison in ( 'INCREASE_BY', 'DECREASE_BY' ):
+            rate = self.__rate(device)
+            if rate  and  self.__isNumber(desired):
+                seconds = abs(desired / rate)
+            if self.__isNumber(desired)  and  self.__isNumber(current):
+                self.__values[device] = current + desired if comparison == 'INCREASE_BY' else current - desired
+            text = "Wait for '%s' to %s by %s" % (device, comparison.split('_')[0].lower(), fields.get('value'))
+        else:
+            tolerance = float(fields.get('tolerance') or 0.0)
+            check = ScanSimulator.__comparisons.get(comparison)
+            if not (check  and  self.__isNumber(desired)  and  self.__isNumber(current)  and  check(current, desired, tolerance)):
+                seconds = self.__change(device, desired)
+                if comparison in ( 'EQUALS', 'AT_LEAST', 'AT_MOST' ):
+                    self.__values[device] = desired
+            text = "Wait for '%s' %s %s" % (device, comparison, fields.get('value'))
+        self.__info(text, self.__timeout(seconds, fields.get('timeout')))
+
+    def __parallel(self, elem, fields):
+        """Commands in parallel start at the same time, end with the slowest one"""
+        start = self.__seconds
+        end = start
+        self.__info("Parallel")
+        body = elem.find('body')
+        if body is not None:
+            for command in body:
+                self.__seconds = start
+                self.__simulate(command)
+                end = max(end, self.__seconds)
+        self.__seconds = start + self.__timeout(end - start, fields.get('timeout'))
+
+    def __if(self, elem, fields):
+        device = fields.get('device')
+        desired = self.__value(fields.get('value'))
+        current = self.__values.get(device)
+        check = ScanSimulator.__comparisons.get(fields.get('comparison'))
+        execute = True
+        if check  and  self.__isNumber(desired)  and  self.__isNumber(current):
+            execute = check(current, desired, float(fields.get('tolerance') or 0.0))
+        self.__info("If '%s' %s %s: %s" % (device, fields.get('comparison'), fields.get('value'), 'executed' if execute else 'skipped'))
+        body = elem.find('body')
+        if execute  and  body is not None:
+            self.__simulateBody(body)
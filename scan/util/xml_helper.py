@@ -20,4 +20,73 @@ def indent(elem, level=0):
             elem.tail = i
     else:
         if level and (not elem.tail or not elem.tail.strip()):
-            elem.tail = i
\ No newline at end of file
+            elem.tail = i
+
+def __escape(text, entities):
+    """Escape text like ElementTree, using character references for non-ASCII"""
+    for char, entity in entities:
+        if char in text:
+            text = text.replace(char, entity)
+    if type(text) is str:
+        return text
+    return text.encode('us-ascii', 'xmlcharrefreplace')
+
+__text_entities = ( ('&', '&amp;'), ('<', '&lt;'), ('>', '&gt;') )
+__attrib_entities = __text_entities + ( ('"', '&quot;'), ('\n', '&#10;') )
+
+def writeXML(elem, write, level=0, last=True, pretty=True, splice=None):
+    """Write element as XML text
+
+    Produces the same text as `ElementTree.tostring`,
+    optionally indented like :func:`indent`,
+    but without modifying the element.
+
+    :param elem: xml.etree.ElementTree.Element to write
+    :param write: Function that is called with text
+    :param level: Indentation level of the element
+    :param last: Is the element the last one of its parent?
+    :param pretty: Indent?
+    :param splice: Optional function that is called with each nested element and its level.
+                   When it returns text, that is written instead of the element,
+                   followed by the usual indentation.
+    """
+    tag = elem.tag
+    start = tag
+    items = elem.items()
+    if items:
+        items.sort()
+        start = tag + ''.join([ ' %s="%s"' % (key, __escape(value, __attrib_entities)) for key, value in items ])
+    text = elem.text
+    children = len(elem)
+    if children:
+        if pretty  and  (not text  or  not text.strip()):
+            text = "\n" + (level+1)*"  "
+        else:
+            text = __escape(text, __text_entities) if text else ''
+        write("<%s>%s" % (start, text))
+        i = 1
+        for child in elem:
+            spliced = splice(child, level+1) if splice is not None else None
+            if spliced is None:
+                writeXML(child, write, level+1, i == children, pretty, splice)
+            elif pretty:
+                write(spliced + "\n" + (level if i == children else level+1)*"  ")
+            else:
+                write(spliced)
+            i += 1
+        end = "</%s>" % tag
+    elif text:
+        end = "<%s>%s</%s>" % (start, __escape(text, __text_entities), tag)
+    else:
+        end = "<%s />" % start
+    tail = elem.tail
+    if pretty  and  (not tail  or  not tail.strip()):
+        if level > 0:
+            tail = "\n" + (level-1 if last else level)*"  "
+        elif children:
+            tail = "\n"
+        elif tail:
+            tail = __escape(tail, __text_entities)
+    elif tail:
+        tail = __escape(tail, __text_entities)
+    write(end + tail if tail else end)